@@ -14,61 +14,13 @@ from django.utils.decorators import method_decorator
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from document.models import Document
-from openai import OpenAI
-import openai
-import requests
-import redis
+from llm.client import chat_completion
 
-# OpenAI API 키 설정
-openai_api_key = os.environ.get("OPENAI_API_KEY")
-openai.api_key = openai_api_key
 
-# Redis 클라이언트 생성
-redis_client = redis.StrictRedis(host="redis", port=6379, decode_responses=True)
+def call_openai_api(prompt, task=None, use_cache=True):
+    # 프로세스 공용 커넥션 풀을 통해 호출 (keep-alive, HTTP/2), task 지정 시 응답 캐시 사용
+    return chat_completion(prompt, system=None, task=task, use_cache=use_cache, max_tokens=3000)
 
-# DeepSeek API 설정
-#api_key = os.environ.get("DEEPSEEK_API_KEY")
-#api_url = os.environ.get("DEEPSEEK_API_URL")
-
-def call_openai_api(prompt):
-    try:
-        # ChatGPT 모델 호출
-        response = openai.chat.completions.create(
-            model="gpt-4o", 
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=3000,  # 응답의 최대 토큰 수
-        )
-        print(response)
-
-        # 응답에서 메시지 내용 추출
-        message_content = response.choices[0].message.content
-        
-        return message_content
-
-    except openai.OpenAIError as e:
-        raise Exception(f"OpenAI API 호출 실패: {str(e)}")
-
-
-# def call_deepseek_api(prompt):  # 딥시크 코드
-#     payload = {
-#         "model": "deepseek-chat",
-#         "messages": [{"role": "user", "content": prompt}],
-#         "stream": False
-#     }
-
-#     header = {
-#         "Content-Type": "application/json",
-#         "Authorization": "Bearer " + api_key
-#     }
-
-#     response = requests.post(api_url, json=payload, headers=header)
-
-#     if response.status_code == 200:
-#         result = response.json()
-#         return result["choices"][0]["message"]["content"]
-#     else:
-#         error_msg = response.json().get("error", "Unknown error occurred.")
-#         raise Exception(f"DeepSeek API 호출 실패: {error_msg}")
 
 @shared_task
 def copy_template_files(project_dir, frontend_template_dir, backend_template_dir):
@@ -91,7 +43,7 @@ def copy_template_files(project_dir, frontend_template_dir, backend_template_dir
         raise Exception(f"Error copying template files: {e}")
     
 @shared_task
-def generate_models_from_erd(erd_code):
+def generate_models_from_erd(erd_code, use_cache=True):
     """
     ERD 코드를 기반으로 Django 모델 코드를 생성합니다.
     """
@@ -128,52 +80,13 @@ def generate_models_from_erd(erd_code):
 
     try:
         # OpenAI API 호출을 함수로 처리
-        models_code = call_openai_api(prompt)
+        models_code = call_openai_api(prompt, task="generate_models_from_erd", use_cache=use_cache)
         # '''python 또는 ''' 제거
         models_code = models_code.strip().replace("```python", "").replace("```", "").strip()
         return models_code
     except Exception as e:
         raise Exception(f"Error generating Django models from ERD: {e}")
 
-# @shared_task
-# def generate_models_from_erd(erd_code):
-#     """
-#     ERD 코드를 기반으로 Django 모델 코드를 생성합니다.
-#     """
-
-#     prompt = f"""
-#         다음 Mermaid 형식의 ERD 코드를 Django 모델 코드로 변환해주세요. 아래 지시사항을 정확히 따라주세요:
-
-#         {erd_code}
-
-#         1. **모델 정의**
-#         - 각 엔티티는 Django의 `models.Model`을 상속받는 클래스로 정의하세요.
-#         - 필드 타입은 ERD의 데이터 타입에 맞게 적절히 선택하세요. (예: `IntegerField`, `CharField`, `ForeignKey` 등)
-#         - `primary_key=True` 옵션을 사용하여 기본 키를 명시하세요.
-#         - 외래 키는 `ForeignKey`를 사용하여 정의하세요. `on_delete` 옵션은 `models.CASCADE`로 설정하세요.
-
-#         2. **관계 정의**
-#         - 1:1 관계는 `OneToOneField`를 사용하세요.
-#         - 1:N 관계는 `ForeignKey`를 사용하세요.
-#         - M:N 관계는 `ManyToManyField`를 사용하세요.
-
-#         3. **메타 클래스**
-#         - 각 모델 클래스에 `Meta` 클래스를 추가하고, `verbose_name` 및 `verbose_name_plural`을 정의하세요.
-
-#         4. **출력 형식**
-#         - 생성된 Django 모델 코드만 출력하세요. 다른 설명은 생략하세요.
-#         - 설명과 주석 없이 Django에서 바로 사용할 수 있도록 '코드만' 출력하세요.
-#         - 순수한 Python 코드만 생성하세요.
-#         - `'''`(삼중 따옴표)를 사용하지 마세요.
-#         - 코드 블록이나 문자열 리터럴로 감싸지 마세요.
-#     """
-
-#     try:
-#         # DeepSeek API를 호출하여 Django 모델 코드 생성
-#         models_code = call_deepseek_api(prompt)
-#         return models_code
-#     except Exception as e:
-#         raise Exception(f"Error generating Django models from ERD: {e}")
 
 @shared_task
 def clean_api_code(api_code):
@@ -208,7 +121,7 @@ views_py=""
 
 
 @shared_task
-def generate_api_endpoints(erd_code, api_code, backend_tech_stack):
+def generate_api_endpoints(erd_code, api_code, backend_tech_stack, use_cache=True):
     """
     ERD 코드와 API 코드를 기반으로 백엔드 기술 스택에 맞는 엔드포인트 코드를 생성합니다.
     """
@@ -249,7 +162,7 @@ def generate_api_endpoints(erd_code, api_code, backend_tech_stack):
             
             try:
             # OpenAI API 호출을 함수로 처리
-                views_code = call_openai_api(prompt)
+                views_code = call_openai_api(prompt, task="generate_api_endpoints", use_cache=use_cache)
                 views_py = views_code
                 # '''python 또는 ''' 제거
                 views_code = views_code.strip().replace("```python", "").replace("```", "").strip()
@@ -262,46 +175,9 @@ def generate_api_endpoints(erd_code, api_code, backend_tech_stack):
     else:
         raise ValueError("지원되지 않는 백엔드 기술 스택입니다.")
 
-# def generate_api_endpoints(erd_code, api_code, backend_tech_stack):  # 딥시크 코드
-#     """
-#     ERD 코드와 API 코드를 기반으로 백엔드 기술 스택에 맞는 엔드포인트 코드를 생성합니다.
-#     """
-#     if "Django" in backend_tech_stack:
-#         try:
-#             # 프롬프트 생성
-#             prompt = f"""
-#                 다음 지시사항에 따라 Django views.py 파일을 생성해주세요:
-
-#                 ERD 코드{erd_code}와 API 코드{api_code}를 참고하여 Django views.py 파일을 생성해주세요
-
-#                 출력 형식:
-#                 - 순수한 Python 코드만 생성하세요.
-#                 - `'''`(삼중 따옴표)를 사용하지 마세요.
-#                 - 코드 블록이나 문자열 리터럴로 감싸지 마세요.
-#                 - 설명과 주석 없이 Django에서 바로 사용할 수 있도록 코드만 출력하세요.
-
-#                 모델 및 뷰 정의:
-#                 - serializer를 사용하지 마세요.
-#                 - ERD 코드를 기반으로 Django 모델을 생성하세요.
-#                 - API 스펙을 기반으로 Django 뷰를 생성하세요.
-#                 - 뷰는 Django REST Framework의 `APIView`를 사용하세요.
-#                 - 각 엔드포인트에 대해 적절한 HTTP 메서드를 구현하세요.
-#             """
-
-#             # AI에게 코드 생성 요청
-#             views_code = call_deepseek_api(prompt)
-#             print(views_code)
-
-#             return views_code.strip()
-#         except Exception as e:
-#             raise ValueError(f"Error generating API endpoints: {e}")
-#     else:
-#         raise ValueError("지원되지 않는 백엔드 기술 스택입니다.")
 
-    
-    
 @shared_task
-def generate_urls_from_views(api_code, app_name):
+def generate_urls_from_views(api_code, app_name, use_cache=True):
     """
     views.py에 정의된 API 엔드포인트를 기반으로 urls.py를 동적으로 생성합니다.
     """
@@ -330,7 +206,7 @@ def generate_urls_from_views(api_code, app_name):
 
     try:
         # OpenAI API 호출을 함수로 처리
-        urls_code = call_openai_api(prompt)
+        urls_code = call_openai_api(prompt, task="generate_urls_from_views", use_cache=use_cache)
         
         # 생성된 코드 검증
         if "urlpatterns" not in urls_code or "path" not in urls_code:
@@ -343,85 +219,6 @@ def generate_urls_from_views(api_code, app_name):
     except Exception as e:
         raise Exception(f"Error generating Django urls from views: {e}")
 
-# @shared_task
-# def generate_urls_from_views(api_code, app_name):  # 딥시크 코드
-#     """
-#     views.py에 정의된 API 엔드포인트를 기반으로 urls.py를 동적으로 생성합니다.
-#     """
-#     # views_path = f"{app_name}/views.py"
-    
-#     # # 파일 존재 여부 확인
-#     # if not os.path.exists(views_path):
-#     #     raise FileNotFoundError(f"'{views_path}' 파일이 존재하지 않습니다.")
-
-#     # # views.py 내용 읽기
-#     # try:
-#     #     with open(views_path, "r") as f:
-#     #         views_content = f.read()
-#     # except Exception as e:
-#     #     raise Exception(f"'{views_path}' 파일을 읽는 중 오류 발생: {e}")
-
-#     # print(views_content)
-    
-#     # 프롬프트 구성
-#     prompt = f"""
-#         {api_code}코드를 기반으로 urls.py 코드를 생성하세요. 아래 지시사항을 정확히 따라주세요:
-
-#         1. **URL 패턴 정의**
-#         - 각 함수형 뷰 또는 클래스형 뷰를 기반으로 URL 패턴을 생성하세요.
-#         - 함수형 뷰는 `path()`를 사용하고, 클래스형 뷰는 `as_view()`를 호출하여 `path()`로 연결하세요.
-#         - `urlpatterns` 리스트에 모든 URL 패턴을 정의하세요.
-
-#         2. **앱 이름 지정**
-#         - `app_name`을 `api`로 설정하세요.
-        
-#         3. **출력 형식**
-#         - 생성된 urls.py 코드만 출력하세요. 다른 설명은 생략하세요.
-#         - Django에서 바로 사용할 수 있도록 코드만 출력하세요.
-#         - 삼중 따옴표(`'''`)를 사용하지 마세요.
-#         - 코드 블록이나 문자열 리터럴로 감싸지 마세요.
-
-#         아래는 출력 예시입니다.
-#         예를 들어, views.py가 다음과 같다면:
-        
-#         from django.http import JsonResponse
-
-#         def get_items(request):
-#             return JsonResponse("예시")
-
-#         class ItemDetailView(View):
-#             def get(self, request, item_id):
-#                 return JsonResponse("예시")
-        
-
-#         생성되는 urls.py는 다음과 같아야 합니다:
-        
-#         from django.urls import path
-#         from . import views
-
-#         app_name = 'api'
-
-#         urlpatterns = [
-#             path('items/', views.get_items, name='get_items'),
-#             path('items/<int:item_id>/', views.ItemDetailView.as_view(), name='item_detail'),
-#         ]
-#         위의 예시를 참고해서 출력 형식에 맞게 urls.py코드를 출력해주세요.
-        
-#     """
-
-#     try:
-#         # DeepSeek API를 호출하여 urls.py 코드 생성
-#         urls_code = call_deepseek_api(prompt)
-#         print(urls_code)
-
-#         # 생성된 코드 검증
-#         if "urlpatterns" not in urls_code or "path" not in urls_code:
-#             raise ValueError("생성된 urls.py 코드가 유효하지 않습니다.")
-        
-#         return urls_code
-#     except Exception as e:
-#         raise Exception(f"Error generating Django urls from views: {e}")
-
 
 def generate_docker_compose(project_dir, frontend_tech_stack, backend_tech_stack):
     """
@@ -497,7 +294,7 @@ volumes:
     return docker_compose_path
 
 @shared_task
-def merge_design_with_project(project_dir, erd_code, api_code, diagram_code, frontend_tech_stack, backend_tech_stack):
+def merge_design_with_project(project_dir, erd_code, api_code, diagram_code, frontend_tech_stack, backend_tech_stack, use_cache=True):
     try:
         os.makedirs(project_dir, exist_ok=True)
 
@@ -539,21 +336,21 @@ def merge_design_with_project(project_dir, erd_code, api_code, diagram_code, fro
             # Django 앱 생성 및 설정 (기존 코드)
             app_name = "app"
             app_dir = os.path.join(backend_dir, app_name)
-            os.chdir(backend_dir)
-            subprocess.run(["python", "manage.py", "startapp", app_name], check=True)
+            # os.chdir 는 프로세스 전체의 작업 디렉터리를 바꾸므로 (동시에 실행되는 작업에 영향) cwd 로 지정
+            subprocess.run(["python", "manage.py", "startapp", app_name], cwd=backend_dir, check=True)
 
             # models.py, views.py, urls.py 생성 (기존 코드)
-            models_code = generate_models_from_erd(erd_code)
+            models_code = generate_models_from_erd(erd_code, use_cache=use_cache)
             models_path = os.path.join(app_dir, "models.py")
             with open(models_path, "w") as f:
                 f.write(models_code)
 
-            api_endpoints_code = generate_api_endpoints(erd_code, api_code, backend_tech_stack)
+            api_endpoints_code = generate_api_endpoints(erd_code, api_code, backend_tech_stack, use_cache=use_cache)
             api_endpoints_path = os.path.join(app_dir, "views.py")
             with open(api_endpoints_path, "w") as f:
                 f.write(api_endpoints_code)
 
-            urls_code = generate_urls_from_views(app_name, api_code)
+            urls_code = generate_urls_from_views(api_code, app_name, use_cache=use_cache)
             urls_path = os.path.join(app_dir, "urls.py")
             with open(urls_path, "w") as f:
                 f.write(urls_code)
@@ -646,6 +443,7 @@ def push_to_github(project_dir, repo_name, user):
 def setup_project_chain(document_id, repo_name, username, email, access_token, organization_name=None, private=False):
     try:
         document = Document.objects.get(id=document_id)
+        document.load_artifacts("erd_code", "api_code", "diagram_code")
         erd_code = document.erd_code
         api_code = document.api_code
         diagram_code = document.diagram_code
@@ -1,5 +1,7 @@
 import os
 
+from django.conf import settings
+
 def find_matching_template(tech_stack_name, project_type):
     """
     사용자가 입력한 기술 스택을 기반으로 적절한 템플릿을 찾습니다.
@@ -44,9 +46,8 @@ def find_matching_template(tech_stack_name, project_type):
             # 템플릿 경로를 사용자가 선택한 템플릿에 맞춰서 절대 경로로 반환
             template_path = os.path.join("Tech_Stack", project_type.capitalize(), template)
             
-            # 절대 경로를 현재 작업 디렉터리와 무관하게 고정된 기준으로 처리
-            base_dir = '/DevSketch-Backend'  # 고정된 경로 설정
-            fixed_path = os.path.join(base_dir, template_path)
+            # 절대 경로를 현재 작업 디렉터리와 무관하게 프로젝트 루트(컨테이너에서는 /DevSketch-Backend) 기준으로 처리
+            fixed_path = os.path.join(settings.BASE_DIR, template_path)
             
             return os.path.abspath(fixed_path)  # 절대 경로로 반환
 
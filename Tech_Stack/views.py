@@ -7,6 +7,7 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.conf import settings
 from django.utils import timezone
+from django.db.models import Q
 import os
 import logging
 import shutil
@@ -16,6 +17,8 @@ from Tech_Stack.tasks import merge_design_with_project
 from document.models import Document
 from django.contrib.auth import get_user_model
 from .utils import find_matching_template  
+from llm.cache import use_cache_from_request
+from config.db.pool import release_connections
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -99,13 +102,17 @@ class TechStackSetupView(ViewSet):
             if document_id and document_id != 0:
                 try:
                     document = Document.objects.get(id=document_id)
+                    document.load_artifacts("erd_code", "api_code", "diagram_code")
+                    # 작업 결과를 기다리는 동안 DB 연결은 풀에 돌려줌
+                    release_connections()
                     merge_design_with_project.delay(
                         project_dir=project_dir,
                         erd_code=document.erd_code,
                         api_code=document.api_code,
                         diagram_code=document.diagram_code,
                         frontend_tech_stack=frontend_tech_stack,
-                        backend_tech_stack=backend_tech_stack
+                        backend_tech_stack=backend_tech_stack,
+                        use_cache=use_cache_from_request(request)
                     ).get()
                     message = "초기 디렉터리 생성 및 설계 결과물 합치기 성공"
                 except Document.DoesNotExist:
@@ -140,9 +147,17 @@ class TechStackSetupView(ViewSet):
             logger.warning("tech_stack_names가 비어 있습니다.")
             return
 
+        # 기존 기술 스택을 한 번에 조회 (이름은 대소문자 구분 없이 비교)
+        query = Q()
         for tech_name in tech_stack_names:
-            # TechStack 모델에서 기술 스택을 찾습니다.
-            tech_stack = TechStack.objects.filter(name__iexact=tech_name).first()
+            query |= Q(name__iexact=tech_name)
+        tech_stacks = {}
+        for tech_stack in TechStack.objects.filter(query).order_by("id"):
+            tech_stacks.setdefault(tech_stack.name.lower(), tech_stack)
+
+        project_techs = []
+        for tech_name in tech_stack_names:
+            tech_stack = tech_stacks.get(tech_name.lower())
 
             # 기술 스택이 없는 경우, 새로운 기술 스택을 추가합니다.
             if not tech_stack:
@@ -162,13 +177,16 @@ class TechStackSetupView(ViewSet):
                     created_at=timezone.now(),
                     deleted_at=None
                 )
+                tech_stacks[tech_name.lower()] = tech_stack
 
-            # ProjectTech 모델에 데이터를 저장합니다.
-            ProjectTech.objects.create(
+            project_techs.append(ProjectTech(
                 project_id=project.id,
                 tech_id=tech_stack.id,
                 file_path=project_dir
-            )
+            ))
+
+        # ProjectTech 모델에 데이터를 한 번의 INSERT 로 저장합니다.
+        ProjectTech.objects.bulk_create(project_techs)
 
 class MergeDesignWithProjectView(APIView):
     @swagger_auto_schema(
@@ -241,14 +259,17 @@ class MergeDesignWithProjectView(APIView):
                 try:
                     # 설계 문서 조회
                     document = Document.objects.get(id=document_id)
+                    document.load_artifacts("erd_code", "api_code", "diagram_code")
 
-                    # 설계 결과물과 초기 디렉터리 합치기
+                    # 설계 결과물과 초기 디렉터리 합치기 (결과를 기다리는 동안 DB 연결은 풀에 돌려줌)
+                    release_connections()
                     merge_design_with_project.delay(
                         project_dir=project_dir,
                         erd_code=document.erd_code,
                         api_code=document.api_code,
                         diagram_code=document.diagram_code,
-                        backend_tech_stack=backend_tech_stack  # 백엔드 기술 스택 추가
+                        backend_tech_stack=backend_tech_stack,  # 백엔드 기술 스택 추가
+                        use_cache=use_cache_from_request(request)
                     ).get()  # .get()을 사용하여 동기적으로 실행
 
                     message = "초기 디렉터리 생성 및 설계 결과물 합치기 성공"
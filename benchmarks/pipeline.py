@@ -0,0 +1,533 @@
+"""
+문서 생성부터 프로젝트 생성까지의 전체 흐름을 여러 사용자가 동시에 실행하는 부하 벤치마크입니다.
+
+    DJANGO_SETTINGS_MODULE=benchmarks.settings python -m benchmarks.pipeline \\
+        --users 20 --iterations 2 --workers 4 --output temp/bench.json [--compare temp/base.json]
+
+사용자마다 아래 순서로 실제 Django 뷰를 호출합니다. (Django 테스트 클라이언트, JWT 인증, 미들웨어 포함)
+  1. create  POST /api/v1/documents/                 문서 생성
+  2. stream  GET  /api/v1/documents/<id>/stream      기능명세서 스트리밍 (SSE 를 끝까지 읽음)
+  3. design  POST /api/v1/documents/<id>/design      dev_document (설계 생성 작업 시작, job_id 반환)
+     artifacts GET /api/v1/documents/design/<job>/stream  작업이 끝날 때까지 산출물 토큰 SSE 를 읽음
+  4. setup   POST /api/v1/tech-stack/setup           TechStackSetupView.setup_project
+  5. deploy  POST /api/v1/dinds/                     가짜 Docker 클라이언트로 컨테이너 생성 (--skip-deploy 로 생략)
+
+LLM 호출은 llm.stub_server 로 보냅니다. (--stub-url 을 주지 않으면 같은 프로세스에서 스텁을 띄움)
+--workers 는 gunicorn sync 워커 수를 흉내 냅니다. 워커가 모두 사용 중이면 요청은 대기열에서 기다립니다.
+eager 모드(기본값)에서는 Celery 작업이 요청 스레드에서 실행되므로 design 지연에 생성 시간이 포함됩니다.
+웹 계층만 측정하려면 BENCHMARK_CELERY_EAGER=0 과 실제 워커로 실행하세요.
+
+엔드포인트별 p50/p95/p99 지연, 처리량, 대기열 대기 시간, 요청당 DB 쿼리 수, (stream) 첫 토큰까지의 시간,
+워커 포화도를 JSON 으로 저장합니다. --compare 로 이전 커밋의 결과와 비교하고,
+--max-regression 을 주면 그보다 나빠진 지표가 있을 때 종료 코드 1 을 반환합니다.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from unittest import mock
+
+import django
+
+STEPS = ["create", "stream", "design", "artifacts", "setup", "deploy"]
+
+# 비교할 지표와 방향 (True 면 값이 클수록 좋음)
+COMPARED_METRICS = [
+    ("latency", "p50", False),
+    ("latency", "p95", False),
+    ("latency", "p99", False),
+    ("ttft", "p95", False),
+    ("queue_wait", "p95", False),
+    ("db_queries", "mean", False),
+    (None, "throughput", True),
+]
+
+# 프론트엔드에서 보내는 값 그대로 (docker-compose/API 생성은 대소문자를 구분)
+FRONTEND_TECH_STACK = ["React", "js", "npm", "vite"]
+BACKEND_TECH_STACK = ["Django", "mysql"]
+
+
+def quantile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def distribution(values, digits=4):
+    if not values:
+        return None
+    return {
+        "p50": round(quantile(values, 0.5), digits),
+        "p95": round(quantile(values, 0.95), digits),
+        "p99": round(quantile(values, 0.99), digits),
+        "mean": round(sum(values) / len(values), digits),
+        "max": round(max(values), digits),
+    }
+
+
+class FakeContainer:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def exec_run(self, cmd, **kwargs):
+        time.sleep(self.latency)
+        return 0, b""
+
+
+class FakeDockerClient:
+    """
+    docker.from_env() 대신 사용하는 클라이언트입니다. 컨테이너를 만들지 않고 지연만 흉내 냅니다.
+    """
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.containers = self
+
+    def run(self, image, **kwargs):
+        time.sleep(self.latency)
+        return FakeContainer(self.latency)
+
+
+class WorkerPool:
+    """
+    gunicorn sync 워커 흉내: 동시에 처리하는 요청 수를 workers 개로 제한하고 사용 중/대기 수를 샘플링합니다.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.busy = 0
+        self.waiting = 0
+        self.samples = []
+        self._slots = threading.BoundedSemaphore(workers)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self):
+        """
+        워커를 하나 점유합니다. 워커를 얻을 때까지 기다린 시간(초)을 돌려줍니다.
+        """
+        queued = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+        self._slots.acquire()
+        with self._lock:
+            self.waiting -= 1
+            self.busy += 1
+        try:
+            yield time.perf_counter() - queued
+        finally:
+            with self._lock:
+                self.busy -= 1
+            self._slots.release()
+
+    def sample(self, stop, interval):
+        while not stop.wait(interval):
+            with self._lock:
+                self.samples.append((self.busy, self.waiting))
+
+    def summary(self):
+        if not self.samples:
+            return {"workers": self.workers}
+        busy = [b for b, _ in self.samples]
+        waiting = [w for _, w in self.samples]
+        return {
+            "workers": self.workers,
+            "utilization": round(sum(busy) / len(busy) / self.workers, 4),
+            "saturated_ratio": round(sum(1 for b in busy if b >= self.workers) / len(busy), 4),
+            "mean_waiting": round(sum(waiting) / len(waiting), 2),
+            "max_waiting": max(waiting),
+        }
+
+
+class QueryCounter:
+    """
+    connection.execute_wrapper 로 현재 스레드의 요청이 실행한 쿼리 수를 셉니다.
+    (eager 모드에서는 요청 안에서 실행되는 Celery 작업의 쿼리도 포함)
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {step: [] for step in STEPS}
+        self.pipelines = []
+        self.errors = []
+        self._lock = threading.Lock()
+
+    def add(self, step, sample):
+        with self._lock:
+            self.samples[step].append(sample)
+            if not sample["ok"]:
+                self.errors.append({"step": step, "status": sample["status"], "detail": sample.get("detail", "")})
+
+    def add_pipeline(self, seconds, ok):
+        with self._lock:
+            self.pipelines.append((seconds, ok))
+
+    def summary(self, wall):
+        endpoints = {}
+        for step, samples in self.samples.items():
+            if not samples:
+                continue
+            ok = [s for s in samples if s["ok"]]
+            result = {
+                "count": len(samples),
+                "errors": len(samples) - len(ok),
+                "throughput": round(len(ok) / wall, 4),
+                "latency": distribution([s["latency"] for s in ok]),
+                "queue_wait": distribution([s["queue_wait"] for s in samples]),
+                "db_queries": distribution([s["queries"] for s in ok], digits=2),
+            }
+            ttft = [s["ttft"] for s in ok if s.get("ttft") is not None]
+            if ttft:
+                result["ttft"] = distribution(ttft)
+            endpoints[step] = result
+
+        completed = [seconds for seconds, ok in self.pipelines if ok]
+        return {
+            "endpoints": endpoints,
+            "pipelines": {
+                "count": len(self.pipelines),
+                "completed": len(completed),
+                "throughput": round(len(completed) / wall, 4),
+                "latency": distribution(completed),
+            },
+            "errors": self.errors[:20],
+        }
+
+
+class SimulatedUser:
+    def __init__(self, index, name_prefix, token, pool, recorder, args):
+        from django.test import Client
+
+        self.index = index
+        self.name_prefix = name_prefix
+        self.pool = pool
+        self.recorder = recorder
+        self.args = args
+        self.client = Client(HTTP_AUTHORIZATION=f"Bearer {token}", raise_request_exception=False)
+        self.query = "?no_cache=true" if args.no_cache else ""
+
+    def request(self, step, method, path, data=None, expected=200, token_marker=b"data: "):
+        from django.db import connection
+
+        counter = QueryCounter()
+        sample = {"ok": False, "status": None, "ttft": None}
+        with self.pool.slot() as queue_wait, connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            body = b""
+            try:
+                response = self.client.generic(
+                    method, path, json.dumps(data) if data is not None else "", content_type="application/json",
+                )
+                sample["status"] = response.status_code
+                if response.streaming:
+                    chunks = []
+                    try:
+                        for chunk in response.streaming_content:
+                            if sample["ttft"] is None and token_marker in chunk:
+                                sample["ttft"] = time.perf_counter() - started
+                            chunks.append(chunk)
+                    finally:
+                        response.close()
+                    body = b"".join(chunks)
+                else:
+                    body = response.content
+                sample["ok"] = response.status_code == expected
+                if not sample["ok"]:
+                    sample["detail"] = body[:200].decode("utf-8", "replace")
+            except Exception as e:
+                sample["detail"] = repr(e)
+            sample["latency"] = time.perf_counter() - started
+        sample["queue_wait"] = queue_wait
+        sample["queries"] = counter.count
+        self.recorder.add(step, sample)
+        return sample, body
+
+    def run_pipeline(self, iteration):
+        name = f"{self.name_prefix}u{self.index}i{iteration}"  # Project.name 최대 20자
+
+        sample, body = self.request("create", "POST", "/api/v1/documents/", {
+            "title": name,
+            "content": f"{name}: 팀 단위 할 일 관리 서비스",
+            "requirements": "회원가입, 로그인, 할 일 CRUD, 댓글, 알림",
+        }, expected=201)
+        if not sample["ok"]:
+            return False
+        document_id = json.loads(body)["document_id"]
+
+        sample, body = self.request("stream", "GET", f"/api/v1/documents/{document_id}/stream")
+        if not sample["ok"] or b"event: done" not in body:
+            return False
+
+        sample, body = self.request("design", "POST", f"/api/v1/documents/{document_id}/design{self.query}",
+                                    expected=202)
+        if not sample["ok"]:
+            return False
+        job_id = json.loads(body)["data"]["job_id"]
+
+        sample, body = self.request("artifacts", "GET", f"/api/v1/documents/design/{job_id}/stream",
+                                    token_marker=b'"delta"')
+        if not sample["ok"] or b"event: done" not in body:
+            return False
+
+        sample, _ = self.request("setup", "POST", f"/api/v1/tech-stack/setup{self.query}", {
+            "frontend_tech_stack": FRONTEND_TECH_STACK,
+            "backend_tech_stack": BACKEND_TECH_STACK,
+            "directory_name": name,
+            "document_id": document_id,
+        }, expected=202)
+        if not sample["ok"]:
+            return False
+
+        if not self.args.skip_deploy:
+            sample, _ = self.request("deploy", "POST", "/api/v1/dinds/", {
+                "github_name": name,
+                "github_url": f"https://github.com/devsketch/{name}.git",
+                "repo_name": name,
+            }, expected=201)
+            if not sample["ok"]:
+                return False
+        return True
+
+    def run(self):
+        from django.db import connection
+
+        try:
+            for iteration in range(self.args.iterations):
+                started = time.perf_counter()
+                ok = self.run_pipeline(iteration)
+                self.recorder.add_pipeline(time.perf_counter() - started, ok)
+        finally:
+            connection.close()
+
+
+def git_commit():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def prepare_database():
+    from django.conf import settings
+    from django.core.management import call_command
+
+    database = settings.DATABASES["default"]
+    if database["ENGINE"].endswith("sqlite3"):
+        os.makedirs(os.path.dirname(database["NAME"]), exist_ok=True)
+        if os.path.exists(database["NAME"]):
+            os.remove(database["NAME"])
+        call_command("migrate", run_syncdb=True, verbosity=0)
+
+
+def start_stub(args):
+    """
+    LLM 요청을 보낼 스텁 주소를 돌려줍니다. (--stub-url 이 없으면 같은 프로세스에서 스텁 서버 실행)
+    """
+    if args.stub_url:
+        return args.stub_url, None
+    from llm.stub_server import build_server
+
+    server = build_server(port=0, ttft=args.stub_ttft, tokens_per_second=args.stub_tps,
+                          error_rate=args.stub_error_rate, rate_limit_rate=args.stub_429_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/v1", server
+
+
+def create_users(count, name_prefix):
+    from django.contrib.auth import get_user_model
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    User = get_user_model()
+    tokens = []
+    for index in range(count):
+        username = f"{name_prefix}-user-{index}"
+        user = User.objects.create_user(github_username=username, email=f"{username}@bench.devsketch.xyz")
+        tokens.append(str(RefreshToken.for_user(user).access_token))
+    return tokens
+
+
+def run(args):
+    from django.conf import settings
+    from config.redis import redis_client
+
+    try:
+        redis_client.ping()
+    except Exception as e:
+        sys.exit(f"Redis({settings.REDIS_HOST}:{settings.REDIS_PORT})에 연결할 수 없습니다: {e}")
+
+    prepare_database()
+    stub_url, stub = start_stub(args)
+    settings.LLM_PROVIDERS = [
+        {"name": "stub", "type": "openai", "url": stub_url, "api_key": "stub", "model": settings.LLM_MODEL},
+    ]
+
+    name_prefix = f"b{uuid.uuid4().hex[:6]}"
+    pool = WorkerPool(args.workers)
+    recorder = Recorder()
+    users = [
+        SimulatedUser(index, name_prefix, token, pool, recorder, args)
+        for index, token in enumerate(create_users(args.users, name_prefix))
+    ]
+
+    stop = threading.Event()
+    sampler = threading.Thread(target=pool.sample, args=(stop, args.sample_interval), daemon=True)
+    threads = [threading.Thread(target=user.run, name=f"bench-user-{user.index}") for user in users]
+
+    # eager 모드의 "작업 안에서 result.get() 금지" 플래그는 프로세스 전역이라 다른 사용자 스레드의
+    # 뷰(dev_document, setup_project)까지 막으므로 끕니다. (실제 배포에서는 뷰가 작업 밖에서 실행됨)
+    with mock.patch("docker.from_env", lambda: FakeDockerClient(args.docker_latency)), \
+            mock.patch("celery.app.task.denied_join_result", nullcontext):
+        started = time.perf_counter()
+        sampler.start()
+        for index, thread in enumerate(threads):
+            thread.start()
+            if args.ramp_up:
+                time.sleep(args.ramp_up / len(threads))
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+        stop.set()
+
+    if stub is not None:
+        stub.shutdown()
+        stub.server_close()
+    if not args.keep_files:
+        for user in users:
+            for iteration in range(args.iterations):
+                shutil.rmtree(os.path.join(settings.BASE_DIR, "temp", f"{name_prefix}u{user.index}i{iteration}"),
+                              ignore_errors=True)
+
+    result = recorder.summary(wall)
+    result["workers"] = pool.summary()
+    result["meta"] = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "wall_seconds": round(wall, 3),
+        "database": settings.DATABASES["default"]["ENGINE"],
+        "celery_eager": bool(getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False)),
+        "server_mode": settings.SERVER_MODE,
+        "stub_url": stub_url,
+        "args": vars(args),
+    }
+    return result
+
+
+def compare(base, current, max_regression=None):
+    """
+    두 결과의 지표를 비교하여 출력하고, max_regression(%)보다 나빠진 항목 목록을 돌려줍니다.
+    """
+    regressions = []
+    print(f"\ncompare: {base['meta'].get('commit')} -> {current['meta'].get('commit')}")
+    print(f"{'endpoint':<10} {'metric':<18} {'base':>10} {'current':>10} {'change':>8}")
+    for step in STEPS + ["pipelines"]:
+        if step == "pipelines":
+            old, new = base.get("pipelines"), current.get("pipelines")
+        else:
+            old, new = base["endpoints"].get(step), current["endpoints"].get(step)
+        if not old or not new:
+            continue
+        for group, metric, higher_is_better in COMPARED_METRICS:
+            old_value = (old.get(group) or {}).get(metric) if group else old.get(metric)
+            new_value = (new.get(group) or {}).get(metric) if group else new.get(metric)
+            if old_value is None or new_value is None:
+                continue
+            label = f"{group}.{metric}" if group else metric
+            change = (new_value - old_value) / old_value * 100 if old_value else 0.0
+            worse = -change if higher_is_better else change
+            flag = ""
+            if max_regression is not None and worse > max_regression:
+                regressions.append(f"{step} {label} {change:+.1f}%")
+                flag = " !"
+            print(f"{step:<10} {label:<18} {old_value:>10} {new_value:>10} {change:>+7.1f}%{flag}")
+    return regressions
+
+
+def print_summary(result):
+    print(f"\ncommit {result['meta']['commit']}  wall {result['meta']['wall_seconds']}s")
+    print(f"{'endpoint':<10} {'count':>6} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} "
+          f"{'ttft95':>8} {'wait95':>8} {'queries':>8}")
+    for step, data in result["endpoints"].items():
+        latency = data["latency"] or {}
+        print(
+            f"{step:<10} {data['count']:>6} {data['errors']:>4} {data['throughput']:>8.2f} "
+            f"{latency.get('p50', 0):>8.3f} {latency.get('p95', 0):>8.3f} {latency.get('p99', 0):>8.3f} "
+            f"{(data.get('ttft') or {}).get('p95', 0):>8.3f} {data['queue_wait']['p95']:>8.3f} "
+            f"{(data['db_queries'] or {}).get('mean', 0):>8.1f}"
+        )
+    pipelines = result["pipelines"]
+    print(f"pipelines {pipelines['completed']}/{pipelines['count']} completed, {pipelines['throughput']:.2f}/s")
+    workers = result["workers"]
+    print(f"workers {workers['workers']}: utilization {workers.get('utilization')}, "
+          f"saturated {workers.get('saturated_ratio')}, max waiting {workers.get('max_waiting')}")
+    for error in result["errors"][:5]:
+        print(f"  error {error['step']} {error['status']}: {error['detail']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10, help="동시 사용자 수")
+    parser.add_argument("--iterations", type=int, default=1, help="사용자마다 반복할 흐름 수")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")),
+                        help="gunicorn 워커 수 (기본값: WEB_CONCURRENCY 또는 1)")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="모든 사용자를 시작하는 데 걸리는 시간(초)")
+    parser.add_argument("--no-cache", action="store_true", help="LLM 응답 캐시를 우회 (?no_cache=true)")
+    parser.add_argument("--skip-deploy", action="store_true", help="dind 컨테이너 생성 단계 생략")
+    parser.add_argument("--docker-latency", type=float, default=0.05, help="가짜 Docker 호출당 지연(초)")
+    parser.add_argument("--stub-url", help="외부 LLM 스텁 주소 (예: http://llm-stub:8089/v1)")
+    parser.add_argument("--stub-ttft", type=float, default=0.5)
+    parser.add_argument("--stub-tps", type=float, default=200.0)
+    parser.add_argument("--stub-error-rate", type=float, default=0.0)
+    parser.add_argument("--stub-429-rate", type=float, default=0.0)
+    parser.add_argument("--sample-interval", type=float, default=0.05, help="워커 사용률 샘플링 간격(초)")
+    parser.add_argument("--keep-files", action="store_true", help="생성된 프로젝트 디렉터리를 남김")
+    parser.add_argument("--output", default="temp/benchmark.json", help="결과 JSON 파일")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 파일")
+    parser.add_argument("--max-regression", type=float, help="이 비율(%%)보다 나빠진 지표가 있으면 종료 코드 1")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+    django.setup()
+
+    result = run(args)
+    print_summary(result)
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\nresult: {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            base = json.load(f)
+        regressions = compare(base, result, args.max_regression)
+        if regressions:
+            print("\nregressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
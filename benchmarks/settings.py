@@ -0,0 +1,40 @@
+"""
+부하 벤치마크(benchmarks.pipeline) 전용 설정입니다.
+
+    DJANGO_SETTINGS_MODULE=benchmarks.settings python -m benchmarks.pipeline
+
+기본 설정(config.settings)을 그대로 사용하되
+- BENCHMARK_DATABASE=sqlite(기본값)이면 temp/benchmark.sqlite3 를 매번 새로 만들어 사용하고,
+  default 로 지정하면 DATABASE_* 환경 변수의 MySQL 을 그대로 사용합니다.
+- BENCHMARK_CELERY_EAGER=1(기본값)이면 Celery 작업을 요청 스레드 안에서 바로 실행합니다.
+  0 으로 지정하면 CELERY_BROKER_URL 의 실제 워커로 보냅니다.
+Redis(REDIS_HOST)는 실제 서버가 필요합니다.
+"""
+import os
+
+from config.settings import *  # noqa: F401,F403
+from config.settings import BASE_DIR
+
+ALLOWED_HOSTS = ['*']
+
+if os.getenv('BENCHMARK_DATABASE', 'sqlite') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(BASE_DIR, 'temp', 'benchmark.sqlite3'),
+            'OPTIONS': {'timeout': 60},  # 동시 쓰기 시 잠금 대기
+        }
+    }
+
+    class _NoMigrations(dict):
+        # 저장소에 마이그레이션 파일이 없으므로 모델에서 바로 테이블을 만듭니다. (migrate --run-syncdb)
+        def __contains__(self, app_label):
+            return True
+
+        def __getitem__(self, app_label):
+            return None
+
+    MIGRATION_MODULES = _NoMigrations()
+
+CELERY_TASK_ALWAYS_EAGER = os.getenv('BENCHMARK_CELERY_EAGER', '1') == '1'
+CELERY_TASK_EAGER_PROPAGATES = True
@@ -0,0 +1,112 @@
+"""
+기록된 LLM 스트림으로 SSE 파서를 벤치마크합니다.
+
+    python -m benchmarks.sse_parser [--file 기록.sse] [--repeat 5]
+
+기록 파일을 여러 청크 크기로 잘라서 기존 파서(청크마다 strip/split 후 json.loads)와
+llm.sse 디코더를 비교합니다. 청크 크기별 처리 시간과 복원된 본문이 원본과 같은지를 출력합니다.
+"""
+import argparse
+import json
+import os
+import time
+
+from llm.sse import DONE, delta_content, iter_events
+
+DEFAULT_RECORDING = os.path.join(os.path.dirname(__file__), "data", "chat_completion_stream.sse")
+CHUNK_SIZES = [1, 16, 64, 256, 1024, 4096, 65536]
+
+
+def legacy_parse(chunks):
+    """
+    document/views.py 의 기존 sse() 제너레이터와 같은 방식의 파서
+    """
+    result = ""
+    errors = 0
+    for chunk in chunks:
+        try:
+            chunk = chunk.decode("utf-8").strip()
+        except UnicodeDecodeError:
+            errors += 1
+            continue
+        for line in chunk.split("\n"):
+            line = line.strip()
+            if not line or not line.startswith("data: "):
+                continue
+            data = line[len("data: "):]
+            if data == DONE:
+                return result, errors
+            try:
+                data_json = json.loads(data)
+                content = data_json.get("choices", [{}])[0].get("delta", {}).get("content", "")
+                if content:
+                    result += content
+            except json.JSONDecodeError:
+                errors += 1
+    return result, errors
+
+
+def decoder_parse(chunks):
+    parts = []
+    errors = 0
+    for event in iter_events(chunks):
+        if event.data == DONE:
+            break
+        try:
+            content = delta_content(event.data)
+        except ValueError:
+            errors += 1
+            continue
+        if content:
+            parts.append(content)
+    return "".join(parts), errors
+
+
+def expected_content(raw):
+    parts = []
+    for block in raw.decode("utf-8").split("\n\n"):
+        if block.startswith("data: ") and block[6:] != DONE:
+            choices = json.loads(block[6:])["choices"]
+            parts.append(choices[0]["delta"].get("content") or "")
+    return "".join(parts)
+
+
+def split_chunks(raw, size):
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+
+def measure(parser, chunks, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = parser(chunks)
+        best = min(best, time.perf_counter() - start)
+    return best, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", default=DEFAULT_RECORDING, help="기록된 text/event-stream 응답 파일")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(args.file, "rb") as f:
+        raw = f.read()
+    expected = expected_content(raw)
+    events = raw.count(b"\n\n")
+    print(f"recording: {args.file} ({len(raw)} bytes, {events} events)")
+    print(f"{'chunk':>7} | {'legacy ms':>10} {'ok':>3} {'err':>5} | {'decoder ms':>10} {'ok':>3} {'err':>5} | {'us/event':>8}")
+
+    for size in CHUNK_SIZES:
+        chunks = split_chunks(raw, size)
+        legacy_time, (legacy_text, legacy_errors) = measure(legacy_parse, chunks, args.repeat)
+        decoder_time, (decoder_text, decoder_errors) = measure(decoder_parse, chunks, args.repeat)
+        print(
+            f"{size:>7} | {legacy_time * 1000:>10.2f} {'y' if legacy_text == expected else 'n':>3} {legacy_errors:>5} | "
+            f"{decoder_time * 1000:>10.2f} {'y' if decoder_text == expected else 'n':>3} {decoder_errors:>5} | "
+            f"{decoder_time * 1e6 / events:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
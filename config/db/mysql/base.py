@@ -0,0 +1,46 @@
+"""
+커넥션 풀(config.db.pool)을 사용하는 MySQL 백엔드입니다.
+
+    DATABASES = {"default": {"ENGINE": "config.db.mysql", ..., "POOL": {"SIZE": 10, ...}}}
+
+연결을 열 때 풀에서 꺼내고, 닫을 때(요청/작업 종료, release_connections) 풀에 돌려줍니다.
+POOL 의 키는 SIZE, MAX_OVERFLOW, TIMEOUT, RECYCLE, PRE_PING 입니다.
+"""
+from django.db.backends.mysql import base
+from django.utils.asyncio import async_unsafe
+
+from config.db.pool import PoolTimeout, get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def _pool(self, conn_params):
+        options = self.settings_dict.get("POOL") or {}
+        return get_pool(
+            self.alias,
+            conn_params.get("database"),
+            connect=lambda: super(DatabaseWrapper, self).get_new_connection(conn_params),
+            ping=lambda connection: connection.ping(),
+            size=options.get("SIZE", 10),
+            max_overflow=options.get("MAX_OVERFLOW", 10),
+            timeout=options.get("TIMEOUT", 30),
+            recycle=options.get("RECYCLE", 3600),
+            pre_ping=options.get("PRE_PING", True),
+        )
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        self.pool = self._pool(conn_params)
+        try:
+            return self.pool.checkout()
+        except PoolTimeout as e:
+            raise base.Database.OperationalError(str(e)) from e
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            if self.in_atomic_block:
+                # 트랜잭션 도중 닫으면 Django 가 연결 객체를 계속 들고 있으므로 다른 스레드에 넘기지 않음
+                self.pool.discard(self.connection)
+            else:
+                self.pool.checkin(self.connection)
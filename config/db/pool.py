@@ -0,0 +1,238 @@
+"""
+웹 프로세스(gunicorn)와 Celery 워커가 함께 사용하는 DB 커넥션 풀입니다. (config.db.mysql 백엔드)
+
+Django 는 CONN_MAX_AGE=0 이면 요청/작업이 끝날 때마다 연결을 닫는데,
+이 백엔드는 연결을 닫지 않고 프로세스의 풀에 돌려주고 다음 요청에서 다시 꺼내 씁니다.
+
+    DB_POOL_SIZE          풀에 유지하는 연결 수
+    DB_POOL_MAX_OVERFLOW  풀이 모두 사용 중일 때 추가로 여는 연결 수 (반환되면 닫음)
+    DB_POOL_TIMEOUT       연결을 기다리는 최대 시간(초), 넘으면 OperationalError
+    DB_POOL_RECYCLE       이 시간(초)보다 오래된 연결은 다시 연결 (MySQL wait_timeout 보다 짧게)
+    DB_POOL_PRE_PING      꺼낼 때 ping 으로 확인하고 끊긴 연결은 다시 연결
+
+LLM 호출이나 Celery 결과 대기처럼 오래 기다리는 동안에는 release_connections() 로
+연결을 풀에 돌려줘서 다른 요청이 사용할 수 있게 합니다. (다음 쿼리에서 다시 꺼냄)
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from django.db import connections
+from prometheus_client import REGISTRY, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+WAIT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds", "DB 커넥션 풀에서 연결을 꺼내기까지 기다린 시간", ["alias"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30),
+)
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    스레드 안전한 DB 연결 풀. connect() 로 연결을 만들고 ping(connection) 이 실패하면 끊긴 연결로 봅니다.
+    """
+
+    def __init__(self, alias, connect, ping=None, size=10, max_overflow=10, timeout=30, recycle=3600, pre_ping=True):
+        self.alias = alias
+        self.connect = connect
+        self.ping = ping
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        # prefork 자식 프로세스는 부모의 연결(소켓)을 사용하면 안 되므로 만든 프로세스를 기록
+        self.pid = os.getpid()
+        self.opened = 0
+        self.in_use = 0
+        self.events = {"timeout": 0, "ping_failed": 0, "recycled": 0}
+        self._idle = deque()
+        self._created = {}
+        self._cond = threading.Condition()
+
+    def checkout(self):
+        """
+        풀에서 연결을 꺼냅니다. 남은 연결이 없고 더 열 수도 없으면 timeout 초 동안 기다립니다.
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout
+        connection = None
+        with self._cond:
+            while True:
+                if self._idle:
+                    connection = self._idle.pop()
+                    break
+                if self.opened < self.size + self.max_overflow:
+                    self.opened += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.events["timeout"] += 1
+                    WAIT_SECONDS.labels(self.alias).observe(time.monotonic() - started)
+                    raise PoolTimeout(
+                        f"DB 커넥션 풀({self.alias})에서 {self.timeout}초 안에 연결을 받지 못했습니다. "
+                        f"(사용 중 {self.in_use}/{self.size + self.max_overflow})"
+                    )
+                self._cond.wait(remaining)
+            self.in_use += 1
+        WAIT_SECONDS.labels(self.alias).observe(time.monotonic() - started)
+
+        try:
+            if connection is not None and not self._usable(connection):
+                self._discard(connection)
+                connection = None
+            if connection is None:
+                connection = self.connect()
+                self._created[id(connection)] = time.monotonic()
+        except BaseException:
+            with self._cond:
+                self.opened -= 1
+                self.in_use -= 1
+                self._cond.notify()
+            raise
+        return connection
+
+    def checkin(self, connection):
+        """
+        연결을 풀에 돌려줍니다. 진행 중인 트랜잭션은 롤백하고, 넘친 연결이나 오래된 연결은 닫습니다.
+        """
+        if os.getpid() != self.pid:
+            # 부모 프로세스의 연결: 닫으면 부모의 세션도 끊기므로 버리기만 함
+            return
+        keep = True
+        try:
+            connection.rollback()
+        except Exception as e:
+            logger.warning(f"DB 연결({self.alias}) 반환 중 롤백 실패, 연결을 닫습니다: {e}")
+            keep = False
+        with self._cond:
+            self.in_use -= 1
+            keep = keep and len(self._idle) + self.in_use < self.size and not self._expired(connection)
+            if keep:
+                self._idle.append(connection)
+            else:
+                self.opened -= 1
+            self._cond.notify()
+        if not keep:
+            self._discard(connection)
+
+    def discard(self, connection):
+        """
+        사용 중인 연결을 풀에 돌려주지 않고 닫습니다. (트랜잭션 도중 닫힌 연결 등)
+        """
+        if os.getpid() != self.pid:
+            return
+        with self._cond:
+            self.in_use -= 1
+            self.opened -= 1
+            self._cond.notify()
+        self._discard(connection)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "opened": self.opened,
+                "in_use": self.in_use,
+                "idle": len(self._idle),
+                "events": dict(self.events),
+            }
+
+    def _expired(self, connection):
+        created = self._created.get(id(connection))
+        return self.recycle is not None and created is not None and time.monotonic() - created > self.recycle
+
+    def _usable(self, connection):
+        if self._expired(connection):
+            self._count("recycled")
+            return False
+        if not self.pre_ping or self.ping is None:
+            return True
+        try:
+            self.ping(connection)
+        except Exception as e:
+            logger.info(f"DB 연결({self.alias}) ping 실패, 다시 연결합니다: {e}")
+            self._count("ping_failed")
+            return False
+        return True
+
+    def _count(self, event):
+        with self._cond:
+            self.events[event] += 1
+
+    def _discard(self, connection):
+        self._created.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, key, **options):
+    """
+    현재 프로세스의 (alias, key) 풀을 반환합니다. (처음 호출될 때 생성, fork 된 자식이면 새로 생성)
+    key 는 접속 대상(DB 이름 등)으로, 테스트 DB 생성처럼 같은 alias 로 다른 DB 에 접속하면 풀을 나눕니다.
+    """
+    pool = _pools.get((alias, key))
+    if pool is None or pool.pid != os.getpid():
+        with _pools_lock:
+            pool = _pools.get((alias, key))
+            if pool is None or pool.pid != os.getpid():
+                pool = ConnectionPool(alias, **options)
+                _pools[(alias, key)] = pool
+    return pool
+
+
+def release_connections():
+    """
+    현재 스레드의 DB 연결을 풀에 돌려줍니다. 오래 걸리는 외부 호출(LLM, Celery 결과 대기) 전에 호출하며
+    트랜잭션 안의 연결은 그대로 둡니다. 이후 쿼리를 실행하면 풀에서 다시 꺼냅니다.
+    """
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is not None and not connection.in_atomic_block:
+            connection.close()
+
+
+class DatabasePoolCollector:
+    def describe(self):
+        yield GaugeMetricFamily("db_pool_size", "DB 커넥션 풀 크기 (초과 연결 제외)", labels=["alias", "database"])
+        yield GaugeMetricFamily("db_pool_connections", "열려 있는 DB 연결 수", labels=["alias", "database", "state"])
+        yield GaugeMetricFamily("db_pool_utilization", "사용 중인 연결 수 / 풀 크기", labels=["alias", "database"])
+        yield CounterMetricFamily("db_pool_events", "연결 대기 시간 초과, ping 실패, 재연결 횟수", labels=["alias", "database", "event"])
+
+    def collect(self):
+        size = GaugeMetricFamily("db_pool_size", "DB 커넥션 풀 크기 (초과 연결 제외)", labels=["alias", "database"])
+        opened = GaugeMetricFamily("db_pool_connections", "열려 있는 DB 연결 수", labels=["alias", "database", "state"])
+        utilization = GaugeMetricFamily("db_pool_utilization", "사용 중인 연결 수 / 풀 크기", labels=["alias", "database"])
+        events = CounterMetricFamily("db_pool_events", "연결 대기 시간 초과, ping 실패, 재연결 횟수", labels=["alias", "database", "event"])
+        for (alias, key), pool in list(_pools.items()):
+            if pool.pid != os.getpid():
+                continue
+            stats = pool.stats()
+            labels = [alias, str(key or "")]
+            size.add_metric(labels, stats["size"])
+            opened.add_metric(labels + ["in_use"], stats["in_use"])
+            opened.add_metric(labels + ["idle"], stats["idle"])
+            utilization.add_metric(labels, stats["in_use"] / stats["size"] if stats["size"] else 0)
+            for event, count in stats["events"].items():
+                events.add_metric(labels + [event], count)
+        yield size
+        yield opened
+        yield utilization
+        yield events
+
+
+REGISTRY.register(DatabasePoolCollector())
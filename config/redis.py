@@ -0,0 +1,27 @@
+import asyncio
+import weakref
+
+import redis
+import redis.asyncio
+from django.conf import settings
+
+# 웹 프로세스와 Celery 워커가 공유하는 Redis 클라이언트 (프로세스별 커넥션 풀)
+redis_client = redis.StrictRedis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, decode_responses=True)
+
+# 바이트를 그대로 주고받아야 하는 경우(LLM 스트림 청크 등)에 사용
+raw_redis_client = redis.StrictRedis(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
+
+# ASGI 모드에서 사용하는 비동기 클라이언트 (이벤트 루프마다 하나)
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_redis_client():
+    """
+    현재 이벤트 루프의 비동기 Redis 클라이언트를 반환합니다. (raw_redis_client 와 같이 바이트를 반환)
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = redis.asyncio.StrictRedis(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
+        _async_clients[loop] = client
+    return client
@@ -4,11 +4,19 @@ import docker
 from celery import shared_task
 from docker.errors import NotFound
 
-@shared_task
-def create_dind_task(github_name, github_url, repo_name, base_domain):
+from progress import events as progress
+
+
+@shared_task(bind=True)
+def create_dind_task(self, github_name, github_url, repo_name, base_domain, user_id=None):
     client = docker.from_env()
     container_name = f"{github_name}-dind"
 
+    def report(stage, percent, message=None, done=False):
+        # 요청한 사용자의 진행 이벤트 스트림에 기록 (progress.events)
+        if user_id is not None:
+            progress.publish(self.request.id, user_id, f"dind.{stage}", percent, message=message, done=done)
+
     try:
         # DIND 컨테이너 생성
         container1 = client.containers.run(
@@ -29,6 +37,7 @@ def create_dind_task(github_name, github_url, repo_name, base_domain):
             network = "directory_DevSketch-Net",
         )
 
+        report("container_created", 20)
         #container = client.containers.get(container_name)
 
         # 도커 데몬 준비 대기
@@ -51,6 +60,7 @@ def create_dind_task(github_name, github_url, repo_name, base_domain):
         if exit_code != 0:
             raise Exception({output.decode()})
 
+        report("cloned", 40)
         time.sleep(3)
 
         print("작업실행2")
@@ -60,6 +70,7 @@ def create_dind_task(github_name, github_url, repo_name, base_domain):
         if exit_code != 0:
             raise Exception({output.decode()})
 
+        report("repository_checked", 55)
         time.sleep(3)
 
         print("작업실행3")
@@ -69,6 +80,7 @@ def create_dind_task(github_name, github_url, repo_name, base_domain):
         if exit_code != 0:
             raise Exception({output.decode()})
 
+        report("compose_checked", 70)
         time.sleep(5)
         client = docker.from_env()
         container = client.containers.get(container_name)
@@ -87,7 +99,9 @@ def create_dind_task(github_name, github_url, repo_name, base_domain):
         if exit_code != 0:
             raise Exception({output.decode()})
 
+        report("completed", 100, done=True)
         return {"message": "도커 컨테이너 생성 및 서비스 실행 성공"}
 
     except Exception as e:
+        report("failed", 100, message=e, done=True)
         return {"error": str(e)}
\ No newline at end of file
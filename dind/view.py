@@ -2,8 +2,8 @@ import logging
 import time
 import os
 
-import redis
 import docker
+from celery.utils import uuid
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
@@ -11,6 +11,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from dind.tasks import create_dind_task
+from progress import events as progress
 
 from dind.serializers import CreateDindSerializer
 
@@ -150,9 +151,6 @@ def wait_for_docker(container):
 
 #-----------------------------------------------------------------------------------
 
-# Redis 클라이언트 생성
-redis_client = redis.Redis(host="redis", port=6379, decode_responses=True)
-
 @swagger_auto_schema(
     methods=['POST'],
     operation_summary="도커 컨테이너 생성 API",
@@ -173,23 +171,17 @@ def create_dind_task_view(request):
         repo_name = serializer.validated_data.get("repo_name")
         base_domain = os.environ.get("BASE_DOMAIN", "localhost")
 
-        # Celery 태스크 호출
+        # 진행 이벤트를 먼저 기록한 뒤 Celery 태스크 호출 (작업 이벤트가 queued 보다 앞서지 않도록 task_id 를 미리 생성)
+        task_id = uuid()
+        progress.publish(task_id, request.user.id, "dind.queued", 0, message=f"{github_name} 프로젝트 도커 컨테이너 생성")
         task = create_dind_task.apply_async(
-            args=(github_name, github_url, repo_name, base_domain)
-        )# Redis에 알림 전송
-        try:
-            redis_client.publish(
-                "task_updates",
-                f"Task {task.id} 시작됨: {github_name} 프로젝트 도커 컨테이너 생성"
-            )
-        except Exception as e:
-            return Response(
-                {"error": f"Redis 알림 실패: {str(e)}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+            args=(github_name, github_url, repo_name, base_domain),
+            kwargs={"user_id": request.user.id},
+            task_id=task_id,
+        )
 
         return Response(
-            {"message": "작업 시작됨", "task_id": task.id},
+            {"message": "작업 시작됨", "task_id": task.id, "progress_url": f"/api/v1/progress/?job={task.id}"},
             status=status.HTTP_202_ACCEPTED,
         )
 
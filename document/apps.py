@@ -1,6 +1,23 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save
 
 
 class DocumentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'document'
+
+    def ready(self):
+        from prometheus_client import REGISTRY
+        from document import cache
+        from document.metrics import DocumentCacheCollector
+        from document.models import Document
+        from document.search import ensure_fulltext_index
+
+        # MySQL 문서 검색용 FULLTEXT 인덱스 (Django 모델 Meta 로 만들 수 없음)
+        post_migrate.connect(ensure_fulltext_index, sender=self)
+
+        # 문서가 바뀌면 문서 캐시 무효화
+        post_save.connect(cache.on_document_changed, sender=Document, dispatch_uid="document_cache_save")
+        post_delete.connect(cache.on_document_changed, sender=Document, dispatch_uid="document_cache_delete")
+
+        REGISTRY.register(DocumentCacheCollector())
@@ -0,0 +1,121 @@
+"""
+ASGI 모드(SERVER_MODE=asgi)에서 사용하는 문서 스트리밍 뷰입니다.
+
+동기 뷰는 LLM 생성이 끝날 때까지 gunicorn 워커 하나를 점유하지만,
+이 뷰들은 이벤트 루프 위에서 비동기 HTTP 클라이언트로 스트리밍하므로
+한 프로세스가 수백 개의 문서 스트림을 동시에 유지할 수 있습니다.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_http_methods
+from rest_framework import exceptions
+from rest_framework.settings import api_settings
+
+from document import cache as document_cache
+from document import jobs, streams
+from document.models import Document
+from document.prompts import build_stream_prompt, build_update_prompt
+
+
+def _authenticate(request):
+    # DRF 설정의 인증 클래스(쿠키 JWT → 헤더 JWT)를 순서대로 적용합니다.
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        result = authentication_class().authenticate(request)
+        if result is not None:
+            return result[0]
+    return None
+
+
+async def get_request_user(request):
+    try:
+        return await sync_to_async(_authenticate)(request)
+    except exceptions.APIException:
+        return None
+
+
+async def _sse_response(request, prompt, document):
+    # 생성은 연결과 분리되어 진행되고, 같은 문서를 여는 다른 연결은 진행 중인 생성을 처음부터 받음
+    # Last-Event-ID 로 다시 연결하면 이어 받음 (document.streams)
+    try:
+        sse = await streams.astream(document, prompt, request.headers.get("Last-Event-ID"))
+    except streams.Busy:
+        return JsonResponse({"status": "error", "message": "다른 요청으로 문서를 생성하고 있습니다."}, status=409)
+    response = StreamingHttpResponse(sse, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["Access-Control-Allow-Origin"] = "https://devsketch.xyz"
+    return response
+
+
+#----------------------------------------------------------
+# 문서결과 스트리밍 api (ASGI)
+@require_GET
+async def stream_document(request, document_id):
+    user = await get_request_user(request)
+    if user is None:
+        return JsonResponse({"status": "error", "message": "인증이 필요합니다."}, status=401)
+
+    try:
+        document = await document_cache.aget_document(document_id, user.id)
+    except Document.DoesNotExist:
+        return JsonResponse({"status": "error", "message": "문서를 찾을 수 없습니다."}, status=404)
+
+    return await _sse_response(request, build_stream_prompt(document), document)
+
+
+#----------------------------------------------------------
+# 수정사항 문서결과 스트리밍 api (ASGI)
+@csrf_exempt
+@require_http_methods(["PUT"])
+async def update_stream_document(request, document_id):
+    user = await get_request_user(request)
+    if user is None:
+        return JsonResponse({"status": "error", "message": "인증이 필요합니다."}, status=401)
+
+    try:
+        modifications = json.loads(request.body or b"{}").get("modifications", "")
+    except (ValueError, AttributeError):
+        return JsonResponse({"status": "error", "message": "잘못된 요청 본문입니다."}, status=400)
+
+    try:
+        # 수정 프롬프트는 기존 결과(result)를 포함
+        document = await document_cache.aget_document(document_id, user.id, preload=("result",))
+    except Document.DoesNotExist:
+        return JsonResponse({"status": "error", "message": "문서를 찾을 수 없습니다."}, status=404)
+
+    return await _sse_response(request, build_update_prompt(document, modifications), document)
+
+
+#----------------------------------------------------------
+# 설계 생성 작업 진행 상황 / 산출물 실시간 스트리밍 SSE api (ASGI)
+@require_GET
+async def design_job_events(request, job_id):
+    return await _design_job_sse(request, job_id, tokens=False)
+
+
+@require_GET
+async def design_job_stream(request, job_id):
+    return await _design_job_sse(request, job_id, tokens=True)
+
+
+async def _design_job_sse(request, job_id, tokens):
+    user = await get_request_user(request)
+    if user is None:
+        return JsonResponse({"status": "error", "message": "인증이 필요합니다."}, status=401)
+
+    job = await sync_to_async(jobs.get)(job_id)
+    if job is None or job["user_id"] != user.id:
+        return JsonResponse({"status": "error", "message": "설계 생성 작업을 찾을 수 없습니다."}, status=404)
+
+    last_id = request.headers.get("Last-Event-ID") or "0"
+
+    async def sse():
+        async for event_id, fields in jobs.aiter_events(job_id, last_id, tokens=tokens):
+            yield jobs.to_sse(event_id, fields)
+
+    response = StreamingHttpResponse(sse(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["Access-Control-Allow-Origin"] = "https://devsketch.xyz"
+    return response
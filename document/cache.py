@@ -0,0 +1,235 @@
+"""
+문서 조회의 2단계 read-through 캐시입니다.
+
+    1단계  프로세스 메모리 LRU (DOCUMENT_CACHE_LOCAL_SIZE 항목)
+    2단계  Redis (CACHES["default"], DOCUMENT_CACHE_TTL 초)
+    둘 다 없으면 DB 에서 읽어 두 단계에 저장
+
+    row     Document 행의 컬럼 (get_document: 디자인/스트리밍 뷰의 문서 조회)
+    detail  DocumentIDView.get 응답 (get_detail, fields 조합별)
+    etag    DocumentIDView.get 응답의 ETag (get_etag, document.conditional)
+
+문서마다 세대(generation) 값을 Redis 에 두고 캐시 키의 version 으로 사용합니다.
+문서가 바뀌면(post_save / post_delete, 쿼리셋 update 는 invalidate 직접 호출) 세대를 바꿔서
+이전 세대의 항목은 모든 프로세스에서 더 이상 읽히지 않습니다.
+세대 값은 프로세스 메모리에도 DOCUMENT_CACHE_GENERATION_TTL 초 동안 두므로 1단계 적중은 Redis 를 거치지 않습니다.
+그래서 다른 프로세스에서 바뀐 문서는 최대 그 시간만큼 늦게 반영됩니다. (같은 프로세스의 변경은 바로 반영)
+DB 에서 읽는 도중 문서가 바뀌어도 읽기 전에 확인한 (이전) 세대로 저장되므로 오래된 내용이 새 세대로 읽히지 않고,
+트랜잭션 안에서 바뀐 경우 커밋 후에 세대를 한 번 더 바꿔서 커밋 전에 다시 채워진 항목도 버립니다.
+Redis 를 사용할 수 없으면 캐시 없이 DB 에서 읽습니다.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from prometheus_client import Histogram
+
+from document.models import Document
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("row", "detail", "etag")
+
+READ_SECONDS = Histogram(
+    "document_cache_read_seconds", "문서 캐시 조회 시간", ["kind", "result"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+
+class LocalCache:
+    """
+    스레드 안전한 LRU. 항목은 (세대, 값)이며 세대가 다르면 없는 것으로 봅니다.
+    문서별 세대 값도 generation_ttl 초 동안 함께 둡니다.
+    """
+
+    def __init__(self, maxsize, generation_ttl):
+        self.maxsize = maxsize
+        self.generation_ttl = generation_ttl
+        self._items = OrderedDict()
+        self._generations = OrderedDict()
+        self._lock = threading.Lock()
+
+    def generation(self, document_id):
+        with self._lock:
+            item = self._generations.get(document_id)
+            if item is None or item[1] <= time.monotonic():
+                return None
+            return item[0]
+
+    def set_generation(self, document_id, generation):
+        with self._lock:
+            self._generations[document_id] = (generation, time.monotonic() + self.generation_ttl)
+            self._generations.move_to_end(document_id)
+            while len(self._generations) > self.maxsize:
+                self._generations.popitem(last=False)
+
+    def get(self, key, generation):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[0] != generation:
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def set(self, key, generation, value):
+        with self._lock:
+            self._items[key] = (generation, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def discard(self, document_id):
+        with self._lock:
+            self._generations.pop(document_id, None)
+            for key in [key for key in self._items if key[1] == document_id]:
+                del self._items[key]
+
+    def __len__(self):
+        return len(self._items)
+
+
+local = LocalCache(settings.DOCUMENT_CACHE_LOCAL_SIZE, settings.DOCUMENT_CACHE_GENERATION_TTL)
+
+# 조회 결과별 횟수 {kind: {"local": n, "redis": n, "miss": n}} (document.metrics)
+_counts = {kind: {"local": 0, "redis": 0, "miss": 0} for kind in KINDS}
+_counts_lock = threading.Lock()
+
+
+def stats():
+    with _counts_lock:
+        return {kind: dict(counts) for kind, counts in _counts.items()}
+
+
+def _generation_key(document_id):
+    return f"document:{document_id}:generation"
+
+
+def _key(kind, document_id, variant=None):
+    if variant:
+        return f"document:{document_id}:{kind}:{variant}"
+    return f"document:{document_id}:{kind}"
+
+
+def _record(kind, result, started):
+    with _counts_lock:
+        _counts[kind][result] += 1
+    READ_SECONDS.labels(kind, result).observe(time.perf_counter() - started)
+
+
+def _read_through(kind, document_id, loader, variant=None):
+    started = time.perf_counter()
+    generation = local.generation(document_id)
+    if generation is None:
+        try:
+            # 세대 값이 없으면(처음 조회하거나 Redis 에서 제거됨) 새 세대로 시작
+            generation = cache.get_or_set(_generation_key(document_id), time.time_ns, timeout=None)
+        except redis.RedisError as e:
+            logger.warning(f"문서 {document_id} 캐시 세대 조회 실패: {e}")
+            value = loader()
+            _record(kind, "miss", started)
+            return value
+        local.set_generation(document_id, generation)
+
+    local_key = (kind, document_id, variant)
+    value = local.get(local_key, generation)
+    if value is not None:
+        _record(kind, "local", started)
+        return value
+
+    try:
+        value = cache.get(_key(kind, document_id, variant), version=generation)
+    except redis.RedisError as e:
+        logger.warning(f"문서 {document_id} 캐시 조회 실패: {e}")
+    if value is not None:
+        local.set(local_key, generation, value)
+        _record(kind, "redis", started)
+        return value
+
+    value = loader()
+    try:
+        cache.set(_key(kind, document_id, variant), value, timeout=settings.DOCUMENT_CACHE_TTL, version=generation)
+    except redis.RedisError as e:
+        logger.warning(f"문서 {document_id} 캐시 저장 실패: {e}")
+    local.set(local_key, generation, value)
+    _record(kind, "miss", started)
+    return value
+
+
+def _load_row(document_id):
+    names = [field.attname for field in Document._meta.concrete_fields]
+    values = Document.objects.filter(id=document_id).values_list(*names).first()
+    if values is None:
+        raise Document.DoesNotExist("Document matching query does not exist.")
+    return names, values
+
+
+def get_document(document_id, user_id=None):
+    """
+    삭제되지 않은 문서를 캐시에서 읽어 Document 로 반환합니다. user_id 를 지정하면 그 사용자의 문서만 반환
+    없으면 Document.DoesNotExist 를 발생시킵니다. (산출물은 읽을 때 조회)
+    """
+    names, values = _read_through("row", document_id, lambda: _load_row(document_id))
+    document = Document.from_db(connection.alias, names, values)
+    if user_id is not None and document.user_id_id != user_id:
+        raise Document.DoesNotExist("Document matching query does not exist.")
+    return document
+
+
+async def aget_document(document_id, user_id=None, preload=()):
+    """
+    get_document 의 비동기 버전입니다. preload 의 산출물은 이벤트 루프 밖에서 미리 읽어 둡니다.
+    (산출물을 처음 읽을 때 실행되는 쿼리는 이벤트 루프에서 실행할 수 없음)
+    """
+    def load():
+        document = get_document(document_id, user_id)
+        if preload:
+            document.load_artifacts(*preload)
+        return document
+
+    return await sync_to_async(load)()
+
+
+def get_detail(document_id, loader, fields=None):
+    """
+    문서 상세 응답을 캐시에서 읽고, 없으면 loader() 의 결과를 저장해서 반환합니다. (fields 조합마다 따로 저장)
+    loader 가 Document.DoesNotExist 를 발생시키면 저장하지 않고 그대로 발생시킵니다.
+    """
+    return _read_through("detail", document_id, loader, ",".join(fields) if fields else None)
+
+
+def get_etag(document_id, loader):
+    """
+    문서 상세 응답의 ETag 를 캐시에서 읽고, 없으면 loader() 의 결과를 저장해서 반환합니다.
+    """
+    return _read_through("etag", document_id, loader)
+
+
+def _bump(document_id):
+    local.discard(document_id)
+    generation = time.time_ns()
+    try:
+        cache.set(_generation_key(document_id), generation, timeout=None)
+    except redis.RedisError as e:
+        logger.error(f"문서 {document_id} 캐시 무효화 실패: {e}")
+        return
+    local.set_generation(document_id, generation)
+
+
+def invalidate(document_id):
+    """
+    문서의 캐시 항목을 무효화합니다. (트랜잭션 안이면 커밋 후에 한 번 더)
+    """
+    _bump(document_id)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _bump(document_id))
+
+
+def on_document_changed(sender, instance, **kwargs):
+    # post_save / post_delete 수신
+    invalidate(instance.pk)
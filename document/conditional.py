@@ -0,0 +1,86 @@
+"""
+문서 조회 API 의 ETag / 조건부 GET(If-None-Match -> 304)입니다.
+
+ETag 는 문서의 updated_at 과 산출물 내용 해시(DocumentArtifact.sha256)로 만든 강한 ETag 이며,
+큰 산출물(result, api_code 등)을 읽지 않고 계산합니다.
+클라이언트가 같은 ETag 를 If-None-Match 로 보내면 본문 없이 304 를 반환하므로
+폴링할 때 변경이 없으면 헤더만 주고받습니다.
+Cache-Control 은 DOCUMENT_CACHE_CONTROL (기본 private, no-cache: 사용자별 응답이며 매번 재검증)입니다.
+"""
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+
+from document import cache as document_cache
+from document.models import DocumentArtifact
+
+# DocumentIDView.get 응답에 들어가는 산출물과 저장 여부 플래그
+DETAIL_ARTIFACTS = (
+    ("erd_code", "is_erd_saved"),
+    ("diagram_code", "is_diagram_saved"),
+    ("api_code", "is_api_saved"),
+)
+DETAIL_FIELDS = tuple(name for name, _ in DETAIL_ARTIFACTS)
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()[:32])
+
+
+def _detail_etag(document_id):
+    document = document_cache.get_document(document_id)
+    names = [name for name, flag in DETAIL_ARTIFACTS if getattr(document, flag)]
+    hashes = dict(DocumentArtifact.objects.filter(document_id=document_id, name__in=names).values_list("name", "sha256"))
+    return make_etag(
+        "detail", document.id, document.updated_at.isoformat(),
+        *[f"{name}={hashes.get(name, '')}" for name in names],
+    )
+
+
+def detail_etag(document_id, fields=None):
+    """
+    DocumentIDView.get 응답의 ETag (문서 캐시에 저장, 없는 문서면 Document.DoesNotExist)
+    fields 로 산출물을 고른 응답은 표현이 다르므로 다른 ETag 를 사용합니다.
+    """
+    etag = document_cache.get_etag(document_id, lambda: _detail_etag(document_id))
+    return make_etag(etag, *fields) if fields else etag
+
+
+def list_etag(rows, next_cursor, artifact=None, preview=None):
+    """
+    목록 한 페이지의 ETag. rows 는 id, updated_at 을 담은 목록이며 artifact 를 지정하면 그 산출물의 해시도 반영합니다.
+    """
+    hashes = {}
+    if artifact:
+        hashes = dict(DocumentArtifact.objects.filter(
+            document_id__in=[row["id"] for row in rows], name=artifact,
+        ).values_list("document_id", "sha256"))
+    return make_etag(
+        "list", next_cursor, preview,
+        *[f"{row['id']}:{row['updated_at'].isoformat()}:{hashes.get(row['id'], '')}" for row in rows],
+    )
+
+
+def not_modified(request, etag, vary=None):
+    """
+    If-None-Match 가 etag 와 일치하면 304 응답, 아니면 None
+    """
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return None
+    # If-None-Match 는 약한 비교 (W/ 접두어 무시)
+    etags = [tag.removeprefix("W/") for tag in parse_etags(header)]
+    if "*" not in etags and etag not in etags:
+        return None
+    return set_headers(HttpResponseNotModified(), etag, vary)
+
+
+def set_headers(response, etag, vary=None):
+    response["ETag"] = etag
+    response["Cache-Control"] = settings.DOCUMENT_CACHE_CONTROL
+    if vary:
+        patch_vary_headers(response, vary)
+    return response
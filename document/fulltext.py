@@ -0,0 +1,86 @@
+"""
+문서 검색(document.search)의 토큰화와 하이라이트입니다.
+
+MySQL FULLTEXT ngram 파서(ngram_token_size=2)와 같은 방식으로 단어를 2글자 단위로 나눕니다.
+한국어처럼 띄어쓰기와 형태소가 일치하지 않는 텍스트도 형태소 분석 없이 부분 일치로 찾을 수 있습니다.
+    "문서검색"  -> 문서, 서검, 검색
+    "db"        -> db   (2글자 이하 단어는 그대로)
+"""
+import html
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+
+# 검색 대상 필드와 점수 가중치
+SEARCH_FIELDS = ("title", "content", "requirements", "result")
+FIELD_WEIGHTS = {"title": 3, "content": 1, "requirements": 1, "result": 1}
+
+NGRAM_SIZE = 2
+
+_WORD = re.compile(r"\w+")
+
+
+def backend(using=None):
+    """
+    검색 방식: "mysql" (FULLTEXT ngram) 또는 "python" (DocumentSearchTerm 역색인)
+    DOCUMENT_SEARCH_BACKEND 가 비어 있으면 DB 종류에 따라 정합니다.
+    """
+    return settings.DOCUMENT_SEARCH_BACKEND or ("mysql" if connections[using or "default"].vendor == "mysql" else "python")
+
+
+def words(text):
+    return _WORD.findall((text or "").lower())
+
+
+def terms(text):
+    """
+    텍스트의 2-gram 토큰별 등장 횟수
+    """
+    counts = Counter()
+    for word in words(text):
+        if len(word) <= NGRAM_SIZE:
+            counts[word] += 1
+            continue
+        for i in range(len(word) - NGRAM_SIZE + 1):
+            counts[word[i:i + NGRAM_SIZE]] += 1
+    return counts
+
+
+def document_terms(texts):
+    """
+    문서 필드별 텍스트({필드: 텍스트})의 가중치를 반영한 토큰별 점수
+    """
+    counts = Counter()
+    for field, text in texts.items():
+        weight = FIELD_WEIGHTS.get(field, 1)
+        for term, count in terms(text).items():
+            counts[term] += count * weight
+    return counts
+
+
+def highlight(text, query, chars):
+    """
+    검색어가 처음 나오는 곳 주변 chars 글자를 검색어를 <em> 으로 감싸서 반환합니다. (HTML 이스케이프, 없으면 None)
+    """
+    keywords = sorted(set(words(query)), key=len, reverse=True)
+    if not text or not keywords:
+        return None
+    pattern = re.compile("|".join(re.escape(keyword) for keyword in keywords), re.IGNORECASE)
+    match = pattern.search(text)
+    if match is None:
+        return None
+
+    start = max(0, match.start() - chars // 2)
+    end = min(len(text), start + chars)
+    start = max(0, end - chars)
+    snippet = text[start:end]
+    parts = []
+    last = 0
+    for match in pattern.finditer(snippet):
+        parts.append(html.escape(snippet[last:match.start()]))
+        parts.append(f"<em>{html.escape(match.group())}</em>")
+        last = match.end()
+    parts.append(html.escape(snippet[last:]))
+    return ("…" if start > 0 else "") + "".join(parts) + ("…" if end < len(text) else "")
@@ -0,0 +1,316 @@
+"""
+설계 생성(dev_document) 작업의 상태와 진행 이벤트입니다.
+
+POST /documents/<id>/design 은 chord 를 시작하고 job_id 를 바로 돌려주므로 웹 워커가 LLM 응답을 기다리지 않습니다.
+create_diagram/create_erd/create_api 는 시작/완료/실패할 때마다 산출물별 상태를 기록하고,
+생성 중인 토큰도 같은 작업 스트림에 추가합니다. save_design 이 결과를 Document 에 저장하면 작업이 끝납니다.
+
+    design:job:<job_id>             해시 (document_id, user_id, created_at, diagram/erd/api 상태, status, error)
+    design:job:<job_id>:events      스트림 (job, stage, artifact, status, percent, ts, error) 또는 (artifact, delta)
+                                    SSE 로 전달하며 Last-Event-ID 로 이어 받기
+                                    상태 이벤트는 사용자 진행 이벤트 스트림(progress.events)에도 기록
+    design:document:<document_id>   진행 중인 job_id (같은 문서로 중복 실행 방지)
+"""
+import json
+import logging
+import time
+import uuid
+
+import redis
+from django.conf import settings
+
+from config.redis import get_async_redis_client, redis_client
+from progress import events as progress
+
+JOB_PREFIX = "design:job:"
+DOCUMENT_PREFIX = "design:document:"
+
+ARTIFACTS = ("diagram", "erd", "api")
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCESS = "success"
+FAILURE = "failure"
+
+# 상태 -> 사용자 진행 이벤트(progress.events)의 단계 이름
+STAGES = {RUNNING: "started", SUCCESS: "completed", FAILURE: "failed"}
+
+logger = logging.getLogger(__name__)
+
+# 자신의 작업이 잡은 문서 키일 때만 해제
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _key(job_id):
+    return f"{JOB_PREFIX}{job_id}"
+
+
+def _events_key(job_id):
+    return f"{JOB_PREFIX}{job_id}:events"
+
+
+def create(document_id, user_id):
+    """
+    새 작업을 만들고 (job_id, True)를 반환합니다.
+    같은 문서의 작업이 이미 진행 중이면 그 작업의 (job_id, False)를 반환합니다.
+    문서 키는 SET NX 로 잡으므로 동시에 요청해도(더블 클릭, 재시도) 작업은 하나만 시작됩니다.
+    """
+    document_key = f"{DOCUMENT_PREFIX}{document_id}"
+    job_id = uuid.uuid4().hex
+    fields = {
+        "document_id": document_id,
+        "user_id": user_id,
+        "created_at": time.time(),
+    }
+    fields.update({artifact: PENDING for artifact in ARTIFACTS})
+
+    # 문서 키를 잡기 전에 작업을 기록해서, 키를 본 다른 요청이 진행 중인 작업으로 읽을 수 있게 함
+    pipe = redis_client.pipeline()
+    pipe.hset(_key(job_id), mapping=fields)
+    pipe.expire(_key(job_id), settings.DESIGN_JOB_TTL)
+    pipe.execute()
+
+    while not redis_client.set(document_key, job_id, nx=True, ex=settings.DESIGN_JOB_TIMEOUT):
+        running = redis_client.get(document_key)
+        if running is None:
+            continue
+        job = get(running)
+        if job and job["status"] in (PENDING, RUNNING):
+            redis_client.delete(_key(job_id))
+            return running, False
+        # 끝났거나 만료된 작업의 키가 남아 있음: 그 작업의 키일 때만 지우고 다시 시도
+        redis_client.eval(_RELEASE_LUA, 1, document_key, running)
+    progress.publish(job_id, user_id, "design.started", 0)
+    return job_id, True
+
+
+def _stage(artifact, status):
+    # 예: erd.completed, design.failed
+    return f"{artifact or 'design'}.{STAGES[status]}"
+
+
+def _percent(artifacts, status, artifact):
+    # 산출물 하나가 끝날 때마다 30%, 저장까지 끝나면 100%
+    if artifact is None and status == SUCCESS:
+        return 100
+    return 30 * sum(1 for state in artifacts.values() if state == SUCCESS)
+
+
+def record(job_id, status, artifact=None, error=None):
+    """
+    산출물(artifact) 또는 작업 전체의 상태를 기록하고 진행률(percent)을 담은 이벤트를 작업 스트림에 추가합니다.
+    같은 이벤트를 작업을 시작한 사용자의 진행 이벤트 스트림(progress.events)에도 기록합니다.
+    산출물 하나가 실패하면 chord 콜백이 실행되지 않으므로 작업 전체도 실패로 기록합니다.
+    """
+    events = []
+    fields = {}
+    if artifact:
+        fields[artifact] = status
+        events.append({"artifact": artifact, "status": status})
+    if artifact is None or status == FAILURE:
+        fields["status"] = status
+        events.append({"status": status})
+    if error:
+        fields["error"] = str(error)
+        for event in events:
+            event["error"] = str(error)
+
+    pipe = redis_client.pipeline()
+    pipe.hset(_key(job_id), mapping=fields)
+    pipe.hgetall(_key(job_id))
+    data = pipe.execute()[1]
+
+    percent = _percent({name: data.get(name, PENDING) for name in ARTIFACTS}, status, artifact)
+    ts = int(time.time() * 1000)
+    pipe = redis_client.pipeline()
+    for event in events:
+        event.update(job=job_id, stage=_stage(event.get("artifact"), status), percent=percent, ts=ts)
+        pipe.xadd(_events_key(job_id), event, maxlen=settings.DESIGN_JOB_STREAM_MAXLEN, approximate=True)
+    pipe.expire(_events_key(job_id), settings.DESIGN_JOB_TTL)
+    pipe.execute()
+
+    if data.get("user_id"):
+        progress.publish(
+            job_id, int(data["user_id"]), _stage(artifact, status), percent,
+            message=error, done=artifact is None or status == FAILURE,
+        )
+
+
+class ArtifactStream:
+    """
+    산출물을 생성하는 동안 도착한 텍스트 조각을 작업 스트림에 추가합니다.
+    조각마다 XADD 하지 않고 DESIGN_STREAM_FLUSH_CHARS 글자 또는 DESIGN_STREAM_FLUSH_INTERVAL 초마다 모아서 보냅니다.
+    Redis 오류가 나면 더 보내지 않고 생성은 계속합니다.
+    """
+
+    def __init__(self, job_id, artifact):
+        self.job_id = job_id
+        self.artifact = artifact
+        self._parts = []
+        self._size = 0
+        self._flushed_at = time.monotonic()
+        self._failed = False
+
+    def write(self, text):
+        self._parts.append(text)
+        self._size += len(text)
+        if (self._size >= settings.DESIGN_STREAM_FLUSH_CHARS
+                or time.monotonic() - self._flushed_at >= settings.DESIGN_STREAM_FLUSH_INTERVAL):
+            self.flush()
+
+    def flush(self):
+        delta = "".join(self._parts)
+        self._parts = []
+        self._size = 0
+        self._flushed_at = time.monotonic()
+        if not delta or self._failed:
+            return
+        try:
+            redis_client.xadd(
+                _events_key(self.job_id), {"artifact": self.artifact, "delta": delta},
+                maxlen=settings.DESIGN_JOB_STREAM_MAXLEN, approximate=True,
+            )
+        except redis.RedisError as e:
+            self._failed = True
+            logger.warning(f"설계 작업 {self.job_id} 토큰 전달 실패: {e}")
+
+    def close(self):
+        self.flush()
+
+
+def finish(job_id, document_id, status, error=None):
+    record(job_id, status, error=error)
+    redis_client.eval(_RELEASE_LUA, 1, f"{DOCUMENT_PREFIX}{document_id}", job_id)
+
+
+def _parse(job_id, data):
+    if not data:
+        return None
+    artifacts = {artifact: data.get(artifact, PENDING) for artifact in ARTIFACTS}
+    status = data.get("status")
+    error = data.get("error")
+    created_at = float(data["created_at"])
+
+    if status not in (SUCCESS, FAILURE):
+        if any(state == FAILURE for state in artifacts.values()):
+            status = FAILURE
+        elif time.time() - created_at > settings.DESIGN_JOB_TIMEOUT:
+            status, error = FAILURE, f"설계 생성 시간 초과 ({settings.DESIGN_JOB_TIMEOUT}s)"
+        elif any(state != PENDING for state in artifacts.values()):
+            status = RUNNING
+        else:
+            status = PENDING
+
+    return {
+        "job_id": job_id,
+        "document_id": int(data["document_id"]),
+        "user_id": int(data["user_id"]),
+        "status": status,
+        "artifacts": artifacts,
+        "error": error,
+        "created_at": created_at,
+    }
+
+
+def get(job_id):
+    """
+    작업 상태를 반환합니다. 없거나 만료되었으면 None
+    """
+    return _parse(job_id, redis_client.hgetall(_key(job_id)))
+
+
+def is_finished(job):
+    return job is None or job["status"] in (SUCCESS, FAILURE)
+
+
+def _is_last(fields):
+    return "artifact" not in fields and fields.get("status") in (SUCCESS, FAILURE)
+
+
+def _timeout_event(job):
+    return {
+        "job": job["job_id"], "stage": _stage(None, job["status"]), "status": job["status"],
+        "ts": int(time.time() * 1000), "error": job["error"] or "",
+    }
+
+
+def iter_events(job_id, last_id="0", tokens=False):
+    """
+    작업 이벤트를 (event_id, fields) 로 yield 합니다. (last_id 이후부터, tokens=True 이면 토큰 조각 포함)
+    새 이벤트 없이 1초가 지나면 (None, None)을 yield 하며(연결 유지용), 작업이 끝나면 멈춥니다.
+    """
+    while True:
+        entries = redis_client.xread({_events_key(job_id): last_id}, count=100, block=1000)
+        for _, items in entries or []:
+            for event_id, fields in items:
+                last_id = event_id
+                if "delta" in fields and not tokens:
+                    continue
+                yield event_id, fields
+                if _is_last(fields):
+                    return
+        if not entries:
+            job = get(job_id)
+            if is_finished(job):
+                # 시간 초과 등 이벤트가 남지 않은 종료
+                if job is not None:
+                    yield None, _timeout_event(job)
+                return
+            yield None, None
+
+
+async def aiter_events(job_id, last_id="0", tokens=False):
+    """
+    iter_events 의 비동기 버전입니다. (ASGI 모드)
+    """
+    client = get_async_redis_client()
+    while True:
+        entries = await client.xread({_events_key(job_id): last_id}, count=100, block=1000)
+        for _, items in entries or []:
+            for event_id, fields in items:
+                event_id = event_id.decode()
+                fields = {key.decode(): value.decode() for key, value in fields.items()}
+                last_id = event_id
+                if "delta" in fields and not tokens:
+                    continue
+                yield event_id, fields
+                if _is_last(fields):
+                    return
+        if not entries:
+            job = _parse(job_id, {
+                key.decode(): value.decode() for key, value in (await client.hgetall(_key(job_id))).items()
+            })
+            if is_finished(job):
+                if job is not None:
+                    yield None, _timeout_event(job)
+                return
+            yield None, None
+
+
+def to_sse(event_id, fields):
+    """
+    iter_events 의 이벤트를 SSE 문자열로 바꿉니다.
+    토큰 조각은 산출물 이름(diagram/erd/api), 산출물 상태는 progress,
+    작업 종료는 done(성공) 또는 error(실패) 이벤트로 보냅니다.
+    """
+    if fields is None:
+        return ": keep-alive\n\n"
+    if "delta" in fields:
+        data = json.dumps({"delta": fields["delta"]}, ensure_ascii=False)
+        return f"id: {event_id}\nevent: {fields['artifact']}\ndata: {data}\n\n"
+    if "artifact" in fields:
+        name = "progress"
+    else:
+        name = "done" if fields["status"] == SUCCESS else "error"
+    data = {key: value for key, value in fields.items() if value}
+    for key in ("percent", "ts"):
+        if key in data:
+            data[key] = int(data[key])
+    data = json.dumps(data, ensure_ascii=False)
+    prefix = f"id: {event_id}\n" if event_id else ""
+    return f"{prefix}event: {name}\ndata: {data}\n\n"
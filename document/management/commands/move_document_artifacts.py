@@ -0,0 +1,49 @@
+"""
+document 테이블에 남아 있는 산출물 컬럼(result, diagram_code, erd_code, api_code)을 압축해 document_artifact 로 옮깁니다.
+document_artifact 테이블을 만든 뒤, document 의 산출물 컬럼을 지우기 전에 실행합니다. (여러 번 실행해도 같은 결과)
+
+    python manage.py move_document_artifacts [--batch-size 500]
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from document.models import ARTIFACT_FIELDS, Document, DocumentArtifact
+
+
+class Command(BaseCommand):
+    help = "document 테이블의 산출물 컬럼을 압축해 document_artifact 로 옮깁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, batch_size, **options):
+        table = Document._meta.db_table
+        with connection.cursor() as cursor:
+            columns = {column.name for column in connection.introspection.get_table_description(cursor, table)}
+        legacy = [name for name in ARTIFACT_FIELDS if name in columns]
+        if not legacy:
+            self.stdout.write("옮길 산출물 컬럼이 없습니다.")
+            return
+
+        quote = connection.ops.quote_name
+        query = (
+            f"SELECT {quote('id')}, {', '.join(quote(name) for name in legacy)} FROM {quote(table)} "
+            f"WHERE {quote('id')} > %s ORDER BY {quote('id')} LIMIT %s"
+        )
+        last_id = 0
+        moved = 0
+        while True:
+            with connection.cursor() as cursor:
+                cursor.execute(query, [last_id, batch_size])
+                rows = cursor.fetchall()
+            if not rows:
+                break
+            with transaction.atomic():
+                for row in rows:
+                    texts = {name: value for name, value in zip(legacy, row[1:]) if value}
+                    if texts:
+                        DocumentArtifact.store(Document(id=row[0]), texts)
+                        moved += 1
+            last_id = rows[-1][0]
+
+        self.stdout.write(self.style.SUCCESS(f"문서 {moved}개의 산출물을 옮겼습니다. ({', '.join(legacy)})"))
@@ -0,0 +1,34 @@
+"""
+문서 검색 색인(document_search / document_search_term)을 모든 문서에 대해 다시 만듭니다.
+검색 기능을 배포한 뒤 기존 문서를 색인하거나 DOCUMENT_SEARCH_BACKEND 를 바꾼 뒤 실행합니다. (여러 번 실행해도 같은 결과)
+
+    python manage.py rebuild_document_search [--batch-size 500]
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from document.fulltext import SEARCH_FIELDS
+from document.models import Document, DocumentSearch
+
+
+class Command(BaseCommand):
+    help = "모든 문서의 검색 색인을 다시 만듭니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, batch_size, **options):
+        last_id = 0
+        indexed = 0
+        while True:
+            documents = list(Document.objects.filter(id__gt=last_id).order_by("id")[:batch_size])
+            if not documents:
+                break
+            with transaction.atomic():
+                for document in documents:
+                    document.load_artifacts("result")
+                    DocumentSearch.index(document, SEARCH_FIELDS)
+            indexed += len(documents)
+            last_id = documents[-1].id
+
+        self.stdout.write(self.style.SUCCESS(f"문서 {indexed}개의 검색 색인을 만들었습니다."))
@@ -0,0 +1,26 @@
+"""
+문서 캐시(document.cache)의 조회 결과와 적중률을 /metrics 로 내보냅니다.
+(조회 시간은 document.cache.READ_SECONDS 히스토그램)
+"""
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from document import cache
+
+
+class DocumentCacheCollector:
+    def describe(self):
+        yield CounterMetricFamily("document_cache_requests", "문서 캐시 조회 결과 (local / redis / miss)", labels=["kind", "result"])
+        yield GaugeMetricFamily("document_cache_hit_ratio", "문서 캐시 적중률 (local + redis)", labels=["kind"])
+        yield GaugeMetricFamily("document_cache_local_entries", "프로세스 메모리 LRU 의 항목 수")
+
+    def collect(self):
+        requests = CounterMetricFamily("document_cache_requests", "문서 캐시 조회 결과 (local / redis / miss)", labels=["kind", "result"])
+        ratio = GaugeMetricFamily("document_cache_hit_ratio", "문서 캐시 적중률 (local + redis)", labels=["kind"])
+        for kind, counts in cache.stats().items():
+            for result, count in counts.items():
+                requests.add_metric([kind, result], count)
+            total = sum(counts.values())
+            ratio.add_metric([kind], (counts["local"] + counts["redis"]) / total if total else 0)
+        yield requests
+        yield ratio
+        yield GaugeMetricFamily("document_cache_local_entries", "프로세스 메모리 LRU 의 항목 수", value=len(cache.local))
@@ -1,7 +1,84 @@
+import hashlib
+import zlib
+
 from django.conf import settings
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.utils import timezone
+
+from document import fulltext, versions
 #from gunicorn.config import User
 
+# DocumentArtifact 에 압축 저장하는 Document 의 큰 산출물
+ARTIFACT_FIELDS = ("result", "diagram_code", "erd_code", "api_code")
+
+
+def compress(text):
+    return zlib.compress(text.encode(), settings.DOCUMENT_ARTIFACT_COMPRESS_LEVEL)
+
+
+def decompress(data, max_chars=None):
+    """
+    압축된 산출물을 문자열로 풉니다. max_chars 가 있으면 앞부분만 풀어서 그 글자 수까지 반환
+    """
+    if max_chars is None:
+        return zlib.decompress(data).decode()
+    # UTF-8 한 글자는 최대 4바이트, 잘린 마지막 글자는 버림
+    head = zlib.decompressobj().decompress(data, max_chars * 4)
+    return head.decode(errors="ignore")[:max_chars]
+
+
+def decompress_prefix(data, max_bytes):
+    """
+    압축된 산출물의 앞 max_bytes 바이트(UTF-8)만 풀어서 반환합니다. (Range 요청)
+    """
+    return zlib.decompressobj().decompress(data, max_bytes)
+
+
+def iter_decompress(data, chunk_size):
+    """
+    압축된 산출물을 chunk_size 바이트씩 풀면서 UTF-8 바이트 조각으로 반환합니다. (스트리밍 응답)
+    """
+    decompressor = zlib.decompressobj()
+    pending = bytes(data)
+    while not decompressor.eof:
+        chunk = decompressor.decompress(pending, chunk_size)
+        pending = decompressor.unconsumed_tail
+        if not chunk and not pending:
+            break
+        if chunk:
+            yield chunk
+
+
+def _artifact(name):
+    def fget(self):
+        if name not in self._artifacts:
+            self.load_artifacts(name)
+        return self._artifacts[name]
+
+    def fset(self, value):
+        self._artifacts[name] = value
+        self._changed_artifacts.add(name)
+
+    return property(fget, fset, doc=f"{name} (DocumentArtifact 에 압축 저장, 처음 읽을 때 조회)")
+
+
+class DocumentQuerySet(models.QuerySet):
+    def soft_delete(self):
+        """
+        deleted_at 만 기록하고 수정된 행 수를 반환합니다. (산출물/버전 행은 document.tasks.purge_document 가 삭제)
+        """
+        now = timezone.now()
+        return self.update(deleted_at=now, updated_at=now)
+
+
+class DocumentManager(models.Manager.from_queryset(DocumentQuerySet)):
+    """
+    삭제되지 않은(deleted_at 이 없는) 문서만 조회합니다.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
 
 # Create your models here.
 class Document(models.Model):
@@ -17,12 +94,13 @@ class Document(models.Model):
     title = models.CharField(max_length=255)
     content = models.TextField()
     requirements = models.TextField(default="No requirements provided")
-    result = models.TextField(default="")
 
-    diagram_code = models.TextField()
-    erd_code = models.TextField()
-    api_code = models.TextField()
-    
+    # 큰 산출물은 document_artifact 테이블에 압축 저장 (document 행에는 없음)
+    result = _artifact("result")
+    diagram_code = _artifact("diagram_code")
+    erd_code = _artifact("erd_code")
+    api_code = _artifact("api_code")
+
     is_diagram_saved = models.BooleanField(default=False)
     is_erd_saved = models.BooleanField(default=False)
     is_api_saved = models.BooleanField(default=False)
@@ -31,8 +109,285 @@ class Document(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
+    # 기본 매니저는 삭제된 문서를 제외, all_objects 는 삭제된 문서 포함
+    objects = DocumentManager()
+    all_objects = models.Manager.from_queryset(DocumentQuerySet)()
+
     class Meta:
         db_table = "document"
+        indexes = [
+            # 사용자별 삭제되지 않은 문서 조회와 목록의 커서 페이지네이션 (document.pagination)
+            models.Index(fields=["user_id", "deleted_at", "created_at"], name="document_user_alive_idx"),
+        ]
 
     def __str__(self):
-        return f"Document {self.id} by {self.user.username}"
\ No newline at end of file
+        return f"Document {self.id} by {self.user.username}"
+
+    @property
+    def _artifacts(self):
+        return self.__dict__.setdefault("_artifact_cache", {})
+
+    @property
+    def _changed_artifacts(self):
+        return self.__dict__.setdefault("_artifact_changed", set())
+
+    @property
+    def _artifact_hashes(self):
+        return self.__dict__.setdefault("_artifact_sha256", {})
+
+    def load_artifacts(self, *names):
+        """
+        아직 읽지 않은 산출물을 한 번의 쿼리로 읽어 둡니다. (이름을 주지 않으면 전부)
+        """
+        names = [name for name in (names or ARTIFACT_FIELDS) if name not in self._artifacts]
+        if not names:
+            return
+        if self.pk is not None:
+            rows = DocumentArtifact.objects.filter(document_id=self.pk, name__in=names).values_list("name", "data", "sha256")
+            for name, data, sha256 in rows:
+                self._artifacts[name] = decompress(data)
+                self._artifact_hashes[name] = sha256
+        for name in names:
+            self._artifacts.setdefault(name, "")
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        names = ARTIFACT_FIELDS if fields is None else [name for name in ARTIFACT_FIELDS if name in fields]
+        for name in names:
+            self._artifacts.pop(name, None)
+            self._changed_artifacts.discard(name)
+        if fields is not None:
+            fields = [field for field in fields if field not in ARTIFACT_FIELDS]
+            if not fields:
+                return
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+
+    def save(self, *args, **kwargs):
+        """
+        update_fields 에 산출물 이름이 있으면 그 산출물만, 없으면 변경한 산출물을 함께 저장합니다.
+        """
+        update_fields = kwargs.get("update_fields")
+        names = set(self._changed_artifacts)
+        if update_fields is not None:
+            names = {name for name in ARTIFACT_FIELDS if name in update_fields and name in self._artifacts}
+            kwargs["update_fields"] = [field for field in update_fields if field not in ARTIFACT_FIELDS]
+
+        # 검색 색인(DocumentSearch)을 갱신할 필드
+        search_fields = {
+            field for field in fulltext.SEARCH_FIELDS
+            if field in names or (field not in ARTIFACT_FIELDS and (update_fields is None or field in update_fields))
+        }
+
+        adding = self._state.adding
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+            DocumentArtifact.store(self, {name: self._artifacts[name] for name in names}, adding, using)
+            if search_fields:
+                DocumentSearch.index(self, search_fields, using)
+        self._changed_artifacts.difference_update(names)
+
+
+class DocumentArtifact(models.Model):
+    """
+    Document 의 큰 산출물(result, diagram_code, erd_code, api_code)을 zlib 으로 압축해 따로 저장합니다.
+    document 행이 작아져 목록/상세 조회와 저장이 산출물 크기의 영향을 받지 않고, 산출물은 읽을 때만 조회합니다.
+    data 는 zlib 형식이므로 그대로 Content-Encoding: deflate 응답 본문으로 보낼 수 있습니다.
+    """
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name="artifacts", db_column="document_id")
+    name = models.CharField(max_length=20)
+    data = models.BinaryField()  # zlib 압축 바이트
+    size = models.PositiveIntegerField()  # 압축 전 UTF-8 바이트 수
+    sha256 = models.CharField(max_length=64)  # 압축 전 내용의 해시
+    version = models.PositiveIntegerField(default=0)  # 현재 내용의 DocumentVersion 번호
+    snapshot_version = models.PositiveIntegerField(default=0)  # 마지막 스냅샷 버전 (0 이면 버전 기록 없음)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "document_artifact"
+        constraints = [
+            models.UniqueConstraint(fields=["document", "name"], name="document_artifact_unique"),
+        ]
+
+    @classmethod
+    def store(cls, document, texts, adding=False, using=None):
+        """
+        산출물을 압축해 저장하고 바뀐 산출물마다 버전(DocumentVersion)을 추가합니다.
+        내용이 그대로인 산출물은 건너뛰고, 새 문서의 빈 산출물은 행을 만들지 않습니다.
+        """
+        changed = {}
+        for name, text in texts.items():
+            text = text or ""
+            sha256 = hashlib.sha256(text.encode()).hexdigest()
+            if document._artifact_hashes.get(name) == sha256 or (adding and not text):
+                continue
+            changed[name] = (text, sha256)
+        if not changed:
+            return
+
+        manager = cls.objects.using(using)
+        # 이전 내용과 버전 번호 (같은 산출물을 동시에 저장하는 요청과 버전이 겹치지 않도록 잠금)
+        current = {}
+        if not adding:
+            rows = manager.select_for_update().filter(document_id=document.pk, name__in=changed)
+            current = {row["name"]: row for row in rows.values("name", "data", "sha256", "version", "snapshot_version")}
+
+        rows = []
+        versions = []
+        for name, (text, sha256) in changed.items():
+            document._artifact_hashes[name] = sha256
+            previous = current.get(name)
+            if previous and previous["sha256"] == sha256:
+                continue
+            data = compress(text)
+            version = DocumentVersion.next(document.pk, name, text, sha256, data, previous)
+            versions.append(version)
+            rows.append(cls(
+                document_id=document.pk, name=name, data=data, size=len(text.encode()), sha256=sha256,
+                version=version.version, snapshot_version=version.version if version.is_snapshot else previous["snapshot_version"],
+            ))
+
+        if rows:
+            # (document_id, name) 이 이미 있으면 덮어씀 (MySQL: ON DUPLICATE KEY UPDATE)
+            unique_fields = None
+            if connections[using or "default"].features.supports_update_conflicts_with_target:
+                unique_fields = ["document", "name"]
+            manager.bulk_create(
+                rows, update_conflicts=True, unique_fields=unique_fields,
+                update_fields=["data", "size", "sha256", "version", "snapshot_version", "updated_at"],
+            )
+            DocumentVersion.objects.using(using).bulk_create(versions)
+
+    @classmethod
+    def texts(cls, document_ids, name, max_chars=None):
+        """
+        여러 문서의 산출물 하나를 한 번의 쿼리로 읽어 {document_id: 텍스트}로 반환합니다.
+        max_chars 가 있으면 앞부분만 풀어서 그 글자 수(+1, 잘렸는지 확인용)까지 반환
+        """
+        rows = cls.objects.filter(document_id__in=document_ids, name=name).values_list("document_id", "data")
+        limit = None if max_chars is None else max_chars + 1
+        return {document_id: decompress(data, limit) for document_id, data in rows}
+
+
+class DocumentVersion(models.Model):
+    """
+    산출물(result, diagram_code, erd_code, api_code)의 버전 기록입니다.
+    DOCUMENT_VERSION_SNAPSHOT_INTERVAL 버전마다 전체 내용(스냅샷)을, 그 사이에는 이전 버전과의 델타만 저장합니다.
+    (델타 형식은 document.versions 참고)
+    """
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name="versions", db_column="document_id")
+    name = models.CharField(max_length=20)
+    version = models.PositiveIntegerField()
+    is_snapshot = models.BooleanField()
+    data = models.BinaryField()  # 스냅샷: zlib 압축 텍스트 / 델타: zlib 압축 JSON
+    size = models.PositiveIntegerField()  # 이 버전 내용의 UTF-8 바이트 수
+    sha256 = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "document_version"
+        constraints = [
+            models.UniqueConstraint(fields=["document", "name", "version"], name="document_version_unique"),
+        ]
+
+    @classmethod
+    def next(cls, document_id, name, text, sha256, data, previous):
+        """
+        이전 산출물 행(previous) 다음 버전을 만듭니다. (저장은 호출한 쪽에서)
+        버전 기록이 없거나, 마지막 스냅샷에서 K 버전이 지났거나, 델타가 스냅샷보다 크면 스냅샷으로 저장합니다.
+        """
+        number = previous["version"] + 1 if previous else 1
+        fields = dict(document_id=document_id, name=name, version=number, size=len(text.encode()), sha256=sha256)
+        if (previous and previous["snapshot_version"]
+                and number - previous["snapshot_version"] < settings.DOCUMENT_VERSION_SNAPSHOT_INTERVAL):
+            delta = versions.encode_delta(versions.make_delta(decompress(previous["data"]), text))
+            if len(delta) < len(data):
+                return cls(is_snapshot=False, data=delta, **fields)
+        return cls(is_snapshot=True, data=data, **fields)
+
+    @classmethod
+    def text(cls, document_id, name, version):
+        """
+        버전의 내용을 복원합니다. (가장 가까운 이전 스냅샷 + 최대 K-1 개의 델타) 없는 버전이면 None
+        """
+        queryset = cls.objects.filter(document_id=document_id, name=name)
+        snapshot = (queryset.filter(is_snapshot=True, version__lte=version)
+                    .order_by("-version").values_list("version", "data").first())
+        if snapshot is None:
+            return None
+        base, data = snapshot
+        text = decompress(data)
+        deltas = (queryset.filter(version__gt=base, version__lte=version)
+                  .order_by("version").values_list("version", "data"))
+        last = base
+        for last, data in deltas:
+            text = versions.apply_delta(text, versions.decode_delta(data))
+        return text if last == version else None
+
+
+class DocumentSearch(models.Model):
+    """
+    MySQL FULLTEXT(ngram) 검색용 문서 텍스트입니다. (document.search)
+    result 는 document_artifact 에 압축 저장되므로 검색할 수 있도록 원문을 여기에 둡니다.
+    FULLTEXT 인덱스는 migrate 후 document.search.ensure_fulltext_index 가 만듭니다.
+    """
+    document = models.OneToOneField(Document, on_delete=models.CASCADE, primary_key=True, related_name="+", db_column="document_id")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+", db_column="user_id")
+    title = models.CharField(max_length=255)
+    content = models.TextField()
+    requirements = models.TextField()
+    result = models.TextField()
+
+    class Meta:
+        db_table = "document_search"
+
+    @classmethod
+    def index(cls, document, fields, using=None):
+        """
+        문서의 검색 색인에서 바뀐 필드(fields)를 갱신합니다.
+        MySQL 은 이 테이블의 해당 컬럼만, 그 외에는 역색인(DocumentSearchTerm)에서 바뀐 토큰만 고칩니다.
+        """
+        if fulltext.backend(using) != "mysql":
+            DocumentSearchTerm.index(document, {field: getattr(document, field) for field in fulltext.SEARCH_FIELDS}, using)
+            return
+        manager = cls.objects.using(using)
+        if not manager.filter(document_id=document.pk).update(**{field: getattr(document, field) or "" for field in fields}):
+            manager.create(document_id=document.pk, user_id=document.user_id_id,
+                           **{field: getattr(document, field) or "" for field in fulltext.SEARCH_FIELDS})
+
+
+class DocumentSearchTerm(models.Model):
+    """
+    MySQL 이 아닌 DB 에서 쓰는 문서 검색 역색인입니다. (document.search)
+    문서마다 2-gram 토큰(document.fulltext.terms)과 필드 가중치를 반영한 등장 횟수(tf)를 저장합니다.
+    """
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name="+", db_column="document_id")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+", db_column="user_id")
+    term = models.CharField(max_length=8)
+    tf = models.PositiveIntegerField()
+
+    class Meta:
+        db_table = "document_search_term"
+        constraints = [
+            models.UniqueConstraint(fields=["document", "term"], name="document_search_term_unique"),
+        ]
+        indexes = [
+            # 사용자의 문서에서 토큰 조회 (점수 계산에 필요한 document_id, tf 까지 인덱스에서 읽음)
+            models.Index(fields=["user", "term", "document", "tf"], name="document_search_term_idx"),
+        ]
+
+    @classmethod
+    def index(cls, document, texts, using=None):
+        """
+        문서의 토큰을 다시 계산해 이전 색인과 달라진 토큰만 지우고 추가합니다.
+        """
+        terms = fulltext.document_terms(texts)
+        manager = cls.objects.using(using)
+        current = dict(manager.filter(document_id=document.pk).values_list("term", "tf"))
+        stale = [term for term, tf in current.items() if terms.get(term) != tf]
+        batch_size = settings.DOCUMENT_SEARCH_BATCH_SIZE
+        for i in range(0, len(stale), batch_size):
+            manager.filter(document_id=document.pk, term__in=stale[i:i + batch_size]).delete()
+        manager.bulk_create([
+            cls(document_id=document.pk, user_id=document.user_id_id, term=term, tf=tf)
+            for term, tf in terms.items() if current.get(term) != tf
+        ], batch_size=batch_size)
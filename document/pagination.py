@@ -0,0 +1,111 @@
+"""
+문서 목록(documents GET, MyPageView.get)의 커서(keyset) 페이지네이션입니다.
+
+OFFSET 은 앞 페이지의 행을 모두 읽고 버리므로 문서가 많을수록 느려집니다.
+(created_at, id) 기준으로 이전 페이지의 마지막 행 다음부터 읽으면
+(user_id, deleted_at, created_at) 인덱스에서 page_size 개의 행만 읽으므로 문서 수와 관계없이 응답 시간이 일정합니다.
+목록은 필요한 컬럼만 조회하고, result 는 페이지의 문서만 한 번에 읽어 preview 를 지정하면 앞부분만 풀어서 반환합니다.
+
+    ?page_size=20     한 페이지의 문서 수 (DOCUMENT_PAGE_SIZE, 최대 DOCUMENT_MAX_PAGE_SIZE)
+    ?cursor=...       이전 응답의 next_cursor (없으면 첫 페이지)
+    ?preview=200      result 를 앞에서부터 이 글자 수만큼만 반환
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+
+from document.models import DocumentArtifact
+
+
+class InvalidPage(ValueError):
+    """
+    page_size / cursor / preview 값이 올바르지 않습니다.
+    """
+
+
+def encode_cursor(created_at, id):
+    raw = f"{created_at.isoformat()}|{id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise InvalidPage("잘못된 cursor 입니다.")
+
+
+def _positive_int(request, name):
+    value = request.GET.get(name)
+    if value in (None, ""):
+        return None
+    if not value.isdigit() or int(value) < 1:
+        raise InvalidPage(f"{name} 는 1 이상의 정수여야 합니다.")
+    return int(value)
+
+
+def get_page_size(request):
+    size = _positive_int(request, "page_size") or settings.DOCUMENT_PAGE_SIZE
+    return min(size, settings.DOCUMENT_MAX_PAGE_SIZE)
+
+
+def get_preview(request):
+    """
+    ?preview 글자 수 (없으면 None: result 전체)
+    """
+    return _positive_int(request, "preview")
+
+
+def page(queryset, request, fields):
+    """
+    queryset 을 최신순으로 한 페이지 조회하고 (rows, next_cursor)를 반환합니다.
+    rows 는 fields 컬럼만 담은 dict 목록이며(fields 에 id 포함), 다음 페이지가 없으면 next_cursor 는 None 입니다.
+    """
+    size = get_page_size(request)
+    cursor = request.GET.get("cursor")
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=id))
+
+    columns = list(fields) + [name for name in ("created_at",) if name not in fields]
+    # 다음 페이지가 있는지 확인하기 위해 한 행 더 조회
+    rows = list(queryset.order_by("-created_at", "-id").values(*columns)[:size + 1])
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+    if "created_at" not in fields:
+        for row in rows:
+            row.pop("created_at")
+    return rows, next_cursor
+
+
+def attach_artifact(rows, artifact, preview=None):
+    """
+    한 페이지의 rows 에 산출물(예: result)을 한 번의 쿼리로 읽어 담습니다.
+    preview 를 지정하면 산출물을 preview 글자까지 자르고 잘렸는지 여부(truncated)를 담습니다.
+    """
+    # 한 글자 더 풀어서 잘렸는지 확인
+    texts = DocumentArtifact.texts([row["id"] for row in rows], artifact, max_chars=preview)
+    for row in rows:
+        text = texts.get(row["id"], "")
+        row[artifact] = text[:preview] if preview else text
+        if preview:
+            row["truncated"] = len(text) > preview
+    return rows
+
+
+def paginate(queryset, request, fields, artifact=None, preview=None):
+    """
+    page 로 한 페이지를 조회하고 artifact 를 지정하면 attach_artifact 로 그 산출물도 담아서 (rows, next_cursor)를 반환합니다.
+    """
+    rows, next_cursor = page(queryset, request, fields)
+    if artifact:
+        attach_artifact(rows, artifact, preview)
+    return rows, next_cursor
@@ -0,0 +1,90 @@
+"""
+문서 스트리밍 API에서 사용하는 프롬프트입니다. (WSGI/ASGI 뷰 공용)
+"""
+
+
+def build_stream_prompt(document):
+    prompt = f"""
+
+                    Title: {document.title}
+                    Content: {document.content}
+                    Requirements: {document.requirements}
+
+                    위 내용을 바탕으로 체계적인 기능명세서를 작성해주세요. 다음 지시사항을 정확히 따라주세요:
+
+                    1. **문서 구조**
+                        - 문서는 다음과 같은 섹션으로 구성되어야 합니다:
+                        1. **시스템 목적**: 프로젝트의 목적과 주요 기능을 간략히 설명하세요.
+                        2. **기능 요구사항**: 사용자 요구사항을 기반으로 상세한 기능 목록을 작성하세요. 각 기능은 사용자 스토리 형식(예: "사용자는 [X]를 할 수 있어야 한다")으로 작성하세요.
+
+                    2. **상세 설명**
+                        - 각 섹션은 명확하고 간결하게 작성되어야 합니다.
+
+                    3. **모듈화**
+                        - 문서를 모듈화하여 각 섹션이 독립적으로 이해될 수 있도록 하세요.
+                        - 각 모듈은 간단한 설명과 함께 명확하게 구분되어야 합니다.
+
+                    4. **출력 형식**
+                        - 최종 문서는 바로 제출할 수 있는 형태로 작성되어야 합니다.
+                        - 출력은 마크다운 형식이 아닌 빠르게 출력되도록 문서로만 해주세요.(#,** 등 제외)
+                        - 불필요한 설명이나 서론은 생략하고, 실제 문서 내용만 출력하세요.
+
+                    5. **추가 요구사항**
+                        - 현업에서 바로 사용할 수 있도록 전문적이고 실용적인 언어를 사용하세요.
+                        - 가능한 한 구체적이고 명확하게 작성하세요.
+                        - 마지막 요약은 빼주세요.
+
+                        **출력 예시**
+                        시스템 목적:
+                        - 비즈니스 목적: 사용자가 상품을 쉽게 조회하고 주문할 수 있도록 하는 것입니다.
+                        - 기술적 목적: 안정적이고 확장 가능한 온라인 쇼핑몰 시스템을 구축하는 것입니다.
+
+                        기능 요구사항:
+                        1. 사용자는 상품을 조회할 수 있어야 한다. (우선순위: 높음)
+                        2. 사용자는 상품을 주문할 수 있어야 한다. (우선순위: 높음)
+                        3. 사용자는 주문 내역을 조회할 수 있어야 한다. (우선순위: 중간)
+
+                        시나리오:
+                        1. 사용자가 로그인 페이지에 접속합니다.
+                        2. 이메일과 비밀번호를 입력합니다.
+                        3. 로그인 버튼을 클릭합니다.
+                        4. 시스템은 사용자 정보를 검증하고 로그인을 승인합니다.
+
+                        비기능 요구사항:
+                        - 시스템은 초당 100개의 요청을 처리할 수 있어야 합니다.
+                        - 사용자 데이터는 암호화되어 저장되어야 합니다.
+
+                        모듈화:
+                        - 로그인 모듈: 입력 - 이메일, 비밀번호 / 출력 - 사용자 정보, 토큰
+                        - 상품 조회 모듈: 입력 - 검색어 / 출력 - 상품 목록
+                        - 주문 모듈: 입력 - 상품 ID, 수량 / 출력 - 주문 번호, 결제 정보
+
+                        위의 출력 예시는 쇼핑몰 예시입니다. 사용자가 입력한 정보를 바탕으로 예시를 참고하여 출력해주세요.
+                    """
+    return prompt
+
+
+def build_update_prompt(document, modifications):
+    prompt = f"""
+
+                    기존문서: {document.result}
+                    추가문서: {modifications}
+                    기존 내용을 바탕으로 추가문서를 적용시켜 체계적인 기능명세서를 작성해주세요. 다음 지시사항을 정확히 따라주세요:
+                    
+                    **추가 요구사항**
+                    - 마지막 요약은 빼주세요.
+                    - 절대적으로 기존문서의 양식을 지켜야합니다. 최대한 기존문서를 수정하지말고, 추가문서에 대한 정보에만 추가하거나 수정해주세요.
+                    - 문장을 추가할 땐, 기존의 문서를 토대로 작성해주세요.
+                    """
+    return prompt
+
+
+def build_continue_prompt(prompt, partial):
+    # 중단된 스트리밍 생성을 체크포인트부터 이어서 작성 (document.streams)
+    return f"""{prompt}
+
+                    아래는 위 요청에 대해 지금까지 작성된 내용입니다.
+                    이미 작성된 내용은 반복하지 말고, 마지막 글자 바로 다음부터 이어서 나머지만 작성해주세요.
+
+                    지금까지 작성된 내용:
+                    {partial}"""
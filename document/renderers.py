@@ -0,0 +1,27 @@
+from rest_framework.renderers import BaseRenderer
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    EventSource 는 Accept: text/event-stream 으로 요청하므로, SSE 뷰가 콘텐츠 협상(406)에서 막히지 않도록 등록합니다.
+    (응답 본문은 StreamingHttpResponse 가 직접 만듦)
+    """
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+class PlainTextRenderer(BaseRenderer):
+    """
+    산출물 원문 API 가 Accept: text/plain 요청에서 콘텐츠 협상(406)에 막히지 않도록 등록합니다.
+    (응답 본문은 뷰가 HttpResponse 로 직접 만듦)
+    """
+    media_type = "text/plain"
+    format = "txt"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
@@ -0,0 +1,144 @@
+"""
+사용자 문서의 전문 검색입니다. (title, content, requirements, result)
+
+    MySQL   document_search 의 FULLTEXT(ngram) 인덱스에서 MATCH ... AGAINST (자연어 모드) 점수순
+    그 외    DocumentSearchTerm 역색인에서 검색어 2-gram 의 BM25 점수순 (문서를 저장할 때 바뀐 토큰만 갱신)
+
+두 방식 모두 점수 계산과 정렬, 페이지 자르기를 DB 에서 하고 한 페이지의 문서만 읽으므로
+문서가 수만 개여도 검색어 토큰의 인덱스 범위만 읽습니다.
+결과에는 검색어가 나온 필드마다 하이라이트(<em>)한 부분을 담습니다.
+
+    ?q=검색어
+    ?page_size=20     한 페이지의 문서 수 (DOCUMENT_PAGE_SIZE, 최대 DOCUMENT_MAX_PAGE_SIZE)
+    ?cursor=...       이전 응답의 next_cursor (없으면 첫 페이지)
+"""
+import base64
+import binascii
+import logging
+import math
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+
+from document import fulltext
+from document.models import Document, DocumentArtifact, DocumentSearch, DocumentSearchTerm
+from document.pagination import InvalidPage, get_page_size
+
+logger = logging.getLogger(__name__)
+
+FULLTEXT_INDEX = "document_search_ft"
+
+# BM25 tf 포화 상수
+K1 = 1.2
+
+
+def encode_cursor(offset):
+    return base64.urlsafe_b64encode(str(offset).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        offset = int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise InvalidPage("잘못된 cursor 입니다.")
+    if offset < 0:
+        raise InvalidPage("잘못된 cursor 입니다.")
+    return offset
+
+
+def _mysql_ranked(user_id, query, offset, limit):
+    columns = ", ".join(f"s.{name}" for name in fulltext.SEARCH_FIELDS)
+    match = f"MATCH({columns}) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+    sql = (
+        f"SELECT s.document_id, {match} AS score "
+        f"FROM {DocumentSearch._meta.db_table} s JOIN {Document._meta.db_table} d ON d.id = s.document_id "
+        f"WHERE s.user_id = %s AND d.deleted_at IS NULL AND {match} "
+        f"ORDER BY score DESC, s.document_id DESC LIMIT %s OFFSET %s"
+    )
+    with connections["default"].cursor() as cursor:
+        cursor.execute(sql, [query, user_id, query, limit, offset])
+        return cursor.fetchall()
+
+
+def _python_ranked(user_id, query, offset, limit):
+    terms = list(fulltext.terms(query))
+    if not terms:
+        return []
+    # 삭제된 문서(색인은 purge_document 가 비동기로 삭제)는 건수가 적으므로 제외 목록으로 거름
+    deleted = Document.all_objects.filter(user_id=user_id, deleted_at__isnull=False).values("id")
+    postings = DocumentSearchTerm.objects.filter(user_id=user_id, term__in=terms).exclude(document_id__in=deleted)
+
+    # 토큰이 나온 문서 수로 idf 계산
+    total = Document.objects.filter(user_id=user_id).count()
+    frequencies = {
+        row["term"]: row["df"]
+        for row in postings.values("term").annotate(df=Count("id")).order_by()
+    }
+    if not frequencies:
+        return []
+    idf = {term: math.log(1 + (total - df + 0.5) / (df + 0.5)) for term, df in frequencies.items()}
+
+    weight = Case(*[When(term=term, then=Value(value)) for term, value in idf.items()], output_field=FloatField())
+    rows = (
+        postings.values("document_id")
+        .annotate(score=Sum(weight * F("tf") * Value(K1 + 1) / (F("tf") + Value(K1)), output_field=FloatField()))
+        .order_by("-score", "-document_id")
+        .values_list("document_id", "score")
+    )
+    return list(rows[offset:offset + limit])
+
+
+def search(user_id, query, request):
+    """
+    사용자 문서를 검색해 점수순으로 한 페이지를 조회하고 (rows, next_cursor)를 반환합니다.
+    rows 는 id, title, score, highlights({필드: 하이라이트}) 목록이며 다음 페이지가 없으면 next_cursor 는 None 입니다.
+    """
+    size = get_page_size(request)
+    cursor = request.GET.get("cursor")
+    offset = decode_cursor(cursor) if cursor else 0
+
+    ranked = _mysql_ranked if fulltext.backend() == "mysql" else _python_ranked
+    # 다음 페이지가 있는지 확인하기 위해 한 행 더 조회
+    hits = ranked(user_id, query, offset, size + 1)
+    next_cursor = None
+    if len(hits) > size:
+        hits = hits[:size]
+        next_cursor = encode_cursor(offset + size)
+    if not hits:
+        return [], None
+
+    ids = [document_id for document_id, _ in hits]
+    documents = {row["id"]: row for row in Document.objects.filter(id__in=ids).values("id", "title", "content", "requirements")}
+    results = DocumentArtifact.texts(ids, "result")
+    chars = settings.DOCUMENT_SEARCH_SNIPPET_CHARS
+
+    rows = []
+    for document_id, score in hits:
+        document = documents.get(document_id)
+        if document is None:
+            continue
+        texts = dict(document, result=results.get(document_id, ""))
+        highlights = {}
+        for field in fulltext.SEARCH_FIELDS:
+            snippet = fulltext.highlight(texts[field], query, chars)
+            if snippet:
+                highlights[field] = snippet
+        rows.append({"id": document_id, "title": document["title"], "score": round(float(score), 4), "highlights": highlights})
+    return rows, next_cursor
+
+
+def ensure_fulltext_index(using="default", **kwargs):
+    """
+    MySQL 이면 document_search 에 FULLTEXT(ngram) 인덱스를 만듭니다. (post_migrate, 이미 있으면 건너뜀)
+    """
+    connection = connections[using]
+    if connection.vendor != "mysql":
+        return
+    table = DocumentSearch._meta.db_table
+    with connection.cursor() as cursor:
+        if FULLTEXT_INDEX in connection.introspection.get_constraints(cursor, table):
+            return
+        columns = ", ".join(fulltext.SEARCH_FIELDS)
+        cursor.execute(f"CREATE FULLTEXT INDEX {FULLTEXT_INDEX} ON {table} ({columns}) WITH PARSER ngram")
+    logger.info(f"{table} FULLTEXT 인덱스 생성")
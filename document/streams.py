@@ -0,0 +1,409 @@
+"""
+문서결과 스트리밍(stream_document / update_stream_document)의 생성과 이어 받기입니다.
+
+LLM 생성(producer)은 요청과 분리된 스레드(ASGI 모드에서는 asyncio 태스크)에서 실행되므로
+클라이언트 연결이 끊겨도 계속됩니다. 생성된 텍스트는 DOCUMENT_STREAM_CHECKPOINT_TOKENS 토큰 또는
+DOCUMENT_STREAM_CHECKPOINT_MS 밀리초마다 한 이벤트로 묶어 Redis 에 기록(체크포인트)하고,
+응답은 Redis 에서 이벤트를 읽어 <gen>.<seq> 형식의 순차 id 와 함께 보냅니다.
+
+문서마다 producer 는 하나입니다. 여러 탭이나 공동 작업자가 같은 문서를 스트리밍하면
+처음 연결한 요청만 LLM 을 호출하고, 이후 연결은 같은 스트림을 처음부터 읽는 consumer 가 됩니다.
+(진행 중인 생성과 프롬프트가 다른 요청은 Busy)
+
+Last-Event-ID 를 보내며 다시 연결하면 그 다음 이벤트부터 이어 받습니다.
+생성이 진행 중이면 그 생성에 붙고, producer 가 사라졌으면(웹 워커 재시작 등)
+처음부터 다시 생성하지 않고 체크포인트까지의 텍스트에 이어서 쓰도록 요청합니다.
+(같은 프롬프트로 시작된 생성일 때만 이어 쓰고, 프롬프트가 다르면 새 생성을 시작)
+
+    docstream:<document_id>                 해시 (gen, owner, status, seq) - 마지막 생성의 체크포인트
+                                            (체크포인트까지의 텍스트는 생성 스트림의 c 를 이어 붙여 복원)
+    docstream:<document_id>:<gen>           스트림 (id 0-<seq>, c: 텍스트 조각 / e: done|error, m: 오류 메시지)
+    docstream:<document_id>:producer        producer 가 살아 있는 동안 유지되는 키 (<gen>:<프롬프트 해시>)
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+import uuid
+
+import redis
+from django.conf import settings
+from django.db import connection
+
+from config.redis import get_async_redis_client, redis_client
+from document import writes
+from document.prompts import build_continue_prompt
+from llm.client import astream_chat_completion, stream_chat_completion
+from llm.sse import DONE, aiter_events, delta_content, iter_events
+
+PREFIX = "docstream:"
+
+RUNNING = "running"
+FINISHED = "done"
+FAILED = "error"
+
+_BLOCK_MS = 1000
+_READ_COUNT = 100
+
+logger = logging.getLogger(__name__)
+
+# 실행 중인 asyncio producer (태스크가 가비지 컬렉션되지 않도록 참조 유지)
+_tasks = set()
+
+# 자신이 잡은 producer 키일 때만 갱신/해제
+_REFRESH_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class Busy(Exception):
+    """
+    같은 문서를 다른 프롬프트로 생성하고 있어 새 스트림을 시작할 수 없습니다.
+    """
+
+
+def _state_key(document_id):
+    return f"{PREFIX}{document_id}"
+
+
+def _events_key(document_id, gen):
+    return f"{PREFIX}{document_id}:{gen}"
+
+
+def _lock_key(document_id):
+    return f"{PREFIX}{document_id}:producer"
+
+
+def _owner(gen, prompt):
+    return f"{gen}:{hashlib.sha256(prompt.encode()).hexdigest()[:16]}"
+
+
+def parse_event_id(value):
+    """
+    Last-Event-ID(<gen>.<seq>)를 (gen, seq)로 바꿉니다. 형식이 다르면 None
+    """
+    gen, _, seq = (value or "").partition(".")
+    if not gen or not seq.isdigit():
+        return None
+    return gen, int(seq)
+
+
+def _decode(data):
+    return {key.decode(): value.decode() for key, value in data.items()}
+
+
+class Checkpoint:
+    """
+    producer 가 생성한 텍스트를 모아 두었다가 체크포인트마다 Redis 에 기록합니다.
+    기록은 파이프라인 명령으로만 만들므로 동기/비동기 producer 가 함께 사용합니다.
+    """
+
+    def __init__(self, document_id, owner, seq=0, text=""):
+        self.document_id = document_id
+        self.owner = owner
+        self.gen = owner.partition(":")[0]
+        self.seq = seq
+        self.text = text
+        self._parts = []
+        self._tokens = 0
+        self._flushed_at = 0.0  # 첫 토큰은 바로 보냄
+
+    @property
+    def result(self):
+        # 아직 기록하지 않은 조각까지 포함한 전체 텍스트
+        return self.text + "".join(self._parts)
+
+    def add(self, content):
+        """
+        텍스트 조각을 추가하고, 체크포인트할 때가 되었으면 True 를 반환합니다.
+        """
+        self._parts.append(content)
+        self._tokens += 1
+        return (self._tokens >= settings.DOCUMENT_STREAM_CHECKPOINT_TOKENS
+                or (time.monotonic() - self._flushed_at) * 1000 >= settings.DOCUMENT_STREAM_CHECKPOINT_MS)
+
+    def queue(self, pipe, status=RUNNING, error=None):
+        """
+        모아 둔 텍스트(와 종료 이벤트)를 스트림에 추가하고 체크포인트를 갱신하는 명령을 pipe 에 쌓습니다.
+        """
+        delta = "".join(self._parts)
+        self._parts = []
+        self._tokens = 0
+        self._flushed_at = time.monotonic()
+
+        events_key = _events_key(self.document_id, self.gen)
+        if delta:
+            self.seq += 1
+            self.text += delta
+            pipe.xadd(events_key, {"c": delta}, id=f"0-{self.seq}")
+        if status != RUNNING:
+            self.seq += 1
+            pipe.xadd(events_key, {"e": status, "m": str(error or "")}, id=f"0-{self.seq}")
+
+        pipe.hset(_state_key(self.document_id), mapping={
+            "gen": self.gen, "owner": self.owner, "status": status, "seq": self.seq,
+        })
+        pipe.expire(_state_key(self.document_id), settings.DOCUMENT_STREAM_TTL)
+        pipe.expire(events_key, settings.DOCUMENT_STREAM_TTL)
+        lock_key = _lock_key(self.document_id)
+        if status == RUNNING:
+            pipe.eval(_REFRESH_LUA, 1, lock_key, self.owner, settings.DOCUMENT_STREAM_LOCK_TTL)
+        else:
+            pipe.eval(_RELEASE_LUA, 1, lock_key, self.owner)
+
+
+def _prompt(prompt, checkpoint):
+    # 체크포인트가 있으면 처음부터 다시 쓰지 않고 이어서 작성하도록 요청
+    return build_continue_prompt(prompt, checkpoint.text) if checkpoint.text else prompt
+
+
+def _produce(document, prompt, checkpoint):
+    try:
+        for event in iter_events(stream_chat_completion(_prompt(prompt, checkpoint))):
+            if event.data == DONE:
+                break
+            try:
+                content = delta_content(event.data)
+            except ValueError as e:
+                logger.error(f"JSONDecodeError: {e} for data: {event.data}")
+                continue
+            if content and checkpoint.add(content):
+                pipe = redis_client.pipeline()
+                checkpoint.queue(pipe)
+                pipe.execute()
+
+        writes.save_result(document, checkpoint.result)
+        status, error = FINISHED, None
+    except Exception as e:
+        logger.error(f"문서 {document.id} 스트리밍 생성 실패: {e}")
+        status, error = FAILED, e
+    finally:
+        connection.close()
+
+    try:
+        pipe = redis_client.pipeline()
+        checkpoint.queue(pipe, status, error)
+        pipe.execute()
+    except redis.RedisError as e:
+        # 종료 이벤트를 남기지 못하면 락이 만료된 뒤 연결된 응답이 체크포인트부터 이어서 생성
+        logger.warning(f"문서 {document.id} 스트리밍 종료 기록 실패: {e}")
+
+
+async def _aproduce(document, prompt, checkpoint):
+    client = get_async_redis_client()
+    try:
+        async for event in aiter_events(astream_chat_completion(_prompt(prompt, checkpoint))):
+            if event.data == DONE:
+                break
+            try:
+                content = delta_content(event.data)
+            except ValueError as e:
+                logger.error(f"JSONDecodeError: {e} for data: {event.data}")
+                continue
+            if content and checkpoint.add(content):
+                pipe = client.pipeline()
+                checkpoint.queue(pipe)
+                await pipe.execute()
+
+        await writes.asave_result(document, checkpoint.result)
+        status, error = FINISHED, None
+    except Exception as e:
+        logger.error(f"문서 {document.id} 스트리밍 생성 실패: {e}")
+        status, error = FAILED, e
+
+    try:
+        pipe = client.pipeline()
+        checkpoint.queue(pipe, status, error)
+        await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"문서 {document.id} 스트리밍 종료 기록 실패: {e}")
+
+
+def _checkpoint_text(entries):
+    # 생성 스트림 항목의 텍스트 조각을 이어 붙인 체크포인트까지의 텍스트
+    return "".join(fields["c"] for _, fields in entries if "c" in fields)
+
+
+def _start(document, prompt, gen=None, seq=0):
+    """
+    문서의 producer 키를 잡고 producer 스레드를 시작한 뒤 그 owner 를 반환합니다.
+    gen 을 지정하면 그 생성의 seq 까지의 텍스트에 이어서 씁니다.
+    다른 producer 가 이미 키를 잡고 있으면 시작하지 않고 그 owner 를 반환합니다.
+    """
+    owner = _owner(gen or uuid.uuid4().hex[:12], prompt)
+    lock_key = _lock_key(document.id)
+    while not redis_client.set(lock_key, owner, nx=True, ex=settings.DOCUMENT_STREAM_LOCK_TTL):
+        held = redis_client.get(lock_key)
+        if held:
+            return held
+    text = _checkpoint_text(redis_client.xrange(_events_key(document.id, gen), max=f"0-{seq}")) if gen else ""
+    checkpoint = Checkpoint(document.id, owner, seq, text)
+    pipe = redis_client.pipeline()
+    checkpoint.queue(pipe)
+    pipe.execute()
+    threading.Thread(target=_produce, args=(document, prompt, checkpoint), daemon=True).start()
+    return owner
+
+
+async def _astart(document, prompt, gen=None, seq=0):
+    client = get_async_redis_client()
+    owner = _owner(gen or uuid.uuid4().hex[:12], prompt)
+    lock_key = _lock_key(document.id)
+    while not await client.set(lock_key, owner, nx=True, ex=settings.DOCUMENT_STREAM_LOCK_TTL):
+        held = await client.get(lock_key)
+        if held:
+            return held.decode()
+    text = ""
+    if gen:
+        entries = await client.xrange(_events_key(document.id, gen), max=f"0-{seq}")
+        text = _checkpoint_text([(event_id, _decode(fields)) for event_id, fields in entries])
+    checkpoint = Checkpoint(document.id, owner, seq, text)
+    pipe = client.pipeline()
+    checkpoint.queue(pipe)
+    await pipe.execute()
+    task = asyncio.get_running_loop().create_task(_aproduce(document, prompt, checkpoint))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return owner
+
+
+def _attach(owner, prompt):
+    # 진행 중인 생성이 같은 프롬프트이면 그 gen 에 붙음 (늦게 들어온 consumer 는 처음부터 읽음)
+    gen = owner.partition(":")[0]
+    if owner != _owner(gen, prompt):
+        raise Busy()
+    return gen
+
+
+def _to_sse(gen, event_id, fields):
+    seq = event_id.split("-")[1]
+    if "e" in fields:
+        if fields["e"] == FINISHED:
+            return f"id: {gen}.{seq}\nevent: done\ndata: [DONE]\n\n"
+        return f"id: {gen}.{seq}\nevent: error\ndata: {fields['m']}\n\n"
+    content = fields["c"].replace(" ", "&nbsp;").replace("\n", "<br>")
+    return f"id: {gen}.{seq}\ndata: {content}\n\n"
+
+
+def _final_event(gen, last):
+    # 끝난 생성의 종료 이벤트 (last: 스트림의 마지막 항목, 없거나 종료 이벤트가 아니면 오류 이벤트)
+    if last and "e" in last[0][1]:
+        return _to_sse(gen, *last[0])
+    return "event: error\ndata: 이어 받을 스트림이 없습니다.\n\n"
+
+
+def _same_prompt(state, gen, prompt):
+    # 마지막 생성이 같은 프롬프트로 시작되었는지 (다른 프롬프트의 텍스트에 이어 쓰지 않도록)
+    return bool(state) and state.get("gen") == gen and state.get("owner") == _owner(gen, prompt)
+
+
+def _resume_point(state, last_event_id, prompt):
+    # Last-Event-ID 가 같은 프롬프트로 시작된 마지막 생성의 이벤트이면 그 생성의 (gen, seq)
+    resume = parse_event_id(last_event_id)
+    if resume and _same_prompt(state, resume[0], prompt):
+        return resume
+    return None
+
+
+def _interrupted(state, prompt):
+    # 마지막 생성이 같은 프롬프트로 시작되어 끝나지 않았으면 (producer 가 살아 있지 않을 때) 그 체크포인트부터 이어서 생성
+    # 프롬프트가 다르면 새 생성으로 시작
+    if state and state["status"] == RUNNING and _same_prompt(state, state["gen"], prompt):
+        return state["gen"], int(state["seq"])
+    return ()
+
+
+def stream(document, prompt, last_event_id=None):
+    """
+    문서결과 SSE 문자열을 yield 하는 제너레이터를 반환합니다.
+    Last-Event-ID 가 마지막 생성의 이벤트이면 이어 받고, 아니면 진행 중인 생성에 붙거나 새로 생성합니다.
+    """
+    state = redis_client.hgetall(_state_key(document.id))
+    resume = _resume_point(state, last_event_id, prompt)
+    if resume:
+        gen, seq = resume
+    else:
+        gen, seq = _attach(_start(document, prompt, *_interrupted(state, prompt)), prompt), 0
+    return _consume(document, prompt, gen, seq)
+
+
+def _consume(document, prompt, gen, seq):
+    events_key = _events_key(document.id, gen)
+    last_id = f"0-{seq}"
+    while True:
+        entries = redis_client.xread({events_key: last_id}, count=_READ_COUNT, block=_BLOCK_MS)
+        for _, items in entries or []:
+            for event_id, fields in items:
+                last_id = event_id
+                yield _to_sse(gen, event_id, fields)
+                if "e" in fields:
+                    return
+        if entries:
+            continue
+
+        state = redis_client.hgetall(_state_key(document.id))
+        if state.get("gen") != gen:
+            # 체크포인트가 만료되었거나 새 생성으로 바뀜
+            yield "event: error\ndata: 이어 받을 스트림이 없습니다.\n\n"
+            return
+        if state["status"] != RUNNING:
+            # 종료 이벤트 이후의 Last-Event-ID 로 다시 연결함: 종료 이벤트를 다시 보내고 끝냄 (EventSource 재연결 중단)
+            yield _final_event(gen, redis_client.xrevrange(events_key, count=1))
+            return
+        if not redis_client.exists(_lock_key(document.id)):
+            # producer 가 사라짐: 체크포인트부터 이어서 생성
+            _start(document, prompt, gen, int(state["seq"]))
+        yield ": keep-alive\n\n"
+
+
+async def astream(document, prompt, last_event_id=None):
+    """
+    stream 의 비동기 버전입니다. (ASGI 모드)
+    """
+    client = get_async_redis_client()
+    state = _decode(await client.hgetall(_state_key(document.id)))
+    resume = _resume_point(state, last_event_id, prompt)
+    if resume:
+        gen, seq = resume
+    else:
+        gen, seq = _attach(await _astart(document, prompt, *_interrupted(state, prompt)), prompt), 0
+    return _aconsume(document, prompt, gen, seq)
+
+
+async def _aconsume(document, prompt, gen, seq):
+    client = get_async_redis_client()
+    events_key = _events_key(document.id, gen)
+    last_id = f"0-{seq}"
+    while True:
+        entries = await client.xread({events_key: last_id}, count=_READ_COUNT, block=_BLOCK_MS)
+        for _, items in entries or []:
+            for event_id, fields in items:
+                last_id = event_id.decode()
+                fields = _decode(fields)
+                yield _to_sse(gen, last_id, fields)
+                if "e" in fields:
+                    return
+        if entries:
+            continue
+
+        state = _decode(await client.hgetall(_state_key(document.id)))
+        if state.get("gen") != gen:
+            yield "event: error\ndata: 이어 받을 스트림이 없습니다.\n\n"
+            return
+        if state["status"] != RUNNING:
+            last = [(event_id.decode(), _decode(fields)) for event_id, fields in await client.xrevrange(events_key, count=1)]
+            yield _final_event(gen, last)
+            return
+        if not await client.exists(_lock_key(document.id)):
+            await _astart(document, prompt, gen, int(state["seq"]))
+        yield ": keep-alive\n\n"
@@ -1,82 +1,43 @@
-import os
-import redis
-import requests
-import subprocess
-import json
-from openai import OpenAI
+import logging
+
 from celery import shared_task
 from django.conf import settings
-import openai
-
-# Redis 클라이언트 생성
-redis_client = redis.StrictRedis(host="redis", port=6379, decode_responses=True)
-
-OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-openai.api_key = OPENAI_API_KEY
-api_key = settings.OPENAI_API_KEY
-
-# DeepSeek API 설정
-#api_key = os.environ.get("DEEPSEEK_API_KEY")
-#api_url = os.environ.get("DEEPSEEK_API_URL")
-
-def call_openai_api(prompt):
-    api_url = "https://api.openai.com/v1/chat/completions"
-    api_key = settings.OPENAI_API_KEY
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {api_key}"
-    }
-
-    payload = {
-        "model": "gpt-4o",  # 정확한 모델 이름으로 변경
-        "messages": [
-            {"role": "system", "content": "당신은 전문적인 기술 문서를 작성하는 전문가입니다."},
-            {"role": "user", "content": prompt}
-        ],
-        "stream": False
-    }
-
-    response = requests.post(api_url, json=payload, headers=headers)
 
-    if response.status_code == 200:
-        result = response.json()
-        return result["choices"][0]["message"]["content"]
-    else:
-        error_msg = response.json().get("error", "Unknown error occurred.")
-        raise Exception(f"DeepSeek API 호출 실패: {error_msg}")
+from document import jobs, writes
+from document.models import Document, DocumentArtifact, DocumentSearch, DocumentSearchTerm, DocumentVersion
+from llm.client import chat_completion, chat_completion_stream
 
+logger = logging.getLogger(__name__)
 
-    
+def call_openai_api(prompt, task=None, use_cache=True, job_id=None, artifact=None):
+    # 프로세스 공용 커넥션 풀을 통해 호출 (keep-alive, HTTP/2), task 지정 시 응답 캐시 사용
+    if not job_id:
+        return chat_completion(prompt, task=task, use_cache=use_cache)
 
-# def call_deepseek_api(prompt):
-#     payload = {
-#         "model": "deepseek-chat",
-#         "messages": [{"role": "user", "content": prompt}],
-#         "stream": False
-#     }
+    # 설계 생성 작업이면 생성 중인 토큰을 작업 스트림으로 전달 (SSE: documents/design/<job_id>/stream)
+    stream = jobs.ArtifactStream(job_id, artifact)
+    try:
+        return chat_completion_stream(prompt, stream.write, task=task, use_cache=use_cache)
+    finally:
+        stream.close()
 
-#     header = {
-#         "Content-Type": "application/json",
-#         "Authorization": "Bearer " + api_key
-#     }
 
-#     response = requests.post(api_url, json=payload, headers=header)
+def record_progress(job_id, artifact, status, error=None):
+    # 설계 생성 작업(document.jobs)의 산출물 상태와 진행 이벤트 기록 (job_id 없이 호출되면 무시)
+    if not job_id:
+        return
+    try:
+        jobs.record(job_id, status, artifact=artifact, error=error)
+    except Exception as e:
+        logger.warning(f"설계 작업 {job_id} 상태 기록 실패: {e}")
 
-#     if response.status_code == 200:
-#         result = response.json()
-#         return result["choices"][0]["message"]["content"]
-#     else:
-#         error_msg = response.json().get("error", "Unknown error occurred.")
-#         raise Exception(f"DeepSeek API 호출 실패: {error_msg}")
 
 @shared_task
-def create_diagram(data):
+def create_diagram(data, use_cache=True, job_id=None):
     """
     주어진 데이터를 기반으로 Mermaid 형식의 시퀀스 다이어그램을 생성합니다.
     """
-    channel = "task_updates"
-    redis_client.publish(channel, "create_diagram 작업 시작")
+    record_progress(job_id, "diagram", jobs.RUNNING)
 
     prompt = f"""
         {data}를 사용하여 체계적이고 상세한 시퀀스 다이어그램을 Mermaid 형식으로 코드를 생성해주세요. 다음 지시사항을 정확히 따라주세요:
@@ -112,62 +73,19 @@ def create_diagram(data):
     """
     try:
         # call_openai_api를 사용하여 다이어그램 코드 생성
-        diagram_code = call_openai_api(prompt)
+        diagram_code = call_openai_api(prompt, task="create_diagram", use_cache=use_cache, job_id=job_id, artifact="diagram")
         
-        redis_client.publish(channel, "create_diagram 작업 완료")
+        record_progress(job_id, "diagram", jobs.SUCCESS)
         return diagram_code
 
     except Exception as e:
-        redis_client.publish(channel, f"create_diagram 작업 실패: {e}")
+        record_progress(job_id, "diagram", jobs.FAILURE, e)
         raise Exception(f"Error generating sequence diagram: {e}")
 
-# @shared_task
-# def create_diagram(data):
-#     channel = "task_updates"
-#     redis_client.publish(channel, "create_diagram 작업 시작")
-
-#     prompt = f"""
-#         {data}를 사용하여 체계적이고 상세한 시퀀스 다이어그램을 Mermaid 형식으로 코드를 생성해주세요. 다음 지시사항을 정확히 따라주세요:
-
-#         1. **참여자(Actors) 정의**
-#         - 시스템에 참여하는 모든 참여자(Actors)를 식별하고, 각 참여자의 이름을 명확히 정의하세요.
-#         - 참여자 이름은 간결하고 직관적으로 작성하세요. (예: "User", "OrderSystem", "PaymentGateway")
-#         - 참여자 이름 뒤에 불필요한 접미사(예: "_모듈")를 붙이지 마세요.
-#         - 참여자는 되도록 많이 정의하세요.
-
-#         2. **메시지(Message) 정의**
-#         - 참여자 간에 주고받는 모든 메시지를 명확히 정의하세요.
-#         - 각 메시지는 발신자와 수신자를 명시하고, 메시지의 목적을 간략히 설명하세요.
-#         - 메세지는 되도록 많이 정의하세요.
-
-#         3. **흐름(Flow) 정의**
-#         - 메시지의 순서와 흐름을 명확히 정의하세요.
-#         - 조건부 흐름(예: if-else)이 있다면, 이를 명시하세요.
-
-#         4. **루프(Loop) 및 대안(Alternative) 정의**
-#         - 반복되는 흐름(루프)이나 대안적인 흐름이 있다면, 이를 명시하세요.
-
-#         5. **출력 형식**
-#         - 최종 시퀀스 다이어그램은 Mermaid 형식으로만 출력하세요.
-#         - 다른 부가 설명 없이 **오직 Mermaid 코드만** 출력하세요.
-
-#         **주의사항**:
-#         - 출력은 반드시 Mermaid 코드만 포함해야 합니다.
-#         - 추가 설명, 주석, 또는 다른 텍스트는 절대 포함하지 마세요.
-#         - 참여자 이름은 간결하고 직관적으로 작성하며, 불필요한 접미사(예: "_모듈")를 붙이지 마세요.
-#         """
-#     try:
-#         result = call_deepseek_api(prompt)
-#         redis_client.publish(channel, "create_diagram 작업 완료")
-#         return result
-#     except Exception as e:
-#         redis_client.publish(channel, f"create_diagram 작업 실패: {e}")
-#         raise
 
 @shared_task
-def create_erd(data):
-    channel = "task_updates"
-    redis_client.publish(channel, "create_erd 작업 시작")
+def create_erd(data, use_cache=True, job_id=None):
+    record_progress(job_id, "erd", jobs.RUNNING)
 
     prompt = f"""
         {data}를 사용하여 체계적이고 ERD를 Mermaid 형식으로 코드를 생성해주세요.
@@ -197,59 +115,22 @@ def create_erd(data):
     """
     try:
         # call_openai_api 함수 호출하여 Mermaid 코드 생성
-        diagram_code = call_openai_api(prompt)
+        diagram_code = call_openai_api(prompt, task="create_erd", use_cache=use_cache, job_id=job_id, artifact="erd")
 
         # 작업 완료 알림
-        redis_client.publish(channel, "create_erd 작업 완료")
+        record_progress(job_id, "erd", jobs.SUCCESS)
         
         return diagram_code
 
     except Exception as e:
         # 작업 실패 알림
-        redis_client.publish(channel, f"create_erd 작업 실패: {e}")
+        record_progress(job_id, "erd", jobs.FAILURE, e)
         raise
 
-# @shared_task
-# def create_erd(data):
-#     channel = "task_updates"
-#     redis_client.publish(channel, "create_erd 작업 시작")
-
-#     prompt = f"""
-        
-#         {data}를 사용하여 체계적이고 ERD를 Mermaid 형식으로 코드를 생성해주세요.
-#         다음 지시사항을 정확히 따라주세요:
-
-#         1. **엔티티와 필드**
-#         - 엔티티 간의 관계를 명확히 정의하세요.
-#         - 관계의 카디널리티(1:1, 1:N, M:N)를 명시하세요.
-#         - 외래 키(FK)를 사용하여 관계를 표현하세요. 외래 키는 관련된 엔티티의 기본 키(PK)를 참조해야 합니다.
-#         - 외래 키 필드 이름은 `[참조된 엔티티 이름]_id` 형식으로 작성하세요. (예: `user_id: integer`)
-        
-#         2. **관계**
-#         - 엔티티 간의 관계를 명확히 정의하세요.
-#         - 관계의 카디널리티(1:1, 1:N, M:N)를 명시하세요.
-#         - 외래 키를 사용할 경우, 필드 이름에 `_id`를 붙여 명시하세요. (예: `user_id: integer`)
-
-#         3. **출력 형식**
-#         - 출력은 Mermaid 형식으로만 제공하세요.
-#         - 다른 부가 설명은 생략하고, Mermaid 코드만 출력하세요.
-        
-#         4. **추가 요구사항**
-#         - 실제 환경에서 바로 사용할 수 있도록 체계적으로 고도화 및 모듈화를 해주세요.
-#     """
-#     try:
-#         result = call_deepseek_api(prompt)
-#         redis_client.publish(channel, "create_erd 작업 완료")
-#         return result
-#     except Exception as e:
-#         redis_client.publish(channel, f"create_erd 작업 실패: {e}")
-#         raise
-
 
 @shared_task
-def create_api(data):
-    channel = "task_updates"
-    redis_client.publish(channel, "create_api 작업 시작")
+def create_api(data, use_cache=True, job_id=None):
+    record_progress(job_id, "api", jobs.RUNNING)
 
     prompt = f"""
         {data}를 사용하여 체계적이고 API 명세서를 swagger.json 코드로 생성해주세요.
@@ -266,50 +147,60 @@ def create_api(data):
     """
     try:
         # call_openai_api 함수 호출하여 Swagger JSON 코드 생성
-        swagger_json_code = call_openai_api(prompt)
+        swagger_json_code = call_openai_api(prompt, task="create_api", use_cache=use_cache, job_id=job_id, artifact="api")
 
         # 작업 완료 알림
-        redis_client.publish(channel, "create_api 작업 완료")
+        record_progress(job_id, "api", jobs.SUCCESS)
         
         return swagger_json_code
 
     except Exception as e:
         # 작업 실패 알림
-        redis_client.publish(channel, f"create_api 작업 실패: {e}")
+        record_progress(job_id, "api", jobs.FAILURE, e)
         raise
 
 
-# @shared_task
-# def create_api(data):
-#     channel = "task_updates"
-#     redis_client.publish(channel, "create_api 작업 시작")
-
-#     prompt = f"""
-#         {data}를 사용하여 체계적이고 API 명세서를 swagger.json 코드로 생성해주세요.
-#         또한, 실제 환경에서 바로 사용할 수 있도록 체계적으로 고도화 및 모듈화를 해주세요.
-#         또한, 기본적인 crud를 포함해주세요.
-#         또한, 다른 부가설명말고 "swagger.json 코드만" 출력해주세요.
-        
-#         **출력 형식**:
-#         - 출력은 반드시 유효한 JSON 형식이어야 합니다.
-#         - JSON은 Swagger UI에서 바로 사용할 수 있도록 완전한 `swagger.json` 스펙을 따라야 합니다.
-#         - 다른 부가 설명 없이 **오직 JSON 코드만** 출력하세요.
-#         - JSON은 유효해야 하며, Swagger UI에서 바로 렌더링될 수 있어야 합니다.
-        
-        
-#     """
-#     try:
-#         result = call_deepseek_api(prompt)
-#         redis_client.publish(channel, "create_api 작업 완료")
-#         return result
-#     except Exception as e:
-#         redis_client.publish(channel, f"create_api 작업 실패: {e}")
-#         raise
-
 @shared_task
 def collect_results(results):
     return {
         "diagram": results[0],
         "erd": results[1],
         "api": results[2],
-    }
\ No newline at end of file
+    }
+
+
+@shared_task
+def save_design(results, document_id, job_id):
+    """
+    dev_document chord 의 콜백: 세 산출물을 Document 에 저장하고 작업을 완료 처리합니다.
+    """
+    final_result = collect_results(results)
+    try:
+        document = Document.objects.only("id", "updated_at").get(id=document_id)
+        writes.save_codes(document, final_result["diagram"], final_result["erd"], final_result["api"])
+    except Exception as e:
+        jobs.finish(job_id, document_id, jobs.FAILURE, error=f"설계 결과 저장 실패: {e}")
+        raise
+
+    jobs.finish(job_id, document_id, jobs.SUCCESS)
+    return final_result
+
+
+@shared_task
+def purge_document(document_id):
+    """
+    삭제된(soft delete) 문서의 산출물/버전/검색 색인 행을 삭제합니다.
+    행 잠금이 길어지지 않도록 DOCUMENT_PURGE_BATCH_SIZE 행씩 나눠서 삭제하고 삭제한 행 수를 반환합니다.
+    """
+    if not Document.all_objects.filter(id=document_id, deleted_at__isnull=False).exists():
+        return 0
+
+    purged = 0
+    for model in (DocumentVersion, DocumentArtifact, DocumentSearchTerm, DocumentSearch):
+        while True:
+            ids = list(model.objects.filter(document_id=document_id).values_list("pk", flat=True)[:settings.DOCUMENT_PURGE_BATCH_SIZE])
+            if not ids:
+                break
+            purged += model.objects.filter(pk__in=ids).delete()[0]
+    logger.info(f"문서 {document_id} 산출물/버전/검색 색인 {purged}행 삭제")
+    return purged
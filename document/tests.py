@@ -1,3 +1,641 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from config.db.pool import ConnectionPool, PoolTimeout
+from document import cache as document_cache
+from document import async_views, fulltext, jobs, streams, versions, writes
+from document.models import (
+    Document, DocumentArtifact, DocumentVersion, compress, decompress, decompress_prefix, iter_decompress,
+)
+from document.tasks import purge_document
+from login.models import User
+
+
+class WritesTest(TestCase):
+    """
+    document.writes 가 바뀐 컬럼만 UPDATE 하는지 실행된 SQL 로 확인합니다.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(github_username="writer", email="writer@example.com")
+
+    def setUp(self):
+        self.document = Document.objects.create(user_id=self.user, title="제목", content="내용")
+
+    def _document_updates(self, queries):
+        table = connection.ops.quote_name(Document._meta.db_table)
+        return [query["sql"] for query in queries if query["sql"].startswith(f"UPDATE {table}")]
+
+    def _assert_only_columns(self, sql, columns):
+        # SET 절에 columns 만 있는지 확인
+        set_clause = sql.split(" SET ", 1)[1].split(" WHERE ", 1)[0]
+        assigned = [part.split("=")[0].strip() for part in set_clause.split(", ")]
+        self.assertEqual(sorted(assigned), sorted(connection.ops.quote_name(column) for column in columns))
+
+    def test_save_result_updates_only_updated_at(self):
+        with CaptureQueriesContext(connection) as ctx:
+            writes.save_result(self.document, "결과")
+
+        updates = self._document_updates(ctx.captured_queries)
+        self.assertEqual(len(updates), 1)
+        self._assert_only_columns(updates[0], ["updated_at"])
+        self.assertEqual(DocumentArtifact.texts([self.document.id], "result"), {self.document.id: "결과"})
+
+    def test_save_codes_updates_only_updated_at(self):
+        document = Document.objects.only("id", "updated_at").get(id=self.document.id)
+        with CaptureQueriesContext(connection) as ctx:
+            writes.save_codes(document, "diagram", "erd", "api")
+
+        updates = self._document_updates(ctx.captured_queries)
+        self.assertEqual(len(updates), 1)
+        self._assert_only_columns(updates[0], ["updated_at"])
+        document = Document.objects.get(id=self.document.id)
+        document.load_artifacts("diagram_code", "erd_code", "api_code")
+        self.assertEqual((document.diagram_code, document.erd_code, document.api_code), ("diagram", "erd", "api"))
+
+    def test_save_flags_issues_single_update(self):
+        with CaptureQueriesContext(connection) as ctx:
+            updated = writes.save_flags(self.document.id, self.user, ["erd", "api"])
+
+        self.assertEqual(updated, 1)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self._assert_only_columns(ctx.captured_queries[0]["sql"], ["is_erd_saved", "is_api_saved", "updated_at"])
+        document = Document.objects.get(id=self.document.id)
+        self.assertEqual((document.is_diagram_saved, document.is_erd_saved, document.is_api_saved), (False, True, True))
+
+    def test_save_flags_missing_document(self):
+        self.assertEqual(writes.save_flags(self.document.id + 1, self.user, ["diagram"]), 0)
+
+    def test_update_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            writes.update_columns(self.user, access_token="token")
+
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self._assert_only_columns(ctx.captured_queries[0]["sql"], ["access_token"])
+
+
+class ArtifactStorageTest(TestCase):
+    """
+    큰 산출물이 document_artifact 에 압축 저장되고 읽을 때만 조회되는지 확인합니다.
+    """
+
+    TEXT = "## 요구사항 정의서\n" + "".join(f"- 기능 {i}: 사용자는 문서를 작성하고 수정할 수 있다.\n" for i in range(200))
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(github_username="artifact", email="artifact@example.com")
+
+    def test_stored_compressed(self):
+        document = Document.objects.create(user_id=self.user, title="제목", content="내용", result=self.TEXT)
+
+        row = DocumentArtifact.objects.get(document=document, name="result")
+        self.assertEqual(row.size, len(self.TEXT.encode()))
+        self.assertLess(len(row.data), row.size // 5)
+        self.assertEqual(decompress(row.data), self.TEXT)
+        # 새 문서의 빈 산출물은 행을 만들지 않음
+        self.assertEqual(list(DocumentArtifact.objects.filter(document=document).values_list("name", flat=True)), ["result"])
+
+    def test_loaded_on_first_access(self):
+        document = Document.objects.create(user_id=self.user, title="제목", content="내용", result=self.TEXT, erd_code="erd")
+
+        document = Document.objects.get(id=document.id)
+        with self.assertNumQueries(1):
+            self.assertEqual(document.result, self.TEXT)
+            self.assertEqual(document.result, self.TEXT)
+
+        document = Document.objects.get(id=document.id)
+        with self.assertNumQueries(1):
+            document.load_artifacts()
+            self.assertEqual((document.result, document.erd_code, document.api_code), (self.TEXT, "erd", ""))
+
+    def test_unchanged_artifact_is_not_rewritten(self):
+        document = Document.objects.create(user_id=self.user, title="제목", content="내용", result=self.TEXT)
+        document = Document.objects.get(id=document.id)
+        document.load_artifacts("result")
+
+        with self.assertNumQueries(0):
+            document.result = self.TEXT
+            DocumentArtifact.store(document, {"result": document.result})
+        self.assertEqual(DocumentVersion.objects.filter(document=document).count(), 1)
+
+    def test_partial_reads(self):
+        text = "가나다라마바사" * 1000
+        data = compress(text)
+        # 잘린 UTF-8 글자는 버리고 max_chars 까지
+        self.assertEqual(decompress(data, max_chars=10), text[:10])
+        self.assertEqual(decompress_prefix(data, 7), text.encode()[:7])
+        self.assertEqual(b"".join(iter_decompress(data, 1000)), text.encode())
+
+        document = Document.objects.create(user_id=self.user, title="제목", content="내용", result=text)
+        self.assertEqual(DocumentArtifact.texts([document.id], "result", max_chars=5), {document.id: text[:6]})
+
+
+class DeltaTest(SimpleTestCase):
+    CASES = [
+        ("", "한 줄\n"),
+        ("a\nb\nc\n", "a\nb\nc\n"),
+        ("a\nb\nc\n", "a\nB\nc\nd\n"),
+        ("a\nb\nc\n", "c\n"),
+        ("a\nb", "a\nb\n"),
+        ("a\r\nb\r\n", "a\r\nx\r\nb\r\n"),
+        ("a\nb\n", ""),
+    ]
+
+    def test_round_trip(self):
+        for old, new in self.CASES:
+            with self.subTest(old=old, new=new):
+                ops = versions.decode_delta(versions.encode_delta(versions.make_delta(old, new)))
+                self.assertEqual(versions.apply_delta(old, ops), new)
+
+    def test_delta_keeps_only_changed_lines(self):
+        old = "".join(f"{i}번째 줄\n" for i in range(100))
+        new = old.replace("50번째 줄\n", "수정한 줄\n")
+        self.assertEqual(versions.make_delta(old, new), [50, -1, ["수정한 줄\n"], 49])
+
+
+@override_settings(DOCUMENT_VERSION_SNAPSHOT_INTERVAL=3)
+class DocumentVersionTest(TestCase):
+    """
+    스냅샷 + 델타로 저장한 버전이 모두 원래 내용으로 복원되는지 확인합니다. (K=3)
+    """
+
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(github_username="versioner", email="versioner@example.com")
+
+    def setUp(self):
+        self.document = Document.objects.create(user_id=self.user, title="제목", content="내용")
+        self.lines = [f"- 기능 {i}: 사용자는 문서를 작성할 수 있다.\n" for i in range(100)]
+
+    def _save(self, count):
+        texts = []
+        for version in range(count):
+            self.lines[version * 7] = f"- 수정 {version}\n"
+            texts.append("".join(self.lines))
+            writes.save_result(self.document, texts[-1])
+        return texts
+
+    def _versions(self):
+        return list(DocumentVersion.objects.filter(document=self.document, name="result").order_by("version"))
+
+    def test_snapshot_every_k_versions(self):
+        self._save(7)
+        rows = self._versions()
+        self.assertEqual([row.version for row in rows], list(range(1, 8)))
+        self.assertEqual([row.is_snapshot for row in rows], [True, False, False, True, False, False, True])
+        # 델타는 바뀐 줄만 저장
+        self.assertTrue(all(len(row.data) < 100 for row in rows if not row.is_snapshot))
+
+        artifact = DocumentArtifact.objects.get(document=self.document, name="result")
+        self.assertEqual((artifact.version, artifact.snapshot_version), (7, 7))
+
+    def test_reconstruct_every_version(self):
+        texts = self._save(7)
+        for version, text in enumerate(texts, start=1):
+            with self.subTest(version=version):
+                self.assertEqual(DocumentVersion.text(self.document.id, "result", version), text)
+        self.assertIsNone(DocumentVersion.text(self.document.id, "result", 8))
+        self.assertIsNone(DocumentVersion.text(self.document.id, "erd_code", 1))
+
+    def test_large_delta_is_stored_as_snapshot(self):
+        writes.save_result(self.document, "짧은 내용\n")
+        writes.save_result(self.document, "완전히 다른 내용\n")
+        self.assertEqual([row.is_snapshot for row in self._versions()], [True, True])
+        self.assertEqual(DocumentVersion.text(self.document.id, "result", 2), "완전히 다른 내용\n")
+
+    def test_same_content_adds_no_version(self):
+        self._save(1)
+        writes.save_result(self.document, "".join(self.lines))
+        self.assertEqual(len(self._versions()), 1)
+
+    def test_version_api(self):
+        texts = self._save(3)
+        self.client.force_authenticate(self.user)
+        response = self.client.get(f"/api/v1/documents/{self.document.id}/versions/result/2")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"], {"version": 2, "text": texts[1]})
+        self.assertEqual(self.client.get(f"/api/v1/documents/{self.document.id}/versions/result/4").status_code, 404)
+
+
+class SoftDeleteTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(github_username="deleter", email="deleter@example.com")
+
+    def test_soft_delete_and_purge(self):
+        document = Document.objects.create(user_id=self.user, title="제목", content="내용")
+        writes.save_result(document, "결과 1")
+        writes.save_result(document, "결과 2")
+
+        self.assertEqual(Document.objects.filter(id=document.id).soft_delete(), 1)
+        self.assertFalse(Document.objects.filter(id=document.id).exists())
+        self.assertTrue(Document.all_objects.filter(id=document.id, deleted_at__isnull=False).exists())
+
+        self.assertGreater(purge_document(document.id), 0)
+        self.assertFalse(DocumentArtifact.objects.filter(document_id=document.id).exists())
+        self.assertFalse(DocumentVersion.objects.filter(document_id=document.id).exists())
+
+    def test_purge_ignores_alive_document(self):
+        document = Document.objects.create(user_id=self.user, title="제목", content="내용")
+        writes.save_result(document, "결과")
+
+        self.assertEqual(purge_document(document.id), 0)
+        self.assertTrue(DocumentArtifact.objects.filter(document_id=document.id).exists())
+
+
+class SearchTest(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(github_username="searcher", email="searcher@example.com")
+        cls.other = User.objects.create_user(github_username="other", email="other@example.com")
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def _search(self, **params):
+        response = self.client.get("/api/v1/documents/search", params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_terms(self):
+        self.assertEqual(fulltext.terms("문서검색 DB"), {"문서": 1, "서검": 1, "검색": 1, "db": 1})
+
+    def test_ranking_and_highlight(self):
+        weak = Document.objects.create(user_id=self.user, title="회의록", content="결제 기능은 다음에")
+        strong = Document.objects.create(user_id=self.user, title="결제 시스템", content="결제 API 설계")
+        writes.save_result(strong, "PG 결제 연동 결과")
+        Document.objects.create(user_id=self.user, title="로그인", content="소셜 로그인")
+        Document.objects.create(user_id=self.other, title="결제", content="다른 사용자")
+
+        body = self._search(q="결제")
+        self.assertEqual([row["id"] for row in body["data"]], [strong.id, weak.id])
+        self.assertEqual(body["data"][0]["highlights"]["title"], "<em>결제</em> 시스템")
+        self.assertIn("<em>결제</em>", body["data"][0]["highlights"]["result"])
+        self.assertIsNone(body["next_cursor"])
+
+    def test_index_follows_updates(self):
+        document = Document.objects.create(user_id=self.user, title="배포 설계", content="도커")
+        document.title = "모니터링 설계"
+        document.save(update_fields=["title"])
+
+        self.assertEqual(self._search(q="배포")["data"], [])
+        self.assertEqual([row["id"] for row in self._search(q="모니터링")["data"]], [document.id])
+
+        Document.objects.filter(id=document.id).soft_delete()
+        self.assertEqual(self._search(q="모니터링")["data"], [])
+
+    def test_pagination(self):
+        ids = [Document.objects.create(user_id=self.user, title=f"검색 {i}", content="내용").id for i in range(5)]
+
+        first = self._search(q="검색", page_size=3)
+        second = self._search(q="검색", page_size=3, cursor=first["next_cursor"])
+        self.assertEqual(len(first["data"]), 3)
+        self.assertIsNone(second["next_cursor"])
+        self.assertEqual(sorted(row["id"] for row in first["data"] + second["data"]), ids)
+
+    def test_invalid_query(self):
+        self.assertEqual(self.client.get("/api/v1/documents/search", {"q": " "}).status_code, 400)
+        self.assertEqual(self.client.get("/api/v1/documents/search", {"q": "검색", "cursor": "!"}).status_code, 400)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class DocumentCacheTest(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(github_username="reader", email="reader@example.com")
+
+    def setUp(self):
+        self.document = Document.objects.create(user_id=self.user, title="제목", content="내용")
+        document_cache.local.discard(self.document.id)
+
+    def test_read_through(self):
+        document_cache.get_document(self.document.id)
+        with self.assertNumQueries(0):
+            document = document_cache.get_document(self.document.id, self.user.id)
+        self.assertEqual(document.title, "제목")
+        with self.assertRaises(Document.DoesNotExist):
+            document_cache.get_document(self.document.id, self.user.id + 1)
+
+        # 프로세스 메모리에 있으면 세대 값도 메모리에서 읽음 (Redis 를 거치지 않음)
+        with mock.patch.object(document_cache, "cache") as redis_cache:
+            document_cache.get_document(self.document.id)
+        self.assertEqual(redis_cache.mock_calls, [])
+
+        # 프로세스 메모리에 없으면 Redis 에서 읽음
+        document_cache.local.discard(self.document.id)
+        before = document_cache.stats()["row"]["redis"]
+        with self.assertNumQueries(0):
+            document_cache.get_document(self.document.id)
+        self.assertEqual(document_cache.stats()["row"]["redis"], before + 1)
+
+    def test_save_invalidates(self):
+        document = document_cache.get_document(self.document.id)
+        document.title = "바뀐 제목"
+        document.save(update_fields=["title"])
+        self.assertEqual(document_cache.get_document(self.document.id).title, "바뀐 제목")
+
+    def test_detail_follows_flags_and_delete(self):
+        url = f"/api/v1/login/profile/{self.document.id}"
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(url).json()["message"], "저장된 문서가 없습니다.")
+
+        writes.save_codes(self.document, "diagram", "erd", "api")
+        writes.save_flags(self.document.id, self.user, ["erd"])
+        self.assertEqual(self.client.get(url).json()["erd_code"], "erd")
+
+        Document.objects.filter(id=self.document.id).soft_delete()
+        document_cache.invalidate(self.document.id)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class ConditionalGetTest(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(github_username="poller", email="poller@example.com")
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        self.document = Document.objects.create(user_id=self.user, title="제목", content="내용")
+        writes.save_codes(self.document, "diagram", "erd", "api" * 1000)
+        writes.save_flags(self.document.id, self.user, ["api"])
+
+    def _assert_revalidates(self, url, **headers):
+        response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **headers)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b"")
+        self.assertEqual(not_modified["ETag"], etag)
+        return etag
+
+    def test_detail(self):
+        url = f"/api/v1/login/profile/{self.document.id}"
+        etag = self._assert_revalidates(url)
+
+        # 304 는 캐시된 ETag 로 응답 (DB 조회 없음)
+        with self.assertNumQueries(0):
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        writes.save_codes(self.document, "diagram", "erd", "new api")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list(self):
+        etag = self._assert_revalidates("/api/v1/documents/")
+        writes.save_result(self.document, "결과")
+        self.assertEqual(self.client.get("/api/v1/documents/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_artifact(self):
+        url = f"/api/v1/documents/{self.document.id}/artifacts/api"
+        identity = self._assert_revalidates(url)
+        deflate = self._assert_revalidates(url, HTTP_ACCEPT_ENCODING="deflate")
+        self.assertNotEqual(identity, deflate)
+
+    def test_detail_fields(self):
+        url = f"/api/v1/login/profile/{self.document.id}"
+        writes.save_flags(self.document.id, self.user, ["erd"])
+
+        body = self.client.get(url, {"fields": "erd_code"}).json()
+        self.assertEqual(body, {"document_id": self.document.id, "document_title": "제목", "erd_code": "erd"})
+        self.assertIn("api_code", self.client.get(url).json())
+        self.assertEqual(self.client.get(url, {"fields": "result"}).status_code, 400)
+
+        # fields 조합마다 다른 ETag
+        self.assertNotEqual(self.client.get(url, {"fields": "erd_code"})["ETag"], self.client.get(url)["ETag"])
+
+    def test_artifact_range(self):
+        url = f"/api/v1/documents/{self.document.id}/artifacts/api"
+        text = ("api" * 1000).encode()
+
+        full = self.client.get(url)
+        self.assertEqual(b"".join(full.streaming_content), text)
+        self.assertEqual(full["Content-Length"], str(len(text)))
+        self.assertEqual(full["Accept-Ranges"], "bytes")
+
+        for header, start, end in (("bytes=0-9", 0, 9), ("bytes=2990-", 2990, 2999), ("bytes=-4", 2996, 2999)):
+            response = self.client.get(url, HTTP_RANGE=header, HTTP_ACCEPT_ENCODING="deflate")
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(response.content, text[start:end + 1])
+            self.assertEqual(response["Content-Range"], f"bytes {start}-{end}/{len(text)}")
+
+        unsatisfiable = self.client.get(url, HTTP_RANGE="bytes=5000-")
+        self.assertEqual(unsatisfiable.status_code, 416)
+        self.assertEqual(unsatisfiable["Content-Range"], f"bytes */{len(text)}")
+
+        # If-Range 가 현재 ETag 와 다르면 전체 응답
+        self.assertEqual(self.client.get(url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"old"').status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=full["ETag"]).status_code, 206)
+
+
+
+class DesignJobStatusTest(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(github_username="designer", email="designer@example.com")
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        self.document = Document.objects.create(user_id=self.user, title="제목", content="내용")
+        writes.save_codes(self.document, "diagram", "erd", "api")
+
+    def test_succeeded_job_returns_artifacts(self):
+        job = {
+            "job_id": "job", "document_id": self.document.id, "user_id": self.user.id, "status": jobs.SUCCESS,
+            "diagram": jobs.SUCCESS, "erd": jobs.SUCCESS, "api": jobs.SUCCESS,
+        }
+        with mock.patch.object(jobs, "get", return_value=job):
+            response = self.client.get("/api/v1/documents/design/job")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("user_id", response.data["data"])
+        self.assertEqual(response.data["data"]["result"], {"diagram": "diagram", "erd": "erd", "api": "api"})
+
+    def test_failed_dispatch_fails_job(self):
+        # chord 를 시작하지 못하면 작업을 실패로 끝내서 문서 키를 해제
+        with mock.patch.object(jobs, "create", return_value=("job", True)), \
+                mock.patch.object(jobs, "finish") as finish, \
+                mock.patch("document.views.chord", side_effect=RuntimeError("broker down")):
+            response = self.client.post(f"/api/v1/documents/{self.document.id}/design")
+
+        self.assertEqual(response.status_code, 500)
+        finish.assert_called_once_with("job", self.document.id, jobs.FAILURE, error="broker down")
+
+
+class DesignJobEventsTest(SimpleTestCase):
+    def test_record_event_fields(self):
+        with mock.patch.object(jobs, "redis_client") as client, mock.patch.object(jobs.progress, "publish") as publish:
+            pipe = client.pipeline.return_value
+            pipe.execute.return_value = [1, {"user_id": "7", "diagram": jobs.SUCCESS, "erd": jobs.FAILURE}]
+            jobs.record("job", jobs.FAILURE, "erd", error="boom")
+
+        events = [call.args[1] for call in pipe.xadd.call_args_list]
+        self.assertEqual([(event["stage"], event["percent"]) for event in events], [("erd.failed", 30), ("design.failed", 30)])
+        for event in events:
+            self.assertEqual((event["job"], event["error"]), ("job", "boom"))
+            self.assertIsInstance(event["ts"], int)
+        publish.assert_called_once_with("job", 7, "erd.failed", 30, message="boom", done=True)
+
+    def test_to_sse(self):
+        # Redis 에서 읽은 값은 문자열이므로 percent, ts 는 숫자로 바꿔서 보냄
+        fields = {"job": "job", "stage": "erd.completed", "artifact": "erd", "status": jobs.SUCCESS, "percent": "30", "ts": "1700000000000"}
+        self.assertEqual(
+            jobs.to_sse("1-0", fields),
+            'id: 1-0\nevent: progress\ndata: {"job": "job", "stage": "erd.completed", "artifact": "erd", '
+            '"status": "success", "percent": 30, "ts": 1700000000000}\n\n',
+        )
+        self.assertTrue(jobs.to_sse("1-0", {"artifact": "erd", "delta": "토큰"}).startswith("id: 1-0\nevent: erd\n"))
+
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class AsyncUpdateStreamTest(TestCase):
+    """
+    ASGI 수정 스트리밍 뷰가 이벤트 루프에서 동기 쿼리 없이 기존 결과로 프롬프트를 만드는지 확인합니다.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(github_username="editor", email="editor@example.com")
+
+    def setUp(self):
+        self.document = Document.objects.create(user_id=self.user, title="제목", content="내용")
+        writes.save_result(self.document, "기존 결과")
+        document_cache.local.discard(self.document.id)
+
+    async def test_update_prompt_includes_result(self):
+        prompts = []
+
+        async def astream(document, prompt, last_event_id=None):
+            prompts.append(prompt)
+
+            async def sse():
+                yield "event: done\ndata: [DONE]\n\n"
+            return sse()
+
+        request = AsyncRequestFactory().put(
+            f"/api/v1/documents/{self.document.id}/update", data={"modifications": "추가"}, content_type="application/json",
+        )
+        with mock.patch.object(async_views, "get_request_user", mock.AsyncMock(return_value=self.user)), \
+                mock.patch.object(streams, "astream", astream):
+            response = await async_views.update_stream_document(request, self.document.id)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("기존 결과", prompts[0])
+        self.assertIn("추가", prompts[0])
+
+class StreamResumeTest(SimpleTestCase):
+    """
+    끝난 생성에 종료 이벤트 이후의 Last-Event-ID 로 다시 연결하면 keep-alive 를 계속 보내지 않고 끝나는지 확인합니다.
+    """
+
+    def test_reconnect_after_final_event_ends_stream(self):
+        client = mock.Mock()
+        client.xread.return_value = []
+        client.hgetall.return_value = {"gen": "g1", "status": streams.FINISHED, "seq": "5"}
+        client.xrevrange.return_value = [("0-5", {"e": streams.FINISHED})]
+        document = mock.Mock(id=1)
+
+        with mock.patch.object(streams, "redis_client", client):
+            events = list(streams._consume(document, "prompt", "g1", 5))
+
+        self.assertEqual(events, ["id: g1.5\nevent: done\ndata: [DONE]\n\n"])
+        client.exists.assert_not_called()
+
+    def _start_args(self, prompt, last_event_id=None):
+        # 마지막 생성(프롬프트 "old")의 producer 가 사라진 상태에서 스트리밍을 시작할 때 _start 에 넘긴 체크포인트 (호출하지 않으면 None)
+        client = mock.Mock()
+        client.hgetall.return_value = {
+            "gen": "g1", "owner": streams._owner("g1", "old"), "status": streams.RUNNING, "seq": "3",
+        }
+        with mock.patch.object(streams, "redis_client", client), \
+                mock.patch.object(streams, "_start", return_value=streams._owner("g2", prompt)) as start, \
+                mock.patch.object(streams, "_consume"):
+            streams.stream(mock.Mock(id=1), prompt, last_event_id)
+        return start.call_args.args[2:] if start.called else None
+
+    def test_interrupted_generation_resumes_only_with_same_prompt(self):
+        self.assertEqual(self._start_args("old"), ("g1", 3))
+        self.assertIsNone(self._start_args("old", "g1.2"))
+        # 다른 프롬프트(예: 다른 수정사항)는 이전 텍스트에 이어 쓰지 않고 새 생성
+        self.assertEqual(self._start_args("new"), ())
+        self.assertEqual(self._start_args("new", "g1.2"), ())
+
+class PooledConnection:
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+
+    def ping(self):
+        if not self.alive:
+            raise OSError("gone away")
+
+    def rollback(self):
+        self.ping()
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    """
+    config.db.pool 의 연결 재사용, 초과 연결, 대기 시간 초과, pre-ping 을 확인합니다.
+    """
+
+    def _pool(self, **options):
+        return ConnectionPool("test", PooledConnection, ping=lambda connection: connection.ping(), **options)
+
+    def test_reuses_returned_connection(self):
+        pool = self._pool(size=1, max_overflow=0)
+        first = pool.checkout()
+        pool.checkin(first)
+        self.assertIs(pool.checkout(), first)
+        self.assertEqual(pool.stats()["opened"], 1)
+
+    def test_overflow_is_closed_on_checkin(self):
+        pool = self._pool(size=1, max_overflow=1)
+        first, second = pool.checkout(), pool.checkout()
+        # 다른 연결이 사용 중이라 풀 크기를 넘으므로 먼저 반환한 연결을 닫음
+        pool.checkin(first)
+        pool.checkin(second)
+        self.assertTrue(first.closed)
+        self.assertFalse(second.closed)
+        self.assertEqual(pool.stats(), {
+            "size": 1, "max_overflow": 1, "opened": 1, "in_use": 0, "idle": 1,
+            "events": {"timeout": 0, "ping_failed": 0, "recycled": 0},
+        })
+
+    def test_timeout_when_exhausted(self):
+        pool = self._pool(size=1, max_overflow=0, timeout=0.01)
+        pool.checkout()
+        with self.assertRaises(PoolTimeout):
+            pool.checkout()
+        self.assertEqual(pool.stats()["events"]["timeout"], 1)
+
+    def test_pre_ping_replaces_dead_connection(self):
+        pool = self._pool(size=1, max_overflow=0)
+        first = pool.checkout()
+        pool.checkin(first)
+        first.alive = False
+        second = pool.checkout()
+        self.assertIsNot(second, first)
+        self.assertTrue(first.closed)
+        self.assertEqual(pool.stats()["events"]["ping_failed"], 1)
+        self.assertEqual(pool.stats()["opened"], 1)
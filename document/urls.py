@@ -1,13 +1,30 @@
 from .views import setup_project, stream_document, update_stream_document
+from django.conf import settings
 from django.urls import path
-from document.views import documents, update_document, dev_document, save_document_part
+from document import async_views
+from document.views import documents, search_documents, update_document, dev_document, save_document_part, document_artifact, document_versions, document_version, document_version_diff, design_job_status, design_job_events, design_job_stream
+
+# ASGI 모드에서는 스트리밍 API를 비동기 뷰로 제공
+if settings.SERVER_MODE == "asgi":
+    stream_document = async_views.stream_document
+    update_stream_document = async_views.update_stream_document
+    design_job_events = async_views.design_job_events
+    design_job_stream = async_views.design_job_stream
 
 urlpatterns = [
     path('', documents, name="documents"),
+    path('search', search_documents, name="search_documents"),
     path('<int:document_id>/stream', stream_document, name = "stream_document"),
     path('<int:document_id>/update', update_stream_document, name = "update_stream_document"),
     path('<int:document_id>/design', dev_document, name = "dev_document"),
     path('<int:document_id>/save',save_document_part, name = "save_document_part"),
+    path('<int:document_id>/artifacts/<str:name>', document_artifact, name = "document_artifact"),
+    path('<int:document_id>/versions/<str:name>', document_versions, name = "document_versions"),
+    path('<int:document_id>/versions/<str:name>/diff', document_version_diff, name = "document_version_diff"),
+    path('<int:document_id>/versions/<str:name>/<int:version>', document_version, name = "document_version"),
+    path('design/<str:job_id>', design_job_status, name = "design_job_status"),
+    path('design/<str:job_id>/events', design_job_events, name = "design_job_events"),
+    path('design/<str:job_id>/stream', design_job_stream, name = "design_job_stream"),
 
     #path('setup-project/<int:document_id>/', setup_project, name='setup_project'),
-]
\ No newline at end of file
+]
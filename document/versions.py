@@ -0,0 +1,63 @@
+"""
+문서 산출물 버전 기록(DocumentVersion)의 줄 단위 델타입니다.
+
+산출물이 바뀔 때마다 버전을 하나 추가하되, DOCUMENT_VERSION_SNAPSHOT_INTERVAL(K) 버전마다 전체 내용(스냅샷)을,
+그 사이에는 이전 버전과의 차이(델타)만 저장하므로 저장 공간은 문서 크기가 아니라 수정한 양에 비례합니다.
+어떤 버전이든 가장 가까운 이전 스냅샷에서 최대 K-1 개의 델타를 적용해 복원합니다.
+
+델타는 이전 버전의 줄 목록에 대한 연산 목록입니다.
+    양수 n      이전 버전의 다음 n 줄을 그대로 사용
+    음수 -n     이전 버전의 다음 n 줄을 건너뜀
+    문자열 목록   새 줄 추가
+"""
+import difflib
+import json
+import zlib
+
+from django.conf import settings
+
+
+def make_delta(old, new):
+    a = old.splitlines(keepends=True)
+    b = new.splitlines(keepends=True)
+    ops = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            ops.append(i2 - i1)
+            continue
+        if i2 > i1:
+            ops.append(-(i2 - i1))
+        if j2 > j1:
+            ops.append(b[j1:j2])
+    return ops
+
+
+def apply_delta(old, ops):
+    lines = old.splitlines(keepends=True)
+    out = []
+    index = 0
+    for op in ops:
+        if isinstance(op, list):
+            out.extend(op)
+        elif op > 0:
+            out.extend(lines[index:index + op])
+            index += op
+        else:
+            index -= op
+    return "".join(out)
+
+
+def encode_delta(ops):
+    return zlib.compress(json.dumps(ops, ensure_ascii=False, separators=(",", ":")).encode(),
+                         settings.DOCUMENT_ARTIFACT_COMPRESS_LEVEL)
+
+
+def decode_delta(data):
+    return json.loads(zlib.decompress(data))
+
+
+def unified_diff(old, new, from_version, to_version):
+    return "".join(difflib.unified_diff(
+        old.splitlines(keepends=True), new.splitlines(keepends=True),
+        fromfile=f"v{from_version}", tofile=f"v{to_version}",
+    ))
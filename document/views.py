@@ -1,36 +1,38 @@
-import json
 import os
+import re
 
-import certifi
-import openai
-import requests
 from celery import chord
 
-from django.http import JsonResponse, StreamingHttpResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
 from config import settings
-from .tasks import create_diagram, collect_results, create_erd, create_api, redis_client
-
-from document.models import Document
+from config.db.pool import release_connections
+from .tasks import create_diagram, create_erd, create_api, save_design
+
+from document import cache as document_cache
+from document import conditional, fulltext, jobs, search, streams, writes
+from document.models import Document, DocumentArtifact, DocumentVersion, decompress_prefix, iter_decompress
+from document.pagination import InvalidPage, attach_artifact, get_preview, page
+from document.renderers import EventStreamRenderer, PlainTextRenderer
+from document.prompts import build_stream_prompt, build_update_prompt
 from document.serializers import CreateDocumentSerializer, UpdateDocumentSerializer
+from document.versions import unified_diff
 from Tech_Stack.tasks import generate_project_structure, push_to_github
 
 from login.models import Project
+from llm.cache import use_cache_from_request
+from llm.client import chat_completion
 import logging
 
 logger = logging.getLogger(__name__)
 
-OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-openai.api_key = OPENAI_API_KEY
-
-# openai.api_key = os.environ.get("DEEPSEEK_API_KEY")
-# openai.api_base = os.environ.get("DEEPSEEK_API_URL")
 
 # 문서 생성 api
 @swagger_auto_schema(
@@ -46,6 +48,11 @@ openai.api_key = OPENAI_API_KEY
 @swagger_auto_schema(
     methods=['GET'],
     operation_summary="사용자 전체 문서 조회 API",
+    manual_parameters=[
+        openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="한 페이지의 문서 수"),
+        openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="이전 응답의 next_cursor"),
+        openapi.Parameter('preview', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="result 를 이 글자 수까지만 반환"),
+    ],
     responses={
         200: openapi.Response(
             description="문서 리스트 조회 성공",
@@ -61,12 +68,16 @@ openai.api_key = OPENAI_API_KEY
                                 "id": openapi.Schema(type=openapi.TYPE_INTEGER, description="문서 ID"),
                                 "title": openapi.Schema(type=openapi.TYPE_STRING, description="문서 제목"),
                                 "result": openapi.Schema(type=openapi.TYPE_STRING, description="AI 처리 결과"),
+                                "truncated": openapi.Schema(type=openapi.TYPE_BOOLEAN, description="preview 로 result 가 잘렸는지 여부"),
                             },
                         ),
                     ),
+                    "next_cursor": openapi.Schema(type=openapi.TYPE_STRING, description="다음 페이지 커서 (마지막 페이지면 null)"),
                 },
             ),
         ),
+        304: "Not Modified (If-None-Match 가 ETag 와 같음)",
+        400: "Bad Request",
         500: "Internal Server Error",
     },
 )
@@ -123,30 +134,102 @@ def documents(request):
                 }, status = status.HTTP_400_BAD_REQUEST)
 
     elif request.method == "GET":
-        # 문서 조회 로직
+        # 문서 조회 로직 (최신순 커서 페이지네이션, 목록에 필요한 컬럼만 조회)
+        # 페이지의 updated_at 과 result 해시로 ETag 를 만들어 바뀌지 않았으면 result 를 읽지 않고 304 반환
         try:
-            documents = Document.objects.filter(user_id=user)
-
-            document_list = [
-                {
-                    "id": document.id,
-                    "title": document.title,
-                    "result": document.result,
-                }
-                for document in documents
-            ]
-
-            return JsonResponse({
+            preview = get_preview(request)
+            document_list, next_cursor = page(Document.objects.filter(user_id=user), request, ["id", "title", "updated_at"])
+            etag = conditional.list_etag(document_list, next_cursor, artifact="result", preview=preview)
+            not_modified = conditional.not_modified(request, etag)
+            if not_modified:
+                return not_modified
+
+            attach_artifact(document_list, "result", preview)
+            for row in document_list:
+                row.pop("updated_at")
+
+            return conditional.set_headers(JsonResponse({
                 "status": "success",
                 "data": document_list,
-            }, status=200)
+                "next_cursor": next_cursor,
+            }, status=200), etag)
 
+        except InvalidPage as e:
+            return JsonResponse({
+                "status": "error",
+                "message": str(e),
+            }, status=400)
         except Exception as e:
             return JsonResponse({
                 "status": "error",
                 "message": str(e),
             }, status=500)
 
+#----------------------------------------------------------
+# 문서 검색 api
+@swagger_auto_schema(
+    method='get',
+    operation_summary="문서 검색 API",
+    operation_description="사용자 문서의 제목, 내용, 요구사항, 결과에서 검색어를 찾아 관련도순으로 반환합니다.",
+    manual_parameters=[
+        openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="검색어", required=True),
+        openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="한 페이지의 문서 수"),
+        openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="이전 응답의 next_cursor"),
+    ],
+    responses={
+        200: openapi.Response(
+            description="문서 검색 성공",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "status": openapi.Schema(type=openapi.TYPE_STRING, example="success"),
+                    "data": openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                "id": openapi.Schema(type=openapi.TYPE_INTEGER, description="문서 ID"),
+                                "title": openapi.Schema(type=openapi.TYPE_STRING, description="문서 제목"),
+                                "score": openapi.Schema(type=openapi.TYPE_NUMBER, description="관련도 점수"),
+                                "highlights": openapi.Schema(
+                                    type=openapi.TYPE_OBJECT,
+                                    description="검색어가 나온 필드(title/content/requirements/result)별 하이라이트 (<em>)",
+                                ),
+                            },
+                        ),
+                    ),
+                    "next_cursor": openapi.Schema(type=openapi.TYPE_STRING, description="다음 페이지 커서 (마지막 페이지면 null)"),
+                },
+            ),
+        ),
+        400: "Bad Request",
+    },
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def search_documents(request):
+    query = request.GET.get("q", "").strip()
+    if not fulltext.words(query):
+        return JsonResponse({
+            "status": "error",
+            "message": "검색어(q)를 입력해 주세요.",
+        }, status=400)
+
+    try:
+        rows, next_cursor = search.search(request.user.id, query, request)
+    except InvalidPage as e:
+        return JsonResponse({
+            "status": "error",
+            "message": str(e),
+        }, status=400)
+
+    return JsonResponse({
+        "status": "success",
+        "data": rows,
+        "next_cursor": next_cursor,
+    }, status=200)
+
+
 #----------------------------------------------------------
 # 문서 수정 api
 @swagger_auto_schema(
@@ -178,11 +261,11 @@ def update_document(request, document_id):
         try:
             # 사용자 정보 확인
             user = request.user
-            document = Document.objects.get(id = document_id, user_id = user)
+            document = document_cache.get_document(document_id, user.id)
 
             prompt_input = serializer.validated_data.get("prompt")
 
-            # DeepSeek API 호출을 위한 프롬프트 생성
+            # LLM 호출을 위한 프롬프트 생성
             prompt = f"""
                             Title: {document.title}
                             Content: {document.content}
@@ -237,17 +320,20 @@ def update_document(request, document_id):
         ),
     ],
     responses = {
-        200: openapi.Response(
-            description="설계 생성 성공",
+        202: openapi.Response(
+            description="설계 생성 작업 시작 (진행 상황은 status_url / events_url 로 확인)",
             schema=openapi.Schema(
                 type=openapi.TYPE_OBJECT,
                 properties={
-                    "status": openapi.Schema(type=openapi.TYPE_STRING, example="success"),
+                    "status": openapi.Schema(type=openapi.TYPE_STRING, example="accepted"),
                     "data": openapi.Schema(
                         type=openapi.TYPE_OBJECT,
                         properties={
-                            "id": openapi.Schema(type=openapi.TYPE_INTEGER, description="설계 문서 ID"),
-                            "response": openapi.Schema(type=openapi.TYPE_STRING, description="AI 처리 결과"),
+                            "job_id": openapi.Schema(type=openapi.TYPE_STRING, description="설계 생성 작업 ID"),
+                            "document_id": openapi.Schema(type=openapi.TYPE_INTEGER, description="설계 문서 ID"),
+                            "status_url": openapi.Schema(type=openapi.TYPE_STRING, description="작업 상태 조회 API"),
+                            "events_url": openapi.Schema(type=openapi.TYPE_STRING, description="진행 상황 SSE API"),
+                            "stream_url": openapi.Schema(type=openapi.TYPE_STRING, description="산출물 실시간 스트리밍 SSE API"),
                         },
                     ),
                 },
@@ -263,7 +349,7 @@ def update_document(request, document_id):
 def dev_document(request, document_id):
     try:
         user = request.user
-        document = Document.objects.get(id=document_id, user_id = user)
+        document = document_cache.get_document(document_id, user.id)
 
     except Document.DoesNotExist:
         return Response({
@@ -271,39 +357,161 @@ def dev_document(request, document_id):
             "message": "해당 설계 문서를 찾을 수 없습니다."
         }, status=status.HTTP_404_NOT_FOUND)
 
-    # chord 병렬 작업 실행(모두 완료되면 콜백)
-    task_chord = chord(
-        [
-            create_diagram.s(document.result),
-            create_erd.s(document.result),
-            create_api.s(document.result),
-        ]
-    )(collect_results.s())
+    # chord 병렬 작업 실행(모두 완료되면 콜백이 Document 에 저장) 후 결과를 기다리지 않고 job_id 반환
+    # 같은 document.result 로 다시 요청하면 캐시된 결과를 사용 (no_cache=true 로 우회)
+    use_cache = use_cache_from_request(request)
 
+    job_id, created = None, False
     try:
-        final_result = task_chord.get(timeout = 120)
-
-        try:
-            redis_client.publish("task_updates", f"Document {document_id} 작업 완료")
-        except Exception as e:
-            print(f"Redis publish 실패: {str(e)}")
+        job_id, created = jobs.create(document.id, user.id)
+        if created:
+            chord(
+                [
+                    create_diagram.s(document.result, use_cache=use_cache, job_id=job_id),
+                    create_erd.s(document.result, use_cache=use_cache, job_id=job_id),
+                    create_api.s(document.result, use_cache=use_cache, job_id=job_id),
+                ]
+            )(save_design.s(document.id, job_id))
 
     except Exception as e:
-        redis_client.publish("task_updates", f"Document {document_id} 작업 실패: {str(e)}")
+        logger.error(f"설계 생성 작업 시작 실패: {str(e)}")
+        if created:
+            # chord 를 시작하지 못함: 작업을 실패로 끝내고 문서 키를 해제해서 다시 요청할 수 있게 함
+            try:
+                jobs.finish(job_id, document.id, jobs.FAILURE, error=str(e))
+            except Exception as finish_error:
+                logger.warning(f"설계 작업 {job_id} 실패 기록 실패: {finish_error}")
         return Response({
             "status": "error",
             "message": str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    document.diagram_code = final_result["diagram"]
-    document.erd_code = final_result["erd"]
-    document.api_code = final_result["api"]
-    document.save()
+    return Response({
+        "status": "accepted",
+        "data": {
+            "job_id": job_id,
+            "document_id": document.id,
+            "status_url": f"/api/v1/documents/design/{job_id}",
+            "events_url": f"/api/v1/documents/design/{job_id}/events",
+            "stream_url": f"/api/v1/documents/design/{job_id}/stream",
+        },
+    }, status = status.HTTP_202_ACCEPTED)
+
+#----------------------------------------------------------
+# 설계 생성 작업 상태 조회 api
+@swagger_auto_schema(
+    method = 'get',
+    operation_summary = "설계 생성 작업 상태 조회 API",
+    responses = {
+        200: openapi.Response(
+            description="작업 상태 (status: pending/running/success/failure, 산출물별 상태, 완료 시 결과)",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "status": openapi.Schema(type=openapi.TYPE_STRING, example="success"),
+                    "data": openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            "job_id": openapi.Schema(type=openapi.TYPE_STRING),
+                            "document_id": openapi.Schema(type=openapi.TYPE_INTEGER),
+                            "status": openapi.Schema(type=openapi.TYPE_STRING, example="running"),
+                            "artifacts": openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                description="diagram/erd/api 별 상태",
+                            ),
+                            "error": openapi.Schema(type=openapi.TYPE_STRING),
+                            "result": openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                description="완료 시 diagram/erd/api 코드",
+                            ),
+                        },
+                    ),
+                },
+            ),
+        ),
+        404: "Job Not Found",
+    },
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def design_job_status(request, job_id):
+    job = jobs.get(job_id)
+    if job is None or job["user_id"] != request.user.id:
+        return Response({
+            "status": "error",
+            "message": "설계 생성 작업을 찾을 수 없습니다."
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    data = dict(job)
+    del data["user_id"]
+    if job["status"] == jobs.SUCCESS:
+        document = Document.objects.filter(id=job["document_id"]).first()
+        if document:
+            document.load_artifacts("diagram_code", "erd_code", "api_code")
+            data["result"] = {
+                "diagram": document.diagram_code,
+                "erd": document.erd_code,
+                "api": document.api_code,
+            }
 
     return Response({
         "status": "success",
-        "data": final_result,
-    }, status = status.HTTP_200_OK)
+        "data": data,
+    }, status=status.HTTP_200_OK)
+
+#----------------------------------------------------------
+# 설계 생성 작업 진행 상황 SSE api
+@swagger_auto_schema(
+    method = 'get',
+    operation_summary = "설계 생성 작업 진행 상황 SSE API",
+    operation_description = "산출물(diagram/erd/api)이 시작/완료될 때마다 progress 이벤트를, 작업이 끝나면 done 또는 error 이벤트를 보냅니다. "
+                            "Last-Event-ID 헤더로 이어 받을 수 있습니다.",
+    responses = {
+        200: openapi.Response(description="text/event-stream"),
+        404: "Job Not Found",
+    },
+)
+@api_view(["GET"])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+@permission_classes([IsAuthenticated])
+def design_job_events(request, job_id):
+    return _design_job_sse(request, job_id, tokens=False)
+
+#----------------------------------------------------------
+# 설계 산출물 실시간 스트리밍 SSE api
+@swagger_auto_schema(
+    method = 'get',
+    operation_summary = "설계 산출물 실시간 스트리밍 SSE API",
+    operation_description = "diagram/erd/api 세 산출물이 생성되는 대로 토큰 조각을 산출물 이름의 이벤트(data: {\"delta\": ...})로 "
+                            "섞어서 보내고, 진행 상황(progress)과 종료(done/error) 이벤트도 함께 보냅니다. "
+                            "Last-Event-ID 헤더로 이어 받을 수 있습니다.",
+    responses = {
+        200: openapi.Response(description="text/event-stream"),
+        404: "Job Not Found",
+    },
+)
+@api_view(["GET"])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+@permission_classes([IsAuthenticated])
+def design_job_stream(request, job_id):
+    return _design_job_sse(request, job_id, tokens=True)
+
+
+def _design_job_sse(request, job_id, tokens):
+    job = jobs.get(job_id)
+    if job is None or job["user_id"] != request.user.id:
+        return JsonResponse({"status": "error", "message": "설계 생성 작업을 찾을 수 없습니다."}, status=404)
+
+    last_id = request.headers.get("Last-Event-ID") or "0"
+
+    def sse():
+        for event_id, fields in jobs.iter_events(job_id, last_id, tokens=tokens):
+            yield jobs.to_sse(event_id, fields)
+
+    response = StreamingHttpResponse(sse(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["Access-Control-Allow-Origin"] = "https://devsketch.xyz"
+    return response
 
 #----------------------------------------------------------
 # 설계 파트 저장 api
@@ -357,48 +565,284 @@ def dev_document(request, document_id):
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def save_document_part(request, document_id):
-    try:
-        document = Document.objects.get(id=document_id, user_id=request.user)
-        parts = request.data.get("parts", [])  # ["diagram", "erd", "api"]
-
-        # parts가 배열인지 확인
-        if not isinstance(parts, list):
-            return JsonResponse({
-                "status": "error",
-                "message": "parts는 리스트여야 합니다."
-            }, status=400)
-
-        valid_parts = {"diagram", "erd", "api"}
-        invalid_parts = [part for part in parts if part not in valid_parts]
-
-        # 유효하지 않은 값이 있으면 에러 반환
-        if invalid_parts:
-            return JsonResponse({
-                "status": "error",
-                "message": f"Invalid parts specified: {', '.join(invalid_parts)}"
-            }, status=400)
+    parts = request.data.get("parts", [])  # ["diagram", "erd", "api"]
 
-        # 각각의 파트를 저장
-        if "diagram" in parts:
-            document.is_diagram_saved = True
-        if "erd" in parts:
-            document.is_erd_saved = True
-        if "api" in parts:
-            document.is_api_saved = True
+    # parts가 배열인지 확인
+    if not isinstance(parts, list):
+        return JsonResponse({
+            "status": "error",
+            "message": "parts는 리스트여야 합니다."
+        }, status=400)
 
-        document.save()
+    invalid_parts = [part for part in parts if part not in writes.FLAG_FIELDS]
 
+    # 유효하지 않은 값이 있으면 에러 반환
+    if invalid_parts:
         return JsonResponse({
-            "status": "success",
-            "message": f"{', '.join(parts)} 저장 완료"
-        }, status=200)
+            "status": "error",
+            "message": f"Invalid parts specified: {', '.join(invalid_parts)}"
+        }, status=400)
 
-    except Document.DoesNotExist:
+    # 각각의 파트 플래그만 UPDATE (수정된 행이 없으면 없는 문서)
+    if not writes.save_flags(document_id, request.user, parts):
         return JsonResponse({
             "status": "error",
             "message": "설계 문서를 찾을 수 없습니다."
         }, status=404)
 
+    return JsonResponse({
+        "status": "success",
+        "message": f"{', '.join(parts)} 저장 완료"
+    }, status=200)
+
+#----------------------------------------------------------
+# 문서 산출물 원문 조회 api
+ARTIFACT_NAMES = {
+    "result": "result",
+    "diagram": "diagram_code",
+    "erd": "erd_code",
+    "api": "api_code",
+}
+
+
+def _accepts_deflate(request):
+    # Accept-Encoding 에 deflate(또는 *)가 있고 q=0 이 아니면 True
+    for item in request.headers.get("Accept-Encoding", "").split(","):
+        coding, _, params = item.partition(";")
+        if coding.strip().lower() not in ("deflate", "*"):
+            continue
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _requested_range(request, etag):
+    """
+    Range 헤더의 단일 바이트 범위 (start, end) (end 는 None: 끝까지, start 가 None 이면 끝에서 end 바이트)
+    Range 가 없거나 여러 범위이거나 If-Range 가 현재 ETag 와 다르면 None (전체 응답)
+    """
+    match = _RANGE.match(request.headers.get("Range", "").replace(" ", ""))
+    if not match or match.groups() == ("", ""):
+        return None
+    if_range = request.headers.get("If-Range")
+    if if_range and if_range != etag:
+        return None
+    start, end = match.groups()
+    return (int(start) if start else None), (int(end) if end else None)
+
+
+def _resolve_range(requested, size):
+    # 요청 범위를 [start, end] 로 바꿈 (만족할 수 없으면 None)
+    start, end = requested
+    if start is None:
+        if not end:
+            return None
+        return max(0, size - end), size - 1
+    if start >= size or (end is not None and end < start):
+        return None
+    return start, min(size - 1, end if end is not None else size - 1)
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_summary="문서 산출물 원문 조회 API",
+    operation_description="result / diagram / erd / api 산출물을 text/plain 으로 반환합니다. "
+                          "Accept-Encoding 에 deflate 가 있으면 저장된 압축 바이트를 그대로 보냅니다. (Content-Encoding: deflate) "
+                          "그 외에는 DOCUMENT_ARTIFACT_CHUNK_SIZE 바이트씩 풀면서 스트리밍하며, "
+                          "Range: bytes=시작-끝 으로 UTF-8 바이트 범위만 받을 수 있습니다. (206, If-Range 지원)",
+    responses={
+        200: openapi.Response(description="text/plain"),
+        206: openapi.Response(description="text/plain (Range 로 요청한 바이트 범위)"),
+        304: "Not Modified (If-None-Match 가 ETag 와 같음)",
+        404: "Document Not Found",
+        416: "Range Not Satisfiable",
+    },
+)
+@api_view(["GET"])
+@renderer_classes([JSONRenderer, PlainTextRenderer])
+@permission_classes([IsAuthenticated])
+def document_artifact(request, document_id, name):
+    field = ARTIFACT_NAMES.get(name)
+    # Range 요청은 압축하지 않은 원문의 바이트 범위로 응답
+    deflate = "Range" not in request.headers and _accepts_deflate(request)
+    artifacts = DocumentArtifact.objects.filter(
+        document_id=document_id, document__user_id=request.user, document__deleted_at__isnull=True, name=field,
+    )
+    artifact = None
+    if field:
+        # If-None-Match 가 있으면 내용 해시만 먼저 확인해서 바뀌지 않았으면 산출물을 읽지 않고 304 반환
+        if "If-None-Match" in request.headers:
+            sha256 = artifacts.values_list("sha256", flat=True).first()
+            if sha256:
+                not_modified = conditional.not_modified(request, _artifact_etag(sha256, deflate), vary=["Accept-Encoding"])
+                if not_modified:
+                    return not_modified
+        artifact = artifacts.values("data", "size", "sha256").first()
+    if artifact is None and (not field or not Document.objects.filter(id=document_id, user_id=request.user).exists()):
+        return JsonResponse({"status": "error", "message": "문서를 찾을 수 없습니다."}, status=404)
+
+    if artifact is None:
+        # 아직 생성되지 않은 산출물
+        response = HttpResponse("", content_type="text/plain; charset=utf-8")
+        response["Vary"] = "Accept-Encoding"
+        return response
+
+    etag = _artifact_etag(artifact["sha256"], deflate)
+    size = artifact["size"]
+    requested = None if deflate else _requested_range(request, etag)
+    if requested:
+        byte_range = _resolve_range(requested, size)
+        if byte_range is None:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+        start, end = byte_range
+        # 범위 끝까지만 압축을 풂
+        response = HttpResponse(decompress_prefix(artifact["data"], end + 1)[start:],
+                                status=206, content_type="text/plain; charset=utf-8")
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    elif deflate:
+        response = HttpResponse(bytes(artifact["data"]), content_type="text/plain; charset=utf-8")
+        response["Content-Encoding"] = "deflate"
+    else:
+        # 전체 원문을 메모리에 만들지 않고 조금씩 풀면서 전송
+        response = StreamingHttpResponse(
+            iter_decompress(artifact["data"], settings.DOCUMENT_ARTIFACT_CHUNK_SIZE),
+            content_type="text/plain; charset=utf-8",
+        )
+        response["Content-Length"] = size
+    response["Accept-Ranges"] = "bytes"
+    return conditional.set_headers(response, etag, vary=["Accept-Encoding"])
+
+
+def _artifact_etag(sha256, deflate):
+    # 강한 ETag 는 표현마다 달라야 하므로 deflate 응답은 다른 ETag 사용
+    return conditional.make_etag("artifact", sha256, "deflate" if deflate else "identity")
+
+
+#----------------------------------------------------------
+# 문서 산출물 버전 기록 api
+def _owned_artifact(request, document_id, name):
+    # 요청한 사용자의 문서이면 산출물 필드 이름, 아니면 None
+    field = ARTIFACT_NAMES.get(name)
+    if field and Document.objects.filter(id=document_id, user_id=request.user).exists():
+        return field
+    return None
+
+
+def _not_found():
+    return Response({
+        "status": "error",
+        "message": "문서를 찾을 수 없습니다."
+    }, status=status.HTTP_404_NOT_FOUND)
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_summary="문서 산출물 버전 목록 API",
+    operation_description="result / diagram / erd / api 산출물의 버전 목록을 최신순으로 반환합니다.",
+    responses={
+        200: openapi.Response(description="버전 목록 (version, snapshot, size, created_at)"),
+        404: "Document Not Found",
+    },
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def document_versions(request, document_id, name):
+    field = _owned_artifact(request, document_id, name)
+    if field is None:
+        return _not_found()
+
+    versions = (DocumentVersion.objects.filter(document_id=document_id, name=field)
+                .order_by("-version").values("version", "is_snapshot", "size", "created_at"))
+    return Response({
+        "status": "success",
+        "data": [
+            {
+                "version": version["version"],
+                "snapshot": version["is_snapshot"],
+                "size": version["size"],
+                "created_at": version["created_at"],
+            }
+            for version in versions
+        ],
+    }, status=status.HTTP_200_OK)
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_summary="문서 산출물 버전 조회 API",
+    responses={
+        200: openapi.Response(description="버전 내용"),
+        404: "Version Not Found",
+    },
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def document_version(request, document_id, name, version):
+    field = _owned_artifact(request, document_id, name)
+    text = DocumentVersion.text(document_id, field, version) if field else None
+    if text is None:
+        return _not_found()
+
+    return Response({
+        "status": "success",
+        "data": {"version": version, "text": text},
+    }, status=status.HTTP_200_OK)
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_summary="문서 산출물 버전 비교 API",
+    operation_description="두 버전(from, to)의 차이를 unified diff 형식으로 반환합니다.",
+    manual_parameters=[
+        openapi.Parameter('from', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True, description="비교 기준 버전"),
+        openapi.Parameter('to', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True, description="비교 대상 버전"),
+    ],
+    responses={
+        200: openapi.Response(description="unified diff"),
+        400: "Bad Request",
+        404: "Version Not Found",
+    },
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def document_version_diff(request, document_id, name):
+    try:
+        from_version = int(request.GET["from"])
+        to_version = int(request.GET["to"])
+    except (KeyError, ValueError):
+        return Response({
+            "status": "error",
+            "message": "from, to 버전을 정수로 지정해주세요."
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    field = _owned_artifact(request, document_id, name)
+    if field is None:
+        return _not_found()
+    old = DocumentVersion.text(document_id, field, from_version)
+    new = DocumentVersion.text(document_id, field, to_version)
+    if old is None or new is None:
+        return _not_found()
+
+    return Response({
+        "status": "success",
+        "data": {
+            "from": from_version,
+            "to": to_version,
+            "diff": unified_diff(old, new, from_version, to_version),
+        },
+    }, status=status.HTTP_200_OK)
+
+
 #----------------------------------------------------------
 # 세팅 저장 api
 @api_view(['POST'])
@@ -409,10 +853,14 @@ def setup_project(request, document_id):
     try:
         # 설계 문서 조회
         document = Document.objects.get(id=document_id)
+        document.load_artifacts("erd_code", "api_code", "diagram_code")
 
         # 프로젝트 디렉터리 경로 설정
         project_dir = os.path.join(settings.BASE_DIR, "projects", document.title)
 
+        # 작업 결과를 기다리는 동안 DB 연결은 풀에 돌려줌
+        release_connections()
+
         # 초기 프로젝트 구조 생성
         generate_project_structure.delay(
             erd_code=document.erd_code,
@@ -455,111 +903,25 @@ def setup_project(request, document_id):
         200: openapi.Response(description="문서 수정 성공"),
         400: "Bad Request",
         404: "Document Not Found",
+        409: "Document Is Being Generated",
         500: "Internal Server Error",
     },
 )
 @api_view(["GET"])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
 @permission_classes([IsAuthenticated])
 def stream_document(request, document_id):
     user = request.user
 
     try:
         # 문서 정보 가져오기
-        document = Document.objects.get(id=document_id, user_id=user.id)
-        prompt = f"""
-
-                        Title: {document.title}
-                        Content: {document.content}
-                        Requirements: {document.requirements}
-
-                        위 내용을 바탕으로 체계적인 기능명세서를 작성해주세요. 다음 지시사항을 정확히 따라주세요:
-
-                        1. **문서 구조**
-                            - 문서는 다음과 같은 섹션으로 구성되어야 합니다:
-                            1. **시스템 목적**: 프로젝트의 목적과 주요 기능을 간략히 설명하세요.
-                            2. **기능 요구사항**: 사용자 요구사항을 기반으로 상세한 기능 목록을 작성하세요. 각 기능은 사용자 스토리 형식(예: "사용자는 [X]를 할 수 있어야 한다")으로 작성하세요.
-
-                        2. **상세 설명**
-                            - 각 섹션은 명확하고 간결하게 작성되어야 합니다.
-
-                        3. **모듈화**
-                            - 문서를 모듈화하여 각 섹션이 독립적으로 이해될 수 있도록 하세요.
-                            - 각 모듈은 간단한 설명과 함께 명확하게 구분되어야 합니다.
-
-                        4. **출력 형식**
-                            - 최종 문서는 바로 제출할 수 있는 형태로 작성되어야 합니다.
-                            - 출력은 마크다운 형식이 아닌 빠르게 출력되도록 문서로만 해주세요.(#,** 등 제외)
-                            - 불필요한 설명이나 서론은 생략하고, 실제 문서 내용만 출력하세요.
-
-                        5. **추가 요구사항**
-                            - 현업에서 바로 사용할 수 있도록 전문적이고 실용적인 언어를 사용하세요.
-                            - 가능한 한 구체적이고 명확하게 작성하세요.
-                            - 마지막 요약은 빼주세요.
-
-                            **출력 예시**
-                            시스템 목적:
-                            - 비즈니스 목적: 사용자가 상품을 쉽게 조회하고 주문할 수 있도록 하는 것입니다.
-                            - 기술적 목적: 안정적이고 확장 가능한 온라인 쇼핑몰 시스템을 구축하는 것입니다.
-
-                            기능 요구사항:
-                            1. 사용자는 상품을 조회할 수 있어야 한다. (우선순위: 높음)
-                            2. 사용자는 상품을 주문할 수 있어야 한다. (우선순위: 높음)
-                            3. 사용자는 주문 내역을 조회할 수 있어야 한다. (우선순위: 중간)
-
-                            시나리오:
-                            1. 사용자가 로그인 페이지에 접속합니다.
-                            2. 이메일과 비밀번호를 입력합니다.
-                            3. 로그인 버튼을 클릭합니다.
-                            4. 시스템은 사용자 정보를 검증하고 로그인을 승인합니다.
-
-                            비기능 요구사항:
-                            - 시스템은 초당 100개의 요청을 처리할 수 있어야 합니다.
-                            - 사용자 데이터는 암호화되어 저장되어야 합니다.
-
-                            모듈화:
-                            - 로그인 모듈: 입력 - 이메일, 비밀번호 / 출력 - 사용자 정보, 토큰
-                            - 상품 조회 모듈: 입력 - 검색어 / 출력 - 상품 목록
-                            - 주문 모듈: 입력 - 상품 ID, 수량 / 출력 - 주문 번호, 결제 정보
-
-                            위의 출력 예시는 쇼핑몰 예시입니다. 사용자가 입력한 정보를 바탕으로 예시를 참고하여 출력해주세요.
-                        """
+        document = document_cache.get_document(document_id, user.id)
+        prompt = build_stream_prompt(document)
 
-        # 스트리밍을 위한 제너레이터 함수
-        def sse():
-            sum_result = ""
-
-            for chunk in call_openai_api_stream(prompt):
-                chunk = chunk.strip()
-                logger.debug(f"Received chunk: {chunk}")
-
-                # 청크를 라인 단위로 분리
-                lines = chunk.split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    if line.startswith("data: "):
-                        data = line[len("data: "):]
-                        logger.debug(f"Processed data: {data}")
-
-                        if data == "[DONE]":
-                            document.result = sum_result
-                            document.save()
-                            yield "event: done\ndata: [DONE]\n\n"
-                            return
-                        try:
-                            data_json = json.loads(data)
-                            content = data_json.get("choices", [{}])[0].get("delta", {}).get("content", "")
-                            if content:
-                                sum_result += content
-                                content = content.replace(" ", "&nbsp;").replace("\n", "<br>")
-                                yield f"data: {content}\n\n"
-                        except json.JSONDecodeError as e:
-                            logger.error(f"JSONDecodeError: {e} for data: {data}")
-                            yield "data: JSONDecodeError\n\n"
-
-        response = StreamingHttpResponse(sse(), content_type="text/event-stream")
+        # 생성은 연결과 분리되어 진행되고, 같은 문서를 여는 다른 연결은 진행 중인 생성을 처음부터 받음
+        # Last-Event-ID 로 다시 연결하면 이어 받음
+        sse = streams.stream(document, prompt, request.headers.get("Last-Event-ID"))
+        response = StreamingHttpResponse(sse, content_type="text/event-stream")
         response["Cache-Control"] = "no-cache"
         response["Connection"] = "keep-alive"
         response["Access-Control-Allow-Origin"] = "https://devsketch.xyz"
@@ -567,121 +929,11 @@ def stream_document(request, document_id):
 
     except Document.DoesNotExist:
         return JsonResponse({"status": "error", "message": "문서를 찾을 수 없습니다."}, status=404)
+    except streams.Busy:
+        return JsonResponse({"status": "error", "message": "다른 요청으로 문서를 생성하고 있습니다."}, status=409)
     except Exception as e:
         return JsonResponse({"status": "error", "message": str(e)}, status=500)
 
-# def stream_document(request, document_id):
-
-#     user = request.user
-
-#     try:
-#         document = Document.objects.get(id = document_id, user_id = user.id)
-#         prompt = f"""
-        
-#                         Title: {document.title}
-#                         Content: {document.content}
-#                         Requirements: {document.requirements}
-
-#                         위 내용을 바탕으로 체계적인 기능명세서를 작성해주세요. 다음 지시사항을 정확히 따라주세요:
-
-#                         1. **문서 구조**
-#                             - 문서는 다음과 같은 섹션으로 구성되어야 합니다:
-#                             1. **시스템 목적**: 프로젝트의 목적과 주요 기능을 간략히 설명하세요.
-#                             2. **기능 요구사항**: 사용자 요구사항을 기반으로 상세한 기능 목록을 작성하세요. 각 기능은 사용자 스토리 형식(예: "사용자는 [X]를 할 수 있어야 한다")으로 작성하세요.
-
-#                         2. **상세 설명**
-#                             - 각 섹션은 명확하고 간결하게 작성되어야 합니다.
-
-#                         3. **모듈화**
-#                             - 문서를 모듈화하여 각 섹션이 독립적으로 이해될 수 있도록 하세요.
-#                             - 각 모듈은 간단한 설명과 함께 명확하게 구분되어야 합니다.
-
-#                         4. **출력 형식**
-#                             - 최종 문서는 바로 제출할 수 있는 형태로 작성되어야 합니다.
-#                             - 출력은 마크다운 형식이 아닌 빠르게 출력되도록 문서로만 해주세요.(#,** 등 제외)
-#                             - 불필요한 설명이나 서론은 생략하고, 실제 문서 내용만 출력하세요.
-
-#                         5. **추가 요구사항**
-#                             - 현업에서 바로 사용할 수 있도록 전문적이고 실용적인 언어를 사용하세요.
-#                             - 가능한 한 구체적이고 명확하게 작성하세요.
-#                             - 마지막 요약은 빼주세요.
-
-#                             **출력 예시**
-#                             시스템 목적:
-#                             - 비즈니스 목적: 사용자가 상품을 쉽게 조회하고 주문할 수 있도록 하는 것입니다.
-#                             - 기술적 목적: 안정적이고 확장 가능한 온라인 쇼핑몰 시스템을 구축하는 것입니다.
-
-#                             기능 요구사항:
-#                             1. 사용자는 상품을 조회할 수 있어야 한다. (우선순위: 높음)
-#                             2. 사용자는 상품을 주문할 수 있어야 한다. (우선순위: 높음)
-#                             3. 사용자는 주문 내역을 조회할 수 있어야 한다. (우선순위: 중간)
-
-#                             시나리오:
-#                             1. 사용자가 로그인 페이지에 접속합니다.
-#                             2. 이메일과 비밀번호를 입력합니다.
-#                             3. 로그인 버튼을 클릭합니다.
-#                             4. 시스템은 사용자 정보를 검증하고 로그인을 승인합니다.
-
-#                             비기능 요구사항:
-#                             - 시스템은 초당 100개의 요청을 처리할 수 있어야 합니다.
-#                             - 사용자 데이터는 암호화되어 저장되어야 합니다.
-
-#                             모듈화:
-#                             - 로그인 모듈: 입력 - 이메일, 비밀번호 / 출력 - 사용자 정보, 토큰
-#                             - 상품 조회 모듈: 입력 - 검색어 / 출력 - 상품 목록
-#                             - 주문 모듈: 입력 - 상품 ID, 수량 / 출력 - 주문 번호, 결제 정보
-
-#                             위의 출력 예시는 쇼핑몰 예시입니다. 사용자가 입력한 정보를 바탕으로 예시를 참고하여 출력해주세요.
-#                         """
-
-#         def sse():
-#             sum_result = ""
-
-#             for chunk in call_deepseek_api_stream(prompt):
-#                 lines = chunk.strip().split("\n")
-#                 for line in lines:
-#                     if line.startswith("data: "):
-#                         data_str = line[6:].strip()
-
-#                         if data_str == "[DONE]":
-#                             # 최종 누적 결과를 DB에 저장
-#                             document.result = sum_result
-#                             document.save()
-#                             # 클라이언트 측에 DONE 알림
-#                             yield "data: [DONE]\n\n"
-#                             return
-
-#                         try:
-#                             data_json = json.loads(data_str)
-#                             content = data_json.get("choices", [{}])[0] \
-#                                 .get("delta", {}) \
-#                                 .get("content", "")
-
-#                             if content:
-#                                 sum_result += content
-#                                 # JSON이 아닌 순수 텍스트 형태로 전송
-#                                 yield f"data: {content}\n\n"
-
-#                         except json.JSONDecodeError:
-#                             yield "data: JSONDecodeError\n\n"
-#             else:
-#                 pass
-
-#         response = StreamingHttpResponse(sse(), content_type="text/event-stream; charset=utf-8")
-#         return response
-
-
-#     except Document.DoesNotExist:
-#         return JsonResponse({
-#             "status": "error",
-#             "message": "Document not found or you don't have permission to access it."
-#         }, status=status.HTTP_404_NOT_FOUND)
-
-#     except Exception as e:
-#         return JsonResponse({
-#             "status": "error",
-#             "message": str(e)
-#         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 #----------------------------------------------------------
 
@@ -704,66 +956,25 @@ def stream_document(request, document_id):
         200: openapi.Response(description="문서 수정 성공"),
         400: "Bad Request",
         404: "Document Not Found",
+        409: "Document Is Being Generated",
         500: "Internal Server Error",
     },
 )
 @api_view(["PUT"])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
 @permission_classes([IsAuthenticated])
 def update_stream_document(request, document_id):
     user = request.user
     modifications = request.data.get('modifications', '')
 
     try:
-        document = Document.objects.get(id=document_id, user_id=user.id)
+        document = document_cache.get_document(document_id, user.id)
 
         # OpenAI API에 전달할 프롬프트 생성
-        prompt = f"""
-
-                        기존문서: {document.result}
-                        추가문서: {modifications}
-                        기존 내용을 바탕으로 추가문서를 적용시켜 체계적인 기능명세서를 작성해주세요. 다음 지시사항을 정확히 따라주세요:
-                        
-                        **추가 요구사항**
-                        - 마지막 요약은 빼주세요.
-                        - 절대적으로 기존문서의 양식을 지켜야합니다. 최대한 기존문서를 수정하지말고, 추가문서에 대한 정보에만 추가하거나 수정해주세요.
-                        - 문장을 추가할 땐, 기존의 문서를 토대로 작성해주세요.
-                        """
+        prompt = build_update_prompt(document, modifications)
 
-        def sse():
-            sum_result = ""
-
-            for chunk in call_openai_api_stream(prompt):
-                chunk = chunk.strip()
-                logger.debug(f"Received chunk: {chunk}")
-
-                # 청크를 라인 단위로 분리
-                lines = chunk.split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    if line.startswith("data: "):
-                        data = line[len("data: "):]
-                        logger.debug(f"Processed data: {data}")
-
-                        if data == "[DONE]":
-                            document.result = sum_result
-                            document.save()
-                            yield "event: done\ndata: [DONE]\n\n"
-                            return
-                        try:
-                            data_json = json.loads(data)
-                            content = data_json.get("choices", [{}])[0].get("delta", {}).get("content", "")
-                            if content:
-                                sum_result += content
-                                content = content.replace(" ", "&nbsp;").replace("\n", "<br>")
-                                yield f"data: {content}\n\n"
-                        except json.JSONDecodeError as e:
-                            logger.error(f"JSONDecodeError: {e} for data: {data}")
-                            yield "data: JSONDecodeError\n\n"
-
-        response = StreamingHttpResponse(sse(), content_type="text/event-stream")
+        sse = streams.stream(document, prompt, request.headers.get("Last-Event-ID"))
+        response = StreamingHttpResponse(sse, content_type="text/event-stream")
         response["Cache-Control"] = "no-cache"
         response["Connection"] = "keep-alive"
         response["Access-Control-Allow-Origin"] = "https://devsketch.xyz"
@@ -771,211 +982,25 @@ def update_stream_document(request, document_id):
 
     except Document.DoesNotExist:
         return JsonResponse({"status": "error", "message": "문서를 찾을 수 없습니다."}, status=404)
+    except streams.Busy:
+        return JsonResponse({"status": "error", "message": "다른 요청으로 문서를 생성하고 있습니다."}, status=409)
     except Exception as e:
         return JsonResponse({"status": "error", "message": str(e)}, status=500)
 
 
-# def update_stream_document(request, document_id):
-
-#     user = request.user
-#     modifications = request.data.get('modifications', '')
-
-#     try:
-#         document = Document.objects.get(id=document_id, user_id=user.id)
-#         prompt = f"""
-
-#                         기존문서: {document.result}
-#                         추가문서: {modifications}
-#                         기존 내용을 바탕으로 추가문서를 적용시켜 체계적인 기능명세서를 작성해주세요. 다음 지시사항을 정확히 따라주세요:
-
-#                         **추가 요구사항**
-#                         - 마지막 요약은 빼주세요.
-#                         - 절대적으로 기존문서의 양식을 지켜야합니다. 최대한 기존문서를 수정하지말고, 추가문서에 대한 정보에만 추가하거나 수정해주세요.
-#                         - 문장을 추가할 땐, 기존의 문서를 토대로 작성해주세요.
-#                         """
-
-#         def sse():
-#             sum_result = ""
-
-#             for chunk in call_deepseek_api_stream(prompt):
-#                 lines = chunk.strip().split("\n")
-#                 for line in lines:
-#                     if line.startswith("data: "):
-#                         data_str = line[6:].strip()
-
-#                         if data_str == "[DONE]":
-#                             # 최종 누적 결과를 DB에 저장
-#                             document.result = sum_result
-#                             document.save()
-#                             # 클라이언트 측에 DONE 알림
-#                             yield "data: [DONE]\n\n"
-#                             return
-
-#                         try:
-#                             data_json = json.loads(data_str)
-#                             content = data_json.get("choices", [{}])[0] \
-#                                 .get("delta", {}) \
-#                                 .get("content", "")
-
-#                             if content:
-#                                 sum_result += content
-#                                 # JSON이 아닌 순수 텍스트 형태로 전송
-#                                 yield f"data: {content}\n\n"
-
-#                         except json.JSONDecodeError:
-#                             yield "data: JSONDecodeError\n\n"
-#             else:
-#                 pass
-
-#         response = StreamingHttpResponse(sse(), content_type="text/event-stream; charset=utf-8")
-#         return response
-
-
-#     except Document.DoesNotExist:
-#         return JsonResponse({
-#             "status": "error",
-#             "message": "Document not found or you don't have permission to access it."
-#         }, status=status.HTTP_404_NOT_FOUND)
-
-#     except Exception as e:
-#         return JsonResponse({
-#             "status": "error",
-#             "message": str(e)
-#         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 # #----------------------------------------------------------
 # # SSL 인증서 파일 경로 설정
 # os.environ["SSL_CERT_FILE"] = certifi.where()
 #----------------------------------------------------------
 
 
-
 #----------------------------------------------------------
 
 #----------------------------------------------------------
 # open ai api
 def call_openai_api(prompt):
-    try:
-        # ChatGPT 모델 호출
-        response = openai.Completion.create(
-            model="gpt-4o",
-            prompt=prompt,
-            max_tokens=1000,  # 응답의 최대 토큰 수
-        )
-
-        # OpenAI의 응답 내용 반환
-        return response["choices"][0]["text"]
-
-    except openai.error.OpenAIError as e:
-        raise Exception(f"OpenAI API 호출 실패: {str(e)}")
+    return chat_completion(prompt)
 
-# def call_deepseek_api(prompt):
-#     api_url = "https://api.deepseek.com/v1/chat/completions"
-#     api_key = settings.DEEPSEEK_API_KEY
-
-#     payload = {
-#         "model": "deepseek-chat",
-#         "messages": [
-#             {"role": "user", "content": prompt}
-#         ],
-#         "stream": False
-#     }
-
-#     headers = {
-#         "Content-Type": "application/json",
-#         "Authorization": f"Bearer {api_key}"
-#     }
-
-#     response = requests.post(api_url, json=payload, headers=headers)
-
-#     if response.status_code == 200:
-#         review_result = response.json()
-#         return review_result['choices'][0]['message']['content']
-#     else:
-#         error_msg = response.json().get("error", "Unknown error occurred.")
-#         raise Exception(f"DeepSeek API failed: {error_msg}")
-
-
-#----------------------------------------------------------
-# open api streaming api
-def call_openai_api_stream(prompt):
-    api_url = "https://api.openai.com/v1/chat/completions"
-    api_key = settings.OPENAI_API_KEY
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {api_key}"
-    }
-
-    payload = {
-        "model": "gpt-4o",  # 정확한 모델 이름으로 변경
-        "messages": [
-            {"role": "system", "content": "당신은 전문적인 기술 문서를 작성하는 전문가입니다."},
-            {"role": "user", "content": prompt}
-        ],
-        "stream": True
-    }
-
-    try:
-        with requests.post(api_url, json=payload, headers=headers, stream=True) as response:
-            if response.status_code != 200:
-                try:
-                    error_msg = response.json().get("error", "Unknown error occurred.")
-                except ValueError:
-                    error_msg = "Unknown error occurred."
-                logger.error(f"OpenAI API failed with status {response.status_code}: {error_msg}")
-                raise Exception(f"OpenAI API failed: {error_msg}")
-
-            for chunk in response.iter_content(chunk_size=None):
-                if chunk:
-                    decoded_chunk = chunk.decode("utf-8")
-                    logger.debug(f"Received chunk: {decoded_chunk}")
-                    yield decoded_chunk
-    except requests.RequestException as e:
-        error_message = f"RequestException: {str(e)}"
-        logger.error(error_message)
-        raise Exception(error_message)
-    except Exception as e:
-        error_message = f"Unexpected error: {str(e)}"
-        logger.error(error_message)
-        raise Exception(error_message)
-
-# def call_deepseek_api_stream(prompt):
-#     api_url = "https://api.deepseek.com/v1/chat/completions"
-#     api_key = settings.DEEPSEEK_API_KEY
-
-#     payload = {
-#         "model": "deepseek-chat",
-#         "messages": [
-#             {"role": "system", "content": "당신은 전문적인 기술 문서를 작성하는 전문가입니다. 주어진 입력을 바탕으로 명확하고 실용적인 기능 명세서를 작성하세요."},
-#             {"role": "user", "content": prompt}
-#         ],
-#         "stream": True
-#     }
-
-#     headers = {
-#         "Content-Type": "application/json",
-#         "Authorization": f"Bearer {api_key}"
-#     }
-
-#     try:
-#         with requests.post(api_url, json=payload, headers=headers, stream=True) as response:
-#             if response.status_code != 200:
-#                 try:
-#                     error_msg = response.json().get("error", "Unknown error occurred.")
-#                 except ValueError:
-#                     error_msg = "Unknown error occurred."
-#                 logger.error(f"DeepSeek API failed with status {response.status_code}: {error_msg}")
-#                 raise Exception(f"DeepSeek API failed: {error_msg}")
-
-#             for chunk in response.iter_content(chunk_size=None):
-#                 if chunk:
-#                     decoded_chunk = chunk.decode("utf-8")
-#                     logger.debug(f"Received chunk: {decoded_chunk}")
-#                     yield decoded_chunk
-#     except requests.RequestException as e:
-#         error_message = f"RequestException: {str(e)}"
-#         logger.error(error_message)
-#         raise Exception(error_message)
 
 #----------------------------------------------------------
 
@@ -0,0 +1,64 @@
+"""
+컬럼 단위 저장입니다.
+
+인자 없는 save() 는 모든 컬럼을 다시 쓰므로(UPDATE ... SET 전체 컬럼) 쓰기량과 행 잠금 시간이 늘어납니다.
+자주 실행되는 저장은 바뀐 컬럼과 auto_now 컬럼(updated_at)만 UPDATE 합니다.
+Document 의 산출물(result, diagram_code, erd_code, api_code)은 document_artifact 에 저장되므로
+산출물을 저장할 때 document 행에서는 updated_at 만 바뀝니다.
+"""
+from django.utils import timezone
+
+from document import cache
+from document.models import Document
+
+# save_document_part 의 parts 이름 -> 플래그 컬럼
+FLAG_FIELDS = {
+    "diagram": "is_diagram_saved",
+    "erd": "is_erd_saved",
+    "api": "is_api_saved",
+}
+
+
+def _update_fields(instance, values):
+    for name, value in values.items():
+        setattr(instance, name, value)
+    auto_now = [
+        field.name for field in instance._meta.concrete_fields
+        if getattr(field, "auto_now", False) and field.name not in values
+    ]
+    return list(values) + auto_now
+
+
+def update_columns(instance, **values):
+    """
+    instance 의 values 컬럼(과 auto_now 컬럼)만 저장합니다.
+    """
+    instance.save(update_fields=_update_fields(instance, values))
+
+
+async def aupdate_columns(instance, **values):
+    await instance.asave(update_fields=_update_fields(instance, values))
+
+
+def save_result(document, result):
+    update_columns(document, result=result)
+
+
+async def asave_result(document, result):
+    await aupdate_columns(document, result=result)
+
+
+def save_codes(document, diagram, erd, api):
+    update_columns(document, diagram_code=diagram, erd_code=erd, api_code=api)
+
+
+def save_flags(document_id, user, parts):
+    """
+    문서의 is_*_saved 플래그만 UPDATE 합니다. 문서를 먼저 조회하지 않고 수정된 행 수를 반환합니다. (0 이면 없는 문서)
+    """
+    values = {FLAG_FIELDS[part]: True for part in parts}
+    updated = Document.objects.filter(id=document_id, user_id=user).update(updated_at=timezone.now(), **values)
+    if updated:
+        # 쿼리셋 update 는 post_save 를 보내지 않으므로 직접 무효화
+        cache.invalidate(document_id)
+    return updated
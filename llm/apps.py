@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class LlmConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'llm'
+
+    def ready(self):
+        from prometheus_client import REGISTRY
+        from llm.metrics import LLMCacheCollector, LLMRateLimitCollector
+
+        REGISTRY.register(LLMCacheCollector())
+        REGISTRY.register(LLMRateLimitCollector())
@@ -0,0 +1,145 @@
+"""
+LLM 응답 캐시입니다.
+
+(model, system prompt, user prompt, 파라미터)의 해시를 키로 Redis에 응답을 저장하여,
+같은 document.result 로 설계를 다시 요청하는 경우 LLM을 다시 호출하지 않습니다.
+전체 크기가 LLM_CACHE_MAX_BYTES 를 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다.
+"""
+import hashlib
+import json
+import logging
+import time
+
+import redis
+from django.conf import settings
+
+from config.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "llm:cache:"
+LRU_KEY = "llm:cache:lru"      # sorted set: digest -> 마지막 사용 시각
+SIZES_KEY = "llm:cache:sizes"  # hash: digest -> 바이트 수
+TOTAL_KEY = "llm:cache:total"  # 저장된 전체 바이트 수
+STATS_KEY = "llm:cache:stats"  # hash: "<task>:hit|miss|bypass", "evicted"
+
+# 조회 시 LRU 시각 갱신
+_GET_SCRIPT = redis_client.register_script("""
+local value = redis.call('GET', KEYS[1])
+if value then
+    redis.call('ZADD', KEYS[2], ARGV[1], ARGV[2])
+end
+return value
+""")
+
+# 저장 후 메모리 예산을 넘으면 LRU 순으로 제거 (만료된 항목도 같은 순서로 정리됨)
+_SET_SCRIPT = redis_client.register_script("""
+local prefix, digest, value = ARGV[1], ARGV[2], ARGV[3]
+local ttl, now, budget = tonumber(ARGV[4]), ARGV[5], tonumber(ARGV[6])
+local size = string.len(value)
+
+local previous = tonumber(redis.call('HGET', KEYS[2], digest) or '0')
+redis.call('SET', prefix .. digest, value, 'EX', ttl)
+redis.call('ZADD', KEYS[1], now, digest)
+redis.call('HSET', KEYS[2], digest, size)
+local total = redis.call('INCRBY', KEYS[3], size - previous)
+
+local evicted = 0
+while total > budget do
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0)[1]
+    if not oldest or oldest == digest then break end
+    local oldest_size = tonumber(redis.call('HGET', KEYS[2], oldest) or '0')
+    redis.call('DEL', prefix .. oldest)
+    redis.call('ZREM', KEYS[1], oldest)
+    redis.call('HDEL', KEYS[2], oldest)
+    total = redis.call('INCRBY', KEYS[3], -oldest_size)
+    evicted = evicted + 1
+end
+if evicted > 0 then
+    redis.call('HINCRBY', KEYS[4], 'evicted', evicted)
+end
+return evicted
+""")
+
+
+def make_key(payload):
+    """
+    요청 payload(model, messages, 파라미터)로 캐시 키(sha256)를 만듭니다.
+    """
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _record(task, outcome):
+    try:
+        redis_client.hincrby(STATS_KEY, f"{task}:{outcome}", 1)
+    except redis.RedisError:
+        pass
+
+
+def lookup(digest):
+    return _GET_SCRIPT(keys=[KEY_PREFIX + digest, LRU_KEY], args=[time.time(), digest])
+
+
+def store(digest, value, ttl):
+    return _SET_SCRIPT(
+        keys=[LRU_KEY, SIZES_KEY, TOTAL_KEY, STATS_KEY],
+        args=[KEY_PREFIX, digest, value, ttl, time.time(), settings.LLM_CACHE_MAX_BYTES],
+    )
+
+
+def use_cache_from_request(request):
+    """
+    요청별 캐시 우회 플래그를 확인합니다.
+    (?no_cache=true, 본문의 "no_cache": true, Cache-Control: no-cache 중 하나면 우회)
+    """
+    if request.headers.get("Cache-Control", "").lower() == "no-cache":
+        return False
+    flag = request.query_params.get("no_cache")
+    if flag is None and isinstance(request.data, dict):
+        flag = request.data.get("no_cache")
+    return str(flag).lower() not in ("1", "true")
+
+
+def get_or_call(task, payload, fetch, use_cache=True):
+    """
+    캐시에 있으면 저장된 응답을, 없으면 fetch() 결과를 저장한 뒤 반환합니다.
+    use_cache=False 이면 캐시를 읽지 않고 새로 생성한 결과로 갱신합니다.
+    Redis 장애 시에는 캐시 없이 동작합니다.
+    """
+    if not settings.LLM_CACHE_ENABLED:
+        return fetch()
+
+    digest = make_key(payload)
+    if use_cache:
+        try:
+            cached = lookup(digest)
+        except redis.RedisError as e:
+            logger.warning(f"LLM 캐시 조회 실패: {e}")
+            cached = None
+        if cached is not None:
+            _record(task, "hit")
+            return cached
+        _record(task, "miss")
+    else:
+        _record(task, "bypass")
+
+    value = fetch()
+
+    try:
+        store(digest, value, settings.LLM_CACHE_TTLS.get(task, settings.LLM_CACHE_DEFAULT_TTL))
+    except redis.RedisError as e:
+        logger.warning(f"LLM 캐시 저장 실패: {e}")
+    return value
+
+
+def stats():
+    """
+    태스크별 hit/miss/bypass 횟수와 현재 캐시 크기를 반환합니다.
+    """
+    raw = redis_client.hgetall(STATS_KEY)
+    result = {"evicted": int(raw.pop("evicted", 0)), "bytes": int(redis_client.get(TOTAL_KEY) or 0), "tasks": {}}
+    for field, count in raw.items():
+        task, _, outcome = field.rpartition(":")
+        result["tasks"].setdefault(task, {})[outcome] = int(count)
+    return result
@@ -0,0 +1,354 @@
+"""
+웹 프로세스(gunicorn)와 Celery 워커가 함께 사용하는 LLM HTTP 클라이언트입니다.
+
+프로세스마다 하나의 커넥션 풀(keep-alive, HTTP/2)을 유지하여
+호출할 때마다 TCP/TLS 핸드셰이크를 반복하지 않도록 합니다.
+요청은 llm.providers 가 정한 순서대로 공급자에 보내고, 재시도 가능한 오류면 다음 공급자로 넘깁니다.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+
+import httpx
+from django.conf import settings
+
+from config.db.pool import release_connections
+from llm import cache, providers, ratelimit, retry, singleflight, stats
+from llm.exceptions import LLMError, LLMRateLimited, LLMTimeout
+from llm.sse import DONE, delta_content, iter_events
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYSTEM_PROMPT = "당신은 전문적인 기술 문서를 작성하는 전문가입니다."
+
+_client = None
+_client_lock = threading.Lock()
+
+# ASGI 모드에서 사용하는 비동기 커넥션 풀 (이벤트 루프마다 하나)
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _reset_after_fork():
+    # prefork 워커는 부모의 소켓을 공유하면 안 되므로 자식 프로세스에서 풀을 새로 만듭니다.
+    global _client, _client_lock
+    _client = None
+    _client_lock = threading.Lock()
+    _async_clients.clear()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _client_options():
+    return {
+        "http2": settings.LLM_HTTP2,
+        "timeout": httpx.Timeout(
+            settings.LLM_READ_TIMEOUT,
+            connect=settings.LLM_CONNECT_TIMEOUT,
+            pool=settings.LLM_CONNECT_TIMEOUT,
+        ),
+        "limits": httpx.Limits(
+            max_connections=settings.LLM_POOL_SIZE,
+            max_keepalive_connections=settings.LLM_POOL_SIZE,
+            keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+def _build_client():
+    return httpx.Client(**_client_options())
+
+
+def get_client():
+    """
+    현재 프로세스의 커넥션 풀을 반환합니다. (처음 호출될 때 생성)
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _build_client()
+    return _client
+
+
+def get_async_client():
+    """
+    현재 이벤트 루프의 비동기 커넥션 풀을 반환합니다. (ASGI 모드 전용)
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(**_client_options())
+        _async_clients[loop] = client
+    return client
+
+
+def build_payload(prompt, system=DEFAULT_SYSTEM_PROMPT, model=None, stream=False, **params):
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt})
+
+    # model 을 지정하지 않으면 공급자별 기본 모델을 사용 (llm.providers)
+    payload = {
+        "messages": messages,
+        "stream": stream,
+    }
+    if model:
+        payload["model"] = model
+    payload.update(params)
+    return payload
+
+
+def _error_message(body):
+    try:
+        error = json.loads(body).get("error", "Unknown error occurred.")
+    except ValueError:
+        return "Unknown error occurred."
+    if isinstance(error, dict):
+        return error.get("message", str(error))
+    return error
+
+
+def _status_error(response, body):
+    try:
+        retry_after = float(response.headers.get("retry-after", ""))
+    except ValueError:
+        retry_after = None
+    return LLMError(
+        f"LLM API 호출 실패 ({response.status_code}): {_error_message(body)}", response.status_code, retry_after
+    )
+
+
+def _check_deadline(deadline):
+    if time.monotonic() > deadline:
+        raise LLMTimeout(f"LLM API 응답 시간 초과 ({settings.LLM_TOTAL_TIMEOUT}s)")
+
+
+def _failover(candidates, index, error):
+    """
+    candidates[index] 공급자의 실패를 기록하고, 다음 공급자로 넘길 수 없으면 error 를 다시 발생시킵니다.
+    """
+    # 로컬 속도 제한 거절은 재시도하지 않지만 속도 제한이 따로인 다음 공급자로는 넘기고,
+    # 공급자의 상태와 관계없으므로 오류로 기록하지 않음
+    if not isinstance(error, LLMRateLimited):
+        if not retry.is_retryable(error):
+            raise error
+        providers.record(candidates[index], error=True)
+    if index == len(candidates) - 1:
+        raise error
+    logger.warning(f"{candidates[index].name} 호출 실패, {candidates[index + 1].name}(으)로 전환합니다: {error}")
+
+
+def _send(provider, payload):
+    with ratelimit.acquire(payload, provider) as permit:
+        deadline = time.monotonic() + settings.LLM_TOTAL_TIMEOUT
+        try:
+            with get_client().stream("POST", provider.url, json=provider.prepare(payload), headers=provider.headers()) as response:
+                permit.started()
+                body = bytearray()
+                for chunk in response.iter_bytes():
+                    _check_deadline(deadline)
+                    body += chunk
+        except httpx.TimeoutException as e:
+            raise LLMTimeout(f"LLM API 응답 시간 초과: {e}")
+        except httpx.HTTPError as e:
+            raise LLMError(f"LLM API 요청 실패: {e}")
+
+        if response.status_code != 200:
+            raise _status_error(response, body)
+
+        result = json.loads(body)
+        permit.refund(result.get("usage"))
+        providers.record(provider, permit.latency)
+        return result
+
+
+def send_completion(payload):
+    """
+    비스트리밍 요청을 보내고 응답 JSON을 반환합니다.
+    """
+    candidates = providers.route()
+    for index, provider in enumerate(candidates):
+        try:
+            return _send(provider, payload)
+        except LLMError as e:
+            _failover(candidates, index, e)
+
+
+def chat_completion(prompt, system=DEFAULT_SYSTEM_PROMPT, model=None, task=None, use_cache=True, **params):
+    """
+    chat/completions API를 호출하여 응답 메시지 내용을 반환합니다.
+
+    task(호출 구분)를 지정하면 같은 입력에 대한 응답을 Redis 캐시에서 돌려주고
+    (use_cache=False 이면 캐시를 건너뛰고 새로 생성), 지연 시간을 기록하여 hedging 에 사용합니다.
+    재시도 가능한 오류는 백오프 후 다시 호출합니다.
+    """
+    payload = build_payload(prompt, system=system, model=model, **params)
+
+    def attempt():
+        started = time.monotonic()
+        try:
+            result = send_completion(payload)
+        except LLMError as e:
+            if task and not isinstance(e, LLMRateLimited):
+                stats.record(task, error=True)
+            raise
+        if task:
+            stats.record(task, time.monotonic() - started)
+        return result
+
+    def generate():
+        result = retry.hedged(task, lambda: retry.call(attempt))
+        return result["choices"][0]["message"]["content"]
+
+    def fetch():
+        # 응답을 기다리는 동안 DB 연결은 풀에 돌려줌
+        release_connections()
+        # 같은 요청이 이미 생성 중이면 그 결과를 기다림
+        return singleflight.do(cache.make_key(payload), generate)
+
+    if task is None:
+        return fetch()
+    return cache.get_or_call(task, payload, fetch, use_cache=use_cache)
+
+
+def chat_completion_stream(prompt, on_delta, system=DEFAULT_SYSTEM_PROMPT, model=None, task=None, use_cache=True, **params):
+    """
+    chat_completion 과 같이 응답 메시지 내용을 반환하지만, 응답을 스트리밍으로 받아
+    도착한 텍스트 조각마다 on_delta(text)를 호출합니다. 캐시된 응답이면 전체 내용으로 한 번 호출합니다.
+    (hedging 은 적용하지 않으며, 첫 청크 전의 오류만 재시도)
+    """
+    payload = build_payload(prompt, system=system, model=model, **params)
+    streamed = False
+
+    def fetch():
+        nonlocal streamed
+        streamed = True
+        release_connections()
+        started = time.monotonic()
+        parts = []
+        try:
+            for event in iter_events(stream_chat_completion(prompt, system=system, model=model, **params)):
+                if event.data == DONE:
+                    break
+                try:
+                    content = delta_content(event.data)
+                except ValueError:
+                    logger.error(f"LLM 스트림 이벤트 파싱 실패: {event.data[:200]}")
+                    continue
+                if content:
+                    parts.append(content)
+                    on_delta(content)
+        except LLMError as e:
+            if task and not isinstance(e, LLMRateLimited):
+                stats.record(task, error=True)
+            raise
+        if task:
+            stats.record(task, time.monotonic() - started)
+        return "".join(parts)
+
+    # 캐시 키는 비스트리밍 요청과 같으므로 chat_completion 의 캐시를 함께 사용
+    content = fetch() if task is None else cache.get_or_call(task, payload, fetch, use_cache=use_cache)
+    if not streamed:
+        on_delta(content)
+    return content
+
+
+def stream_chat_completion(prompt, system=DEFAULT_SYSTEM_PROMPT, model=None, **params):
+    """
+    스트리밍 요청을 보내고 응답 본문을 도착한 바이트 청크 그대로 yield 합니다.
+    같은 요청이 이미 스트리밍 중이면 그 스트림의 청크를 처음부터 받습니다.
+    """
+    payload = build_payload(prompt, system=system, model=model, stream=True, **params)
+    release_connections()
+    yield from singleflight.stream(cache.make_key(payload), lambda: retry.stream(lambda: _stream(payload)))
+
+
+async def astream_chat_completion(prompt, system=DEFAULT_SYSTEM_PROMPT, model=None, **params):
+    """
+    stream_chat_completion의 비동기 버전입니다. 하나의 프로세스가 수백 개의 스트림을
+    동시에 유지할 수 있도록 워커 스레드를 점유하지 않습니다.
+    """
+    payload = build_payload(prompt, system=system, model=model, stream=True, **params)
+    async for chunk in singleflight.astream(cache.make_key(payload), lambda: retry.astream(lambda: _astream(payload))):
+        yield chunk
+
+
+def _stream_from(provider, payload):
+    with ratelimit.acquire(payload, provider) as permit:
+        deadline = time.monotonic() + settings.LLM_TOTAL_TIMEOUT
+        try:
+            with get_client().stream("POST", provider.url, json=provider.prepare(payload), headers=provider.headers()) as response:
+                permit.started()
+                if response.status_code != 200:
+                    body = response.read()
+                    logger.error(f"LLM API failed with status {response.status_code}: {_error_message(body)}")
+                    raise _status_error(response, body)
+                providers.record(provider, permit.latency)
+
+                for chunk in response.iter_bytes():
+                    _check_deadline(deadline)
+                    if chunk:
+                        yield chunk
+        except httpx.TimeoutException as e:
+            raise LLMTimeout(f"LLM API 응답 시간 초과: {e}")
+        except httpx.HTTPError as e:
+            raise LLMError(f"LLM API 요청 실패: {e}")
+
+
+async def _astream_from(provider, payload):
+    async with ratelimit.aacquire(payload, provider) as permit:
+        deadline = time.monotonic() + settings.LLM_TOTAL_TIMEOUT
+        try:
+            async with get_async_client().stream("POST", provider.url, json=provider.prepare(payload), headers=provider.headers()) as response:
+                permit.started()
+                if response.status_code != 200:
+                    body = await response.aread()
+                    logger.error(f"LLM API failed with status {response.status_code}: {_error_message(body)}")
+                    raise _status_error(response, body)
+                providers.record(provider, permit.latency)
+
+                async for chunk in response.aiter_bytes():
+                    _check_deadline(deadline)
+                    if chunk:
+                        yield chunk
+        except httpx.TimeoutException as e:
+            raise LLMTimeout(f"LLM API 응답 시간 초과: {e}")
+        except httpx.HTTPError as e:
+            raise LLMError(f"LLM API 요청 실패: {e}")
+
+
+def _stream(payload):
+    # 첫 청크를 받기 전에 실패한 경우에만 다음 공급자로 전환
+    candidates = providers.route()
+    for index, provider in enumerate(candidates):
+        started = False
+        try:
+            for chunk in _stream_from(provider, payload):
+                started = True
+                yield chunk
+            return
+        except LLMError as e:
+            if started:
+                raise
+            _failover(candidates, index, e)
+
+
+async def _astream(payload):
+    candidates = providers.route()
+    for index, provider in enumerate(candidates):
+        started = False
+        try:
+            async for chunk in _astream_from(provider, payload):
+                started = True
+                yield chunk
+            return
+        except LLMError as e:
+            if started:
+                raise
+            _failover(candidates, index, e)
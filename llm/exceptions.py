@@ -0,0 +1,15 @@
+class LLMError(Exception):
+    """LLM API 호출 실패"""
+
+    def __init__(self, message, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class LLMTimeout(LLMError):
+    """connect/read/total 타임아웃 초과"""
+
+
+class LLMRateLimited(LLMError):
+    """로컬 속도 제한(llm.ratelimit)의 대기 한도를 넘어 공급자에 보내지 않은 요청 (공급자 오류로 기록하지 않음)"""
@@ -0,0 +1,70 @@
+"""
+Celery 워커에서 기록한 LLM 통계(Redis)를 웹 프로세스의 /metrics 로 내보냅니다.
+
+워커는 Prometheus가 직접 수집하지 않으므로, 통계는 Redis에 누적하고
+수집 시점에 읽어서 노출합니다.
+"""
+import logging
+
+import redis
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from llm import cache, providers, ratelimit
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCacheCollector:
+    def describe(self):
+        # 등록 시점에 Redis를 조회하지 않도록 메트릭 이름만 알려줍니다.
+        yield CounterMetricFamily("llm_cache_requests", "LLM 응답 캐시 조회 결과", labels=["task", "result"])
+        yield CounterMetricFamily("llm_cache_evictions", "메모리 예산 초과로 제거된 캐시 항목 수")
+        yield GaugeMetricFamily("llm_cache_bytes", "캐시에 저장된 응답의 전체 크기")
+
+    def collect(self):
+        try:
+            stats = cache.stats()
+        except redis.RedisError as e:
+            logger.warning(f"LLM 캐시 통계 조회 실패: {e}")
+            return
+
+        requests = CounterMetricFamily(
+            "llm_cache_requests", "LLM 응답 캐시 조회 결과", labels=["task", "result"]
+        )
+        for task, outcomes in stats["tasks"].items():
+            for outcome, count in outcomes.items():
+                requests.add_metric([task, outcome], count)
+        yield requests
+
+        yield CounterMetricFamily("llm_cache_evictions", "메모리 예산 초과로 제거된 캐시 항목 수", value=stats["evicted"])
+        yield GaugeMetricFamily("llm_cache_bytes", "캐시에 저장된 응답의 전체 크기", value=stats["bytes"])
+
+
+class LLMRateLimitCollector:
+    def describe(self):
+        yield GaugeMetricFamily("llm_concurrency_limit", "적응형 LLM 동시 호출 수 상한", labels=["provider"])
+        yield GaugeMetricFamily("llm_inflight_requests", "진행 중인 LLM 호출 수", labels=["provider"])
+        yield CounterMetricFamily(
+            "llm_ratelimit_events", "속도 제한 대기/거절 및 상한 감소 횟수", labels=["provider", "event"]
+        )
+
+    def collect(self):
+        limit = GaugeMetricFamily("llm_concurrency_limit", "적응형 LLM 동시 호출 수 상한", labels=["provider"])
+        inflight = GaugeMetricFamily("llm_inflight_requests", "진행 중인 LLM 호출 수", labels=["provider"])
+        events = CounterMetricFamily(
+            "llm_ratelimit_events", "속도 제한 대기/거절 및 상한 감소 횟수", labels=["provider", "event"]
+        )
+        try:
+            for provider in providers.get_providers():
+                stats = ratelimit.stats(provider.name)
+                limit.add_metric([provider.name], stats["limit"])
+                inflight.add_metric([provider.name], stats["inflight"])
+                for event, count in stats["events"].items():
+                    events.add_metric([provider.name, event], count)
+        except redis.RedisError as e:
+            logger.warning(f"LLM 속도 제한 통계 조회 실패: {e}")
+            return
+
+        yield limit
+        yield inflight
+        yield events
@@ -0,0 +1,128 @@
+"""
+LLM 공급자(OpenAI 호환, DeepSeek 호환) 설정과 라우팅입니다.
+
+공급자 목록은 settings.LLM_PROVIDERS 에서 읽으며 api_key 가 없는 항목은 사용하지 않습니다.
+요청은 최근 LLM_ROUTING_WINDOW 초 동안의 공급자별 응답 지연(p50/p95)과 오류율로 정한 순서대로
+보내고, 재시도 가능한 오류가 나면 다음 공급자로 넘깁니다. (llm.client 참고)
+"""
+import logging
+
+from django.conf import settings
+
+from llm import stats
+from llm.exceptions import LLMError
+
+logger = logging.getLogger(__name__)
+
+
+class Provider:
+    """
+    OpenAI chat/completions 호환 공급자
+    """
+    type = "openai"
+
+    def __init__(self, name, url, api_key, model, requests_per_minute=None, tokens_per_minute=None):
+        url = url.rstrip("/")
+        if not url.endswith("/chat/completions"):
+            url += "/chat/completions"
+        self.name = name
+        self.url = url
+        self.api_key = api_key
+        self.model = model
+        self.requests_per_minute = requests_per_minute or settings.LLM_REQUESTS_PER_MINUTE
+        self.tokens_per_minute = tokens_per_minute or settings.LLM_TOKENS_PER_MINUTE
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.name!r})"
+
+    @property
+    def stats_name(self):
+        return f"provider:{self.name}"
+
+    def headers(self):
+        return {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}",
+        }
+
+    def prepare(self, payload):
+        """
+        공통 payload 를 이 공급자의 요청 본문으로 바꿉니다.
+        """
+        body = dict(payload)
+        body["model"] = payload.get("model") or self.model
+        return body
+
+
+class DeepSeekProvider(Provider):
+    """
+    DeepSeek chat/completions 공급자 (OpenAI 호환, max_tokens 상한 8192)
+    """
+    type = "deepseek"
+    max_tokens = 8192
+
+    def prepare(self, payload):
+        body = super().prepare(payload)
+        if body.get("max_tokens", 0) > self.max_tokens:
+            body["max_tokens"] = self.max_tokens
+        return body
+
+
+PROVIDER_TYPES = {
+    Provider.type: Provider,
+    DeepSeekProvider.type: DeepSeekProvider,
+}
+
+_config = None
+_providers = []
+
+
+def get_providers():
+    """
+    설정된 공급자 목록을 반환합니다. (api_key 가 없는 항목 제외, 설정 순서 유지)
+    """
+    global _config, _providers
+    if _config is not settings.LLM_PROVIDERS:
+        providers = []
+        for options in settings.LLM_PROVIDERS:
+            options = dict(options)
+            provider_class = PROVIDER_TYPES[options.pop("type", Provider.type)]
+            if not options.get("api_key"):
+                continue
+            providers.append(provider_class(**options))
+        _config, _providers = settings.LLM_PROVIDERS, providers
+    return _providers
+
+
+def score(summary):
+    """
+    낮을수록 먼저 사용합니다. 기록이 부족한 공급자는 0(우선 시도)으로 취급하여 다시 측정합니다.
+    """
+    if summary["count"] < settings.LLM_ROUTING_MIN_SAMPLES or summary["p50"] is None:
+        return 0.0
+    latency = (summary["p50"] + summary["p95"]) / 2
+    return latency * (1 + settings.LLM_PROVIDER_ERROR_PENALTY * summary["error_rate"])
+
+
+def route():
+    """
+    요청을 보낼 공급자 순서를 반환합니다.
+    오류율이 LLM_PROVIDER_MAX_ERROR_RATE 를 넘은 공급자는 마지막 대안으로만 사용합니다.
+    """
+    providers = get_providers()
+    if not providers:
+        raise LLMError("사용 가능한 LLM 공급자가 없습니다. (LLM_PROVIDERS, API 키 설정 확인)")
+
+    healthy, degraded = [], []
+    for order, provider in enumerate(providers):
+        summary = stats.summary(provider.stats_name, max_age=settings.LLM_ROUTING_WINDOW)
+        if summary["count"] >= settings.LLM_ROUTING_MIN_SAMPLES and summary["error_rate"] > settings.LLM_PROVIDER_MAX_ERROR_RATE:
+            degraded.append((summary["error_rate"], order, provider))
+        else:
+            healthy.append((score(summary), order, provider))
+
+    return [provider for _, _, provider in sorted(healthy)] + [provider for _, _, provider in sorted(degraded)]
+
+
+def record(provider, latency=None, error=False):
+    stats.record(provider.stats_name, latency, error=error)
@@ -0,0 +1,314 @@
+"""
+모든 웹 프로세스와 Celery 워커가 공유하는 LLM 호출 속도 제한입니다.
+
+- 분당 요청 수/토큰 수를 Redis 토큰 버킷 두 개로 계량합니다.
+- 동시 호출 수 상한은 AIMD 방식으로 자동 조정합니다.
+  정상 응답마다 조금씩 늘리고, 429 응답이면 절반으로, 응답 지연(헤더 수신까지)이
+  LLM_LATENCY_TARGET 을 넘거나 5xx/타임아웃이면 10% 줄입니다.
+
+여유가 없으면 호출자는 LLM_RATE_LIMIT_MAX_WAIT 초까지 기다렸다가 호출하며,
+그래도 자리가 나지 않으면 429 상태의 LLMRateLimited(LLMError)를 발생시킵니다.
+"""
+import asyncio
+import contextlib
+import logging
+import random
+import time
+import uuid
+
+import redis
+from django.conf import settings
+
+from config.redis import get_async_redis_client, redis_client
+from llm.exceptions import LLMError, LLMRateLimited, LLMTimeout
+
+logger = logging.getLogger(__name__)
+
+# 공급자(llm.providers)마다 따로 계량합니다. ("llm:ratelimit:<공급자>:<종류>")
+KEY_PREFIX = "llm:ratelimit:"
+BUCKET = "bucket"      # hash: req, tok, ts (남은 요청/토큰 수, 마지막 갱신 시각)
+INFLIGHT = "inflight"  # sorted set: permit id -> 만료 시각(ms)
+LIMIT = "limit"        # 현재 동시 호출 수 상한 (실수)
+COOLDOWN = "cooldown"  # 감소 직후 연속 감소를 막기 위한 키
+STATS = "stats"        # hash: throttled, slow, waited, rejected
+
+
+def _key(name, kind):
+    return f"{KEY_PREFIX}{name}:{kind}"
+
+
+_CONCURRENCY_POLL = 0.1  # 동시 호출 수가 가득 찼을 때 재시도 간격(초)
+
+# 두 버킷을 채운 뒤 요청 1개와 토큰 cost 만큼 꺼낼 수 있고 동시 호출 수에 여유가 있으면 0,
+# 아니면 기다려야 할 시간(ms, 동시 호출 수 때문이면 -1)을 반환
+_ACQUIRE_LUA = """
+local now = tonumber(ARGV[1])
+local rpm, tpm = tonumber(ARGV[2]), tonumber(ARGV[3])
+local cost = math.min(tonumber(ARGV[4]), tpm)
+
+local bucket = redis.call('HMGET', KEYS[1], 'req', 'tok', 'ts')
+local req = tonumber(bucket[1]) or rpm
+local tok = tonumber(bucket[2]) or tpm
+local elapsed = math.max(0, now - (tonumber(bucket[3]) or now))
+req = math.min(rpm, req + elapsed * rpm / 60000)
+tok = math.min(tpm, tok + elapsed * tpm / 60000)
+
+local wait = 0
+if req < 1 then wait = (1 - req) * 60000 / rpm end
+if tok < cost then wait = math.max(wait, (cost - tok) * 60000 / tpm) end
+
+if wait == 0 then
+    redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+    local limit = math.floor(tonumber(redis.call('GET', KEYS[3]) or ARGV[7]))
+    if redis.call('ZCARD', KEYS[2]) >= limit then
+        wait = -1
+    else
+        req = req - 1
+        tok = tok - cost
+        redis.call('ZADD', KEYS[2], now + tonumber(ARGV[6]), ARGV[5])
+    end
+end
+
+redis.call('HSET', KEYS[1], 'req', req, 'tok', tok, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], 120000)
+return math.ceil(wait)
+"""
+
+# 응답 결과로 동시 호출 수 상한을 조정 (AIMD)
+_OBSERVE_LUA = """
+local outcome = ARGV[1]
+local lower, upper = tonumber(ARGV[2]), tonumber(ARGV[3])
+local limit = tonumber(redis.call('GET', KEYS[1]) or ARGV[4])
+
+if outcome == 'ok' then
+    limit = math.min(upper, limit + 1 / limit)
+elseif redis.call('SET', KEYS[2], 1, 'PX', ARGV[5], 'NX') then
+    if outcome == 'throttled' then
+        limit = math.max(lower, limit * 0.5)
+    else
+        limit = math.max(lower, limit * 0.9)
+    end
+end
+redis.call('SET', KEYS[1], limit)
+if outcome ~= 'ok' then
+    redis.call('HINCRBY', KEYS[3], outcome, 1)
+end
+return tostring(limit)
+"""
+
+_ACQUIRE_SCRIPT = redis_client.register_script(_ACQUIRE_LUA)
+_OBSERVE_SCRIPT = redis_client.register_script(_OBSERVE_LUA)
+
+
+def estimate_tokens(payload):
+    """
+    요청이 사용할 토큰 수를 추정합니다.
+    (한글은 1~2자가 1토큰 정도이므로 2자당 1토큰으로 넉넉하게 계산 + 최대 응답 토큰 수)
+    """
+    chars = sum(len(message.get("content") or "") for message in payload.get("messages", []))
+    return chars // 2 + payload.get("max_tokens", settings.LLM_DEFAULT_COMPLETION_TOKENS)
+
+
+def _acquire_keys(provider):
+    return [_key(provider.name, BUCKET), _key(provider.name, INFLIGHT), _key(provider.name, LIMIT)]
+
+
+def _observe_keys(provider):
+    return [_key(provider.name, LIMIT), _key(provider.name, COOLDOWN), _key(provider.name, STATS)]
+
+
+def _acquire_args(provider, permit_id, cost):
+    return [
+        int(time.time() * 1000),
+        provider.requests_per_minute,
+        provider.tokens_per_minute,
+        cost,
+        permit_id,
+        int(settings.LLM_TOTAL_TIMEOUT * 1000),
+        settings.LLM_CONCURRENCY_INITIAL,
+    ]
+
+
+def _observe_args(outcome):
+    return [
+        outcome,
+        settings.LLM_CONCURRENCY_MIN,
+        settings.LLM_CONCURRENCY_MAX,
+        settings.LLM_CONCURRENCY_INITIAL,
+        int(settings.LLM_CONCURRENCY_COOLDOWN * 1000),
+    ]
+
+
+def _sleep_for(wait_ms):
+    if wait_ms < 0:
+        return _CONCURRENCY_POLL * (0.5 + random.random())
+    return wait_ms / 1000
+
+
+def _rejected():
+    return LLMRateLimited("LLM 요청이 많아 처리하지 못했습니다. 잠시 후 다시 시도해주세요.", 429)
+
+
+class Permit:
+    """
+    acquire()/aacquire() 가 돌려주는 호출 허가입니다.
+    응답 헤더를 받으면 started()를 호출하여 지연 시간을 기록합니다.
+    """
+
+    def __init__(self, provider, permit_id, cost):
+        self.provider = provider
+        self.id = permit_id
+        self.cost = cost
+        self.latency = None
+        self._sent_at = time.monotonic()
+
+    def started(self):
+        self.latency = time.monotonic() - self._sent_at
+
+    def outcome(self, error=None):
+        if error is not None:
+            status = getattr(error, "status_code", None)
+            if status == 429:
+                return "throttled"
+            if isinstance(error, LLMTimeout) or (status or 0) >= 500:
+                return "slow"
+            if not isinstance(error, LLMError):
+                return None
+        if self.latency is not None and self.latency > settings.LLM_LATENCY_TARGET:
+            return "slow"
+        return "ok"
+
+    def refund(self, usage):
+        """
+        비스트리밍 응답의 usage 로 추정치와 실제 사용량의 차이를 토큰 버킷에 되돌립니다.
+        """
+        if not usage or "total_tokens" not in usage or self.id is None:
+            return
+        try:
+            redis_client.hincrbyfloat(_key(self.provider.name, BUCKET), "tok", self.cost - usage["total_tokens"])
+        except redis.RedisError:
+            pass
+
+
+@contextlib.contextmanager
+def acquire(payload, provider):
+    """
+    provider 의 분당 요청/토큰 수와 동시 호출 수에 여유가 생길 때까지 기다린 뒤 Permit을 반환합니다.
+    """
+    if not settings.LLM_RATE_LIMIT_ENABLED:
+        yield Permit(provider, None, 0)
+        return
+
+    permit_id = uuid.uuid4().hex
+    cost = estimate_tokens(payload)
+    deadline = time.monotonic() + settings.LLM_RATE_LIMIT_MAX_WAIT
+    waited = False
+    try:
+        while True:
+            wait_ms = _ACQUIRE_SCRIPT(keys=_acquire_keys(provider), args=_acquire_args(provider, permit_id, cost))
+            if wait_ms == 0:
+                break
+            delay = _sleep_for(wait_ms)
+            if time.monotonic() + delay > deadline:
+                redis_client.hincrby(_key(provider.name, STATS), "rejected", 1)
+                raise _rejected()
+            waited = True
+            time.sleep(delay)
+        if waited:
+            redis_client.hincrby(_key(provider.name, STATS), "waited", 1)
+    except redis.RedisError as e:
+        logger.warning(f"LLM 속도 제한 확인 실패: {e}")
+        # Redis 장애 시에는 제한 없이 호출
+        permit_id = None
+
+    if permit_id is None:
+        yield Permit(provider, None, 0)
+        return
+
+    permit = Permit(provider, permit_id, cost)
+    error = None
+    try:
+        yield permit
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        try:
+            redis_client.zrem(_key(provider.name, INFLIGHT), permit_id)
+            outcome = permit.outcome(error) if not isinstance(error, GeneratorExit) else None
+            if outcome is not None:
+                _OBSERVE_SCRIPT(keys=_observe_keys(provider), args=_observe_args(outcome))
+        except redis.RedisError as e:
+            logger.warning(f"LLM 속도 제한 갱신 실패: {e}")
+
+
+@contextlib.asynccontextmanager
+async def aacquire(payload, provider):
+    """
+    acquire 의 비동기 버전입니다. (ASGI 스트리밍 뷰)
+    """
+    if not settings.LLM_RATE_LIMIT_ENABLED:
+        yield Permit(provider, None, 0)
+        return
+
+    client = get_async_redis_client()
+    permit_id = uuid.uuid4().hex
+    cost = estimate_tokens(payload)
+    deadline = time.monotonic() + settings.LLM_RATE_LIMIT_MAX_WAIT
+    waited = False
+    try:
+        while True:
+            wait_ms = await client.eval(
+                _ACQUIRE_LUA, 3, *_acquire_keys(provider), *_acquire_args(provider, permit_id, cost)
+            )
+            if wait_ms == 0:
+                break
+            delay = _sleep_for(wait_ms)
+            if time.monotonic() + delay > deadline:
+                await client.hincrby(_key(provider.name, STATS), "rejected", 1)
+                raise _rejected()
+            waited = True
+            await asyncio.sleep(delay)
+        if waited:
+            await client.hincrby(_key(provider.name, STATS), "waited", 1)
+    except redis.RedisError as e:
+        logger.warning(f"LLM 속도 제한 확인 실패: {e}")
+        # Redis 장애 시에는 제한 없이 호출
+        permit_id = None
+
+    if permit_id is None:
+        yield Permit(provider, None, 0)
+        return
+
+    permit = Permit(provider, permit_id, cost)
+    error = None
+    try:
+        yield permit
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        try:
+            await client.zrem(_key(provider.name, INFLIGHT), permit_id)
+            outcome = permit.outcome(error) if not isinstance(error, GeneratorExit) else None
+            if outcome is not None:
+                await client.eval(_OBSERVE_LUA, 3, *_observe_keys(provider), *_observe_args(outcome))
+        except redis.RedisError as e:
+            logger.warning(f"LLM 속도 제한 갱신 실패: {e}")
+
+
+def stats(name):
+    """
+    공급자 name 의 현재 동시 호출 수 상한/사용 중인 수와 누적 대기/거절/감소 횟수를 반환합니다.
+    """
+    now = int(time.time() * 1000)
+    pipe = redis_client.pipeline()
+    pipe.get(_key(name, LIMIT))
+    pipe.zcount(_key(name, INFLIGHT), now, "+inf")
+    pipe.hgetall(_key(name, STATS))
+    limit, inflight, counts = pipe.execute()
+    return {
+        "limit": float(limit or settings.LLM_CONCURRENCY_INITIAL),
+        "inflight": inflight,
+        "events": {name: int(count) for name, count in counts.items()},
+    }
@@ -0,0 +1,160 @@
+"""
+LLM 호출 재시도와 hedging 입니다.
+
+- 재시도: 타임아웃, 연결 오류, LLM_RETRY_STATUS_CODES 응답이면 지수 백오프(full jitter)로
+  최대 LLM_RETRY_ATTEMPTS 번 다시 호출합니다. Retry-After 헤더가 있으면 그만큼은 기다립니다.
+  로컬 속도 제한(llm.ratelimit)의 거절은 재시도하지 않습니다.
+- hedging: LLM_HEDGE_TASKS 의 호출이 최근 p95 지연 시간 안에 끝나지 않으면 같은 요청을 한 번 더
+  보내고 먼저 끝난 응답을 사용합니다. (늦은 쪽의 결과는 버림)
+"""
+import asyncio
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+from llm import stats
+from llm.exceptions import LLMError, LLMRateLimited, LLMTimeout
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def is_retryable(error):
+    # 로컬 속도 제한 거절은 이미 대기 한도만큼 기다린 것이므로 다시 시도하지 않음 (공급자의 429 응답은 재시도)
+    if isinstance(error, LLMRateLimited):
+        return False
+    if isinstance(error, LLMTimeout):
+        return True
+    # status_code 가 없으면 연결 실패 등 응답을 받지 못한 경우
+    return error.status_code is None or error.status_code in settings.LLM_RETRY_STATUS_CODES
+
+
+def backoff(attempt, error=None):
+    delay = random.uniform(0, min(settings.LLM_RETRY_MAX_DELAY, settings.LLM_RETRY_BASE_DELAY * 2 ** attempt))
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after:
+        delay = max(delay, min(retry_after, settings.LLM_RETRY_MAX_DELAY))
+    return delay
+
+
+def _should_retry(attempt, error):
+    if attempt >= settings.LLM_RETRY_ATTEMPTS or not is_retryable(error):
+        return None
+    delay = backoff(attempt, error)
+    logger.warning(f"LLM 호출 실패, {delay:.1f}초 후 재시도 ({attempt + 1}/{settings.LLM_RETRY_ATTEMPTS}): {error}")
+    return delay
+
+
+def call(fn):
+    """
+    fn()을 호출하고 재시도 가능한 LLMError 이면 백오프 후 다시 호출합니다.
+    """
+    for attempt in itertools.count():
+        try:
+            return fn()
+        except LLMError as e:
+            delay = _should_retry(attempt, e)
+            if delay is None:
+                raise
+        time.sleep(delay)
+
+
+def stream(produce):
+    """
+    스트리밍 호출의 재시도입니다. 첫 청크를 받기 전에 실패한 경우에만 다시 연결합니다.
+    """
+    for attempt in itertools.count():
+        started = False
+        try:
+            for chunk in produce():
+                started = True
+                yield chunk
+            return
+        except LLMError as e:
+            delay = None if started else _should_retry(attempt, e)
+            if delay is None:
+                raise
+        time.sleep(delay)
+
+
+async def astream(produce):
+    """
+    stream 의 비동기 버전입니다.
+    """
+    for attempt in itertools.count():
+        started = False
+        try:
+            async for chunk in produce():
+                started = True
+                yield chunk
+            return
+        except LLMError as e:
+            delay = None if started else _should_retry(attempt, e)
+            if delay is None:
+                raise
+        await asyncio.sleep(delay)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=settings.LLM_HEDGE_WORKERS, thread_name_prefix="llm-hedge")
+    return _executor
+
+
+def hedge_delay(task):
+    """
+    두 번째 요청을 보내기까지 기다릴 시간(초)을 반환합니다. hedging 대상이 아니면 None.
+    """
+    if not settings.LLM_HEDGE_ENABLED or task not in settings.LLM_HEDGE_TASKS:
+        return None
+    summary = stats.summary(task)
+    if summary["count"] < settings.LLM_HEDGE_MIN_SAMPLES or summary["p95"] is None:
+        return settings.LLM_HEDGE_DEFAULT_DELAY
+    return max(settings.LLM_HEDGE_MIN_DELAY, summary["p95"])
+
+
+def hedged(task, fn):
+    """
+    fn()을 호출하되, hedge_delay(task) 안에 끝나지 않으면 fn()을 한 번 더 실행하여 먼저 성공한 결과를 반환합니다.
+    """
+    delay = hedge_delay(task)
+    if delay is None:
+        return fn()
+
+    executor = _get_executor()
+    pending = {executor.submit(fn)}
+    done, pending = wait(pending, timeout=delay)
+    if not done:
+        logger.info(f"{task}: {delay:.1f}초 안에 응답이 없어 hedge 요청을 보냅니다.")
+        pending.add(executor.submit(fn))
+
+    error = None
+    while True:
+        for future in done:
+            try:
+                return future.result()
+            except LLMError as e:
+                error = e
+        if not pending:
+            raise error
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
@@ -0,0 +1,354 @@
+"""
+동일한 LLM 요청을 하나로 합치는 single-flight 처리입니다.
+
+dev_document 를 연달아 누르거나 두 탭에서 같은 문서를 스트리밍하면 같은 요청으로
+LLM 생성이 동시에 여러 번 실행됩니다. 요청 키(llm.cache.make_key)마다 Redis 락을 먼저 잡은
+호출만 LLM을 호출하고, 생성 중에 들어온 호출은 그 호출이 Redis Stream 에 기록하는
+결과(스트리밍이면 토큰 청크)를 처음부터 읽어 같은 응답을 받습니다.
+
+생성이 끝나면 락을 해제하므로, 이후에 들어온 요청은 새로 생성합니다. (재사용은 llm.cache 담당)
+먼저 시작한 호출은 재시도/대기로 오래 걸릴 수 있으므로 실행되는 동안 LLM_SINGLEFLIGHT_LOCK_TTL 의 1/3 마다
+락의 만료 시간을 연장하고, 기다리는 호출은 락이 유지되는 동안 계속 기다립니다.
+(먼저 시작한 프로세스가 죽으면 락이 LLM_SINGLEFLIGHT_LOCK_TTL 안에 만료되어 기다리던 호출도 실패)
+"""
+import asyncio
+import logging
+import threading
+import uuid
+
+import redis
+from django.conf import settings
+
+from config.redis import get_async_redis_client, raw_redis_client
+from llm.exceptions import LLMError
+
+logger = logging.getLogger(__name__)
+
+LOCK_PREFIX = "llm:flight:lock:"  # string: 요청 키 -> 진행 중인 flight id
+STREAM_PREFIX = "llm:flight:"     # stream: flight id -> 청크/결과/오류 항목
+
+_BLOCK_MS = 1000
+_READ_COUNT = 256
+
+# 자신이 잡은 락일 때만 해제
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+_RELEASE_SCRIPT = raw_redis_client.register_script(_RELEASE_LUA)
+
+# 자신이 잡은 락일 때만 락과 flight 스트림의 만료 시간 연장
+_REFRESH_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('EXPIRE', KEYS[2], ARGV[3])
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_REFRESH_SCRIPT = raw_redis_client.register_script(_REFRESH_LUA)
+
+# 스트림 항목 필드
+_CHUNK = b"c"
+_RESULT = b"r"
+_END = b"end"
+_ERROR = b"e"
+_STATUS = b"s"
+
+
+def _error_fields(error):
+    return {_ERROR: str(error) or error.__class__.__name__, _STATUS: getattr(error, "status_code", None) or ""}
+
+
+def _raise(fields):
+    status = fields.get(_STATUS)
+    raise LLMError(fields[_ERROR].decode("utf-8"), int(status) if status else None)
+
+
+def _stream_ttl(done):
+    # 생성 중에는 락이 만료될 때까지, 끝난 뒤에는 늦게 합류한 호출이 읽을 수 있을 만큼만 보관
+    if done:
+        return settings.LLM_SINGLEFLIGHT_RESULT_TTL
+    return settings.LLM_SINGLEFLIGHT_LOCK_TTL + settings.LLM_SINGLEFLIGHT_RESULT_TTL
+
+
+def _refresh_args(key, flight):
+    return [LOCK_PREFIX + key, STREAM_PREFIX + flight], [flight, settings.LLM_SINGLEFLIGHT_LOCK_TTL, _stream_ttl(False)]
+
+
+#----------------------------------------------------------
+# 동기 (gunicorn 워커, Celery 워커)
+
+class _Heartbeat:
+    """
+    먼저 시작한 호출이 실행되는 동안 별도 스레드에서 락의 만료 시간을 연장합니다.
+    """
+
+    def __init__(self, key, flight):
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(key, flight), daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _run(self, key, flight):
+        keys, args = _refresh_args(key, flight)
+        while not self._stop.wait(settings.LLM_SINGLEFLIGHT_LOCK_TTL / 3):
+            try:
+                _REFRESH_SCRIPT(keys=keys, args=args)
+            except redis.RedisError as e:
+                logger.warning(f"single-flight 락 연장 실패: {e}")
+
+
+def _join(key):
+    """
+    락을 잡으면 (새 flight id, True), 이미 진행 중이면 (진행 중인 flight id, False)를 반환합니다.
+    """
+    lock_key = LOCK_PREFIX + key
+    while True:
+        flight = uuid.uuid4().hex
+        if raw_redis_client.set(lock_key, flight, nx=True, ex=settings.LLM_SINGLEFLIGHT_LOCK_TTL):
+            return flight, True
+        current = raw_redis_client.get(lock_key)
+        if current is not None:
+            return current.decode(), False
+        # GET 직전에 락이 해제된 경우 다시 시도
+
+
+def _publish(flight, fields, done=False):
+    try:
+        pipe = raw_redis_client.pipeline(transaction=False)
+        pipe.xadd(STREAM_PREFIX + flight, fields)
+        pipe.expire(STREAM_PREFIX + flight, _stream_ttl(done))
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"single-flight 기록 실패: {e}")
+
+
+def _release(key, flight):
+    try:
+        _RELEASE_SCRIPT(keys=[LOCK_PREFIX + key], args=[flight])
+    except redis.RedisError as e:
+        logger.warning(f"single-flight 락 해제 실패: {e}")
+
+
+def _entries(key, flight):
+    """
+    먼저 시작한 호출이 기록한 항목을 처음부터 순서대로 yield 합니다.
+    """
+    stream_key = STREAM_PREFIX + flight
+    last_id = b"0"
+    try:
+        while True:
+            response = raw_redis_client.xread({stream_key: last_id}, count=_READ_COUNT, block=_BLOCK_MS)
+            if not response:
+                # 락이 사라졌는데 마지막 항목이 없으면 먼저 시작한 호출이 비정상 종료된 것
+                if raw_redis_client.get(LOCK_PREFIX + key) != flight.encode():
+                    response = raw_redis_client.xread({stream_key: last_id}, count=_READ_COUNT)
+                    if not response:
+                        raise LLMError("동일한 요청의 생성이 비정상 종료되었습니다.")
+                else:
+                    continue
+            for last_id, fields in response[0][1]:
+                yield fields
+    except redis.RedisError as e:
+        raise LLMError(f"동일한 요청의 응답을 읽지 못했습니다: {e}")
+
+
+def do(key, fetch):
+    """
+    같은 key 로 진행 중인 호출이 있으면 그 결과(문자열)를 기다리고, 없으면 fetch()를 실행합니다.
+    """
+    if not settings.LLM_SINGLEFLIGHT_ENABLED:
+        return fetch()
+
+    try:
+        flight, leader = _join(key)
+    except redis.RedisError as e:
+        logger.warning(f"single-flight 락 획득 실패: {e}")
+        return fetch()
+
+    if not leader:
+        for fields in _entries(key, flight):
+            if _RESULT in fields:
+                return fields[_RESULT].decode("utf-8")
+            if _ERROR in fields:
+                _raise(fields)
+
+    try:
+        with _Heartbeat(key, flight):
+            value = fetch()
+    except Exception as e:
+        _publish(flight, _error_fields(e), done=True)
+        raise
+    else:
+        _publish(flight, {_RESULT: value}, done=True)
+        return value
+    finally:
+        _release(key, flight)
+
+
+def stream(key, produce):
+    """
+    같은 key 로 진행 중인 스트림이 있으면 그 청크를 처음부터 yield 하고,
+    없으면 produce()의 청크를 기록하면서 yield 합니다.
+    """
+    if not settings.LLM_SINGLEFLIGHT_ENABLED:
+        yield from produce()
+        return
+
+    try:
+        flight, leader = _join(key)
+    except redis.RedisError as e:
+        logger.warning(f"single-flight 락 획득 실패: {e}")
+        yield from produce()
+        return
+
+    if not leader:
+        for fields in _entries(key, flight):
+            if _CHUNK in fields:
+                yield fields[_CHUNK]
+            elif _END in fields:
+                return
+            elif _ERROR in fields:
+                _raise(fields)
+        return
+
+    done = False
+    heartbeat = _Heartbeat(key, flight)
+    heartbeat.start()
+    try:
+        for chunk in produce():
+            _publish(flight, {_CHUNK: chunk})
+            yield chunk
+        _publish(flight, {_END: b""}, done=True)
+        done = True
+    except Exception as e:
+        _publish(flight, _error_fields(e), done=True)
+        done = True
+        raise
+    finally:
+        heartbeat.stop()
+        if not done:
+            # 클라이언트 연결이 끊겨 스트림이 중단된 경우
+            _publish(flight, {_ERROR: "생성이 중단되었습니다."}, done=True)
+        _release(key, flight)
+
+
+#----------------------------------------------------------
+# 비동기 (ASGI 스트리밍 뷰)
+
+async def _ajoin(client, key):
+    lock_key = LOCK_PREFIX + key
+    while True:
+        flight = uuid.uuid4().hex
+        if await client.set(lock_key, flight, nx=True, ex=settings.LLM_SINGLEFLIGHT_LOCK_TTL):
+            return flight, True
+        current = await client.get(lock_key)
+        if current is not None:
+            return current.decode(), False
+
+
+async def _apublish(client, flight, fields, done=False):
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.xadd(STREAM_PREFIX + flight, fields)
+        pipe.expire(STREAM_PREFIX + flight, _stream_ttl(done))
+        await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"single-flight 기록 실패: {e}")
+
+
+async def _arelease(client, key, flight):
+    try:
+        await client.eval(_RELEASE_LUA, 1, LOCK_PREFIX + key, flight)
+    except redis.RedisError as e:
+        logger.warning(f"single-flight 락 해제 실패: {e}")
+
+
+async def _aheartbeat(client, key, flight):
+    # _Heartbeat 의 비동기 버전 (태스크를 취소하면 멈춤)
+    keys, args = _refresh_args(key, flight)
+    while True:
+        await asyncio.sleep(settings.LLM_SINGLEFLIGHT_LOCK_TTL / 3)
+        try:
+            await client.eval(_REFRESH_LUA, len(keys), *keys, *args)
+        except redis.RedisError as e:
+            logger.warning(f"single-flight 락 연장 실패: {e}")
+
+
+async def _aentries(client, key, flight):
+    stream_key = STREAM_PREFIX + flight
+    last_id = b"0"
+    try:
+        while True:
+            response = await client.xread({stream_key: last_id}, count=_READ_COUNT, block=_BLOCK_MS)
+            if not response:
+                if await client.get(LOCK_PREFIX + key) != flight.encode():
+                    response = await client.xread({stream_key: last_id}, count=_READ_COUNT)
+                    if not response:
+                        raise LLMError("동일한 요청의 생성이 비정상 종료되었습니다.")
+                else:
+                    continue
+            for last_id, fields in response[0][1]:
+                yield fields
+    except redis.RedisError as e:
+        raise LLMError(f"동일한 요청의 응답을 읽지 못했습니다: {e}")
+
+
+async def astream(key, produce):
+    """
+    stream 의 비동기 버전입니다. produce()는 비동기 이터레이터를 반환해야 합니다.
+    """
+    if not settings.LLM_SINGLEFLIGHT_ENABLED:
+        async for chunk in produce():
+            yield chunk
+        return
+
+    client = get_async_redis_client()
+    try:
+        flight, leader = await _ajoin(client, key)
+    except redis.RedisError as e:
+        logger.warning(f"single-flight 락 획득 실패: {e}")
+        async for chunk in produce():
+            yield chunk
+        return
+
+    if not leader:
+        async for fields in _aentries(client, key, flight):
+            if _CHUNK in fields:
+                yield fields[_CHUNK]
+            elif _END in fields:
+                return
+            elif _ERROR in fields:
+                _raise(fields)
+        return
+
+    done = False
+    heartbeat = asyncio.get_running_loop().create_task(_aheartbeat(client, key, flight))
+    try:
+        async for chunk in produce():
+            await _apublish(client, flight, {_CHUNK: chunk})
+            yield chunk
+        await _apublish(client, flight, {_END: b""}, done=True)
+        done = True
+    except Exception as e:
+        await _apublish(client, flight, _error_fields(e), done=True)
+        done = True
+        raise
+    finally:
+        heartbeat.cancel()
+        if not done:
+            await _apublish(client, flight, {_ERROR: "생성이 중단되었습니다."}, done=True)
+        await _arelease(client, key, flight)
@@ -0,0 +1,147 @@
+"""
+업스트림 LLM 스트림(text/event-stream)을 위한 점진적 SSE 디코더입니다.
+
+네트워크가 전달하는 청크 경계와 무관하게 완성된 이벤트만 반환합니다.
+버퍼에는 아직 끝나지 않은 마지막 줄만 남기고, 이미 검사한 바이트는 다시 검사하지
+않으므로 처리 비용은 청크 크기가 아닌 전체 바이트 수에 비례합니다.
+"""
+import json
+from json.decoder import scanstring
+
+DONE = "[DONE]"
+
+_CONTENT_MARKER = '"content":"'
+_DELTA_MARKER = '"delta":{'
+
+
+class SSEEvent:
+    __slots__ = ("event", "data", "id")
+
+    def __init__(self, event, data, id=None):
+        self.event = event
+        self.data = data
+        self.id = id
+
+    def __repr__(self):
+        return f"SSEEvent(event={self.event!r}, data={self.data!r}, id={self.id!r})"
+
+
+class SSEDecoder:
+    """
+    바이트 청크를 feed() 로 넣으면 완성된 SSEEvent 리스트를 돌려줍니다.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._scan_from = 0
+        self._data = []
+        self._event = None
+        self._id = None
+
+    def feed(self, chunk):
+        events = []
+        buffer = self._buffer
+        buffer += chunk
+
+        start = 0
+        newline = buffer.find(b"\n", self._scan_from)
+        while newline != -1:
+            end = newline
+            if end > start and buffer[end - 1] == 0x0D:  # \r\n
+                end -= 1
+            event = self._process_line(bytes(buffer[start:end]))
+            if event is not None:
+                events.append(event)
+            start = newline + 1
+            newline = buffer.find(b"\n", start)
+
+        if start:
+            del buffer[:start]
+        self._scan_from = len(buffer)
+        return events
+
+    def flush(self):
+        """
+        스트림 종료 시 남아 있는 줄/이벤트를 처리합니다.
+        """
+        events = []
+        if self._buffer:
+            event = self._process_line(bytes(self._buffer).rstrip(b"\r"))
+            if event is not None:
+                events.append(event)
+            self._buffer.clear()
+            self._scan_from = 0
+        event = self._dispatch()
+        if event is not None:
+            events.append(event)
+        return events
+
+    def _process_line(self, line):
+        if not line:
+            return self._dispatch()
+        if line[0] == 0x3A:  # ':' 로 시작하면 주석(keep-alive)
+            return None
+
+        field, sep, value = line.partition(b":")
+        if sep and value[:1] == b" ":
+            value = value[1:]
+
+        if field == b"data":
+            self._data.append(value.decode("utf-8"))
+        elif field == b"event":
+            self._event = value.decode("utf-8")
+        elif field == b"id":
+            self._id = value.decode("utf-8")
+        return None
+
+    def _dispatch(self):
+        if not self._data:
+            self._event = None
+            return None
+        event = SSEEvent(self._event or "message", "\n".join(self._data), self._id)
+        self._data = []
+        self._event = None
+        return event
+
+
+def delta_content(data):
+    """
+    chat/completions 스트림 이벤트의 choices[0].delta.content 를 반환합니다.
+
+    일반적인(압축된) 응답은 전체 JSON을 파싱하지 않고 content 문자열만 바로 디코딩하고,
+    형식이 다르면 json.loads 로 처리합니다. JSON이 아니면 ValueError를 발생시킵니다.
+    """
+    delta = data.find(_DELTA_MARKER)
+    if delta != -1:
+        marker = data.find(_CONTENT_MARKER, delta)
+        if marker != -1:
+            try:
+                return scanstring(data, marker + len(_CONTENT_MARKER))[0]
+            except ValueError:
+                pass
+
+    data_json = json.loads(data)
+    choices = data_json.get("choices") or [{}]
+    return (choices[0].get("delta") or {}).get("content") or ""
+
+
+def iter_events(chunks):
+    """
+    바이트 청크 이터러블에서 SSE 이벤트를 순서대로 yield 합니다.
+    """
+    decoder = SSEDecoder()
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.flush()
+
+
+async def aiter_events(chunks):
+    """
+    iter_events 의 비동기 버전입니다.
+    """
+    decoder = SSEDecoder()
+    async for chunk in chunks:
+        for event in decoder.feed(chunk):
+            yield event
+    for event in decoder.flush():
+        yield event
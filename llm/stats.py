@@ -0,0 +1,76 @@
+"""
+LLM 호출의 최근 지연 시간과 오류를 Redis 에 보관하고 p50/p95, 오류율을 계산합니다.
+
+모든 웹 프로세스와 Celery 워커가 같은 창(최근 LLM_STATS_WINDOW 건)을 공유하며,
+조회 결과는 프로세스마다 LLM_STATS_CACHE_TTL 초 동안 캐시합니다.
+"""
+import logging
+import time
+
+import redis
+from django.conf import settings
+
+from config.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "llm:stats:"  # list: "<기록 시각>:<지연 시간(초) 또는 오류 표시>"
+_ERROR = "e"
+
+_summaries = {}  # (name, max_age) -> (만료 시각, 요약)
+
+
+def record(name, seconds=None, error=False):
+    """
+    name(태스크 이름 등)에 호출 결과 하나를 기록합니다.
+    """
+    key = KEY_PREFIX + name
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.lpush(key, f"{time.time():.0f}:{_ERROR if error else f'{seconds:.3f}'}")
+        pipe.ltrim(key, 0, settings.LLM_STATS_WINDOW - 1)
+        pipe.expire(key, 60 * 60 * 24)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"LLM 호출 통계 기록 실패: {e}")
+
+
+def _quantile(values, q):
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summary(name, max_age=None):
+    """
+    {"count", "p50", "p95", "error_rate"} 를 반환합니다. (기록이 없으면 p50/p95 는 None)
+    max_age(초)를 지정하면 그보다 오래된 기록은 제외합니다.
+    """
+    now = time.monotonic()
+    cached = _summaries.get((name, max_age))
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    try:
+        entries = redis_client.lrange(KEY_PREFIX + name, 0, -1)
+    except redis.RedisError as e:
+        logger.warning(f"LLM 호출 통계 조회 실패: {e}")
+        entries = []
+
+    since = time.time() - max_age if max_age else 0
+    values = []
+    for entry in entries:
+        recorded_at, sep, value = entry.partition(":")
+        if sep and float(recorded_at) >= since:
+            values.append(value)
+
+    latencies = sorted(float(value) for value in values if value != _ERROR)
+    errors = len(values) - len(latencies)
+    result = {
+        "count": len(values),
+        "p50": _quantile(latencies, 0.5),
+        "p95": _quantile(latencies, 0.95),
+        "error_rate": errors / len(values) if values else 0.0,
+    }
+    _summaries[(name, max_age)] = (now + settings.LLM_STATS_CACHE_TTL, result)
+    return result
@@ -0,0 +1,468 @@
+"""
+부하/지연 테스트용 OpenAI 호환 LLM 스텁 서버입니다.
+
+    python -m llm.stub_server --port 8089 --ttft 0.5 --tokens-per-second 80 --error-rate 0.01 --rate-limit-rate 0.05
+
+/v1/chat/completions 를 스트리밍/비스트리밍 모두 지원하며, 프롬프트 종류에 따라
+정해진 본문(기능명세서, 시퀀스 다이어그램/ERD Mermaid, swagger.json, Django models/views/urls)을 돌려줍니다.
+첫 토큰까지의 시간, 초당 토큰 수, 5xx 오류 비율, 429 응답 비율을 조정할 수 있습니다.
+
+백엔드와 Celery 워커에 LLM_STUB_URL=http://<host>:8089/v1 을 설정하면 모든 LLM 호출이 이 서버로 갑니다.
+Django 설정 없이 표준 라이브러리만으로 실행됩니다.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_TOKEN_PATTERN = re.compile(r"\s+|[^\s]{1,4}")
+
+SPEC_DOCUMENT = """시스템 목적:
+- 비즈니스 목적: {title} 서비스의 사용자가 필요한 기능을 빠르고 안정적으로 이용할 수 있도록 하는 것입니다.
+- 기술적 목적: 확장 가능하고 유지보수가 쉬운 웹 서비스 구조를 구축하는 것입니다.
+
+기능 요구사항:
+1. 회원 관리
+- 사용자는 이메일과 비밀번호로 회원가입을 할 수 있어야 한다.
+- 사용자는 로그인 후 자신의 프로필을 조회하고 수정할 수 있어야 한다.
+- 사용자는 로그아웃할 수 있어야 한다.
+
+2. 게시글 관리
+- 사용자는 게시글을 작성, 조회, 수정, 삭제할 수 있어야 한다.
+- 사용자는 게시글 목록을 최신순으로 페이지 단위로 조회할 수 있어야 한다.
+- 사용자는 제목과 내용으로 게시글을 검색할 수 있어야 한다.
+
+3. 댓글 관리
+- 사용자는 게시글에 댓글을 작성할 수 있어야 한다.
+- 사용자는 자신이 작성한 댓글을 수정하거나 삭제할 수 있어야 한다.
+
+4. 알림
+- 사용자는 자신의 게시글에 댓글이 달리면 알림을 받을 수 있어야 한다.
+- 사용자는 읽지 않은 알림 수를 확인할 수 있어야 한다.
+
+5. 관리자 기능
+- 관리자는 부적절한 게시글과 댓글을 숨김 처리할 수 있어야 한다.
+- 관리자는 사용자 계정을 정지하거나 복구할 수 있어야 한다.
+"""
+
+SEQUENCE_DIAGRAM = """sequenceDiagram
+    actor User
+    participant Frontend
+    participant AuthService
+    participant PostService
+    participant Database
+
+    User->>Frontend: 로그인 정보 입력
+    Frontend->>AuthService: 로그인 요청
+    AuthService->>Database: 사용자 조회
+    Database-->>AuthService: 사용자 정보 반환
+    alt 인증 성공
+        AuthService-->>Frontend: 토큰 발급
+        Frontend-->>User: 메인 화면 표시
+    else 인증 실패
+        AuthService-->>Frontend: 오류 응답
+        Frontend-->>User: 오류 메시지 표시
+    end
+
+    User->>Frontend: 게시글 작성
+    Frontend->>PostService: 게시글 생성 요청
+    PostService->>Database: 게시글 저장
+    Database-->>PostService: 저장 완료
+    PostService-->>Frontend: 생성된 게시글 반환
+    Frontend-->>User: 게시글 상세 화면 표시
+
+    loop 댓글 목록 갱신
+        Frontend->>PostService: 댓글 목록 요청
+        PostService->>Database: 댓글 조회
+        Database-->>PostService: 댓글 목록 반환
+        PostService-->>Frontend: 댓글 목록 응답
+    end
+"""
+
+ERD = """erDiagram
+    USER ||--o{ POST : writes
+    USER ||--o{ COMMENT : writes
+    POST ||--o{ COMMENT : has
+    USER ||--o{ NOTIFICATION : receives
+
+    USER {
+        int id PK
+        string email
+        string password
+        string nickname
+        datetime created_at
+    }
+    POST {
+        int id PK
+        int user_id FK
+        string title
+        text content
+        datetime created_at
+        datetime updated_at
+    }
+    COMMENT {
+        int id PK
+        int post_id FK
+        int user_id FK
+        text content
+        datetime created_at
+    }
+    NOTIFICATION {
+        int id PK
+        int user_id FK
+        string message
+        boolean is_read
+        datetime created_at
+    }
+"""
+
+
+def _crud_paths(resource, tag, fields):
+    schema = {"type": "object", "properties": {name: {"type": kind} for name, kind in fields.items()}}
+    item = f"/{resource}/{{id}}"
+    id_parameter = [{"name": "id", "in": "path", "required": True, "type": "integer"}]
+    return {
+        f"/{resource}": {
+            "get": {"tags": [tag], "summary": f"{tag} 목록 조회", "responses": {"200": {"description": "조회 성공"}}},
+            "post": {
+                "tags": [tag],
+                "summary": f"{tag} 생성",
+                "parameters": [{"name": "body", "in": "body", "required": True, "schema": schema}],
+                "responses": {"201": {"description": "생성 성공"}, "400": {"description": "잘못된 요청"}},
+            },
+        },
+        item: {
+            "get": {
+                "tags": [tag], "summary": f"{tag} 상세 조회", "parameters": id_parameter,
+                "responses": {"200": {"description": "조회 성공"}, "404": {"description": "찾을 수 없음"}},
+            },
+            "put": {
+                "tags": [tag], "summary": f"{tag} 수정",
+                "parameters": id_parameter + [{"name": "body", "in": "body", "required": True, "schema": schema}],
+                "responses": {"200": {"description": "수정 성공"}, "404": {"description": "찾을 수 없음"}},
+            },
+            "delete": {
+                "tags": [tag], "summary": f"{tag} 삭제", "parameters": id_parameter,
+                "responses": {"204": {"description": "삭제 성공"}, "404": {"description": "찾을 수 없음"}},
+            },
+        },
+    }
+
+
+SWAGGER = {
+    "swagger": "2.0",
+    "info": {"title": "게시판 API", "version": "1.0.0", "description": "게시판 서비스 API 명세서입니다."},
+    "basePath": "/api",
+    "schemes": ["http"],
+    "paths": {
+        **_crud_paths("users", "사용자", {"email": "string", "password": "string", "nickname": "string"}),
+        **_crud_paths("posts", "게시글", {"title": "string", "content": "string"}),
+        **_crud_paths("comments", "댓글", {"post_id": "integer", "content": "string"}),
+    },
+}
+
+DJANGO_MODELS = '''from django.db import models
+
+
+class User(models.Model):
+    email = models.EmailField(unique=True)
+    password = models.CharField(max_length=128)
+    nickname = models.CharField(max_length=50)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "사용자"
+        verbose_name_plural = "사용자 목록"
+
+
+class Post(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="posts")
+    title = models.CharField(max_length=200)
+    content = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "게시글"
+        verbose_name_plural = "게시글 목록"
+
+
+class Comment(models.Model):
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="comments")
+    content = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "댓글"
+        verbose_name_plural = "댓글 목록"
+'''
+
+DJANGO_VIEWS = '''from django.shortcuts import get_object_or_404
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import Post
+
+
+def _post_to_dict(post):
+    return {"id": post.id, "title": post.title, "content": post.content, "created_at": post.created_at}
+
+
+class PostListView(APIView):
+    @swagger_auto_schema(operation_summary="게시글 목록 조회", responses={200: "조회 성공"})
+    def get(self, request):
+        posts = Post.objects.order_by("-created_at")
+        return Response([_post_to_dict(post) for post in posts])
+
+    @swagger_auto_schema(
+        operation_summary="게시글 생성",
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "title": openapi.Schema(type=openapi.TYPE_STRING),
+                "content": openapi.Schema(type=openapi.TYPE_STRING),
+            },
+        ),
+        responses={201: "생성 성공"},
+    )
+    def post(self, request):
+        if not request.user.is_authenticated:
+            return Response(status=status.HTTP_401_UNAUTHORIZED)
+        post = Post.objects.create(user=request.user, title=request.data["title"], content=request.data["content"])
+        return Response(_post_to_dict(post), status=status.HTTP_201_CREATED)
+
+
+class PostDetailView(APIView):
+    @swagger_auto_schema(operation_summary="게시글 상세 조회", responses={200: "조회 성공", 404: "찾을 수 없음"})
+    def get(self, request, post_id):
+        return Response(_post_to_dict(get_object_or_404(Post, id=post_id)))
+
+    @swagger_auto_schema(operation_summary="게시글 삭제", responses={204: "삭제 성공", 404: "찾을 수 없음"})
+    def delete(self, request, post_id):
+        get_object_or_404(Post, id=post_id).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+'''
+
+DJANGO_URLS = '''from django.urls import path
+
+from .views import PostDetailView, PostListView
+
+urlpatterns = [
+    path("posts/", PostListView.as_view(), name="post-list"),
+    path("posts/<int:post_id>/", PostDetailView.as_view(), name="post-detail"),
+]
+'''
+
+
+def response_body(prompt):
+    """
+    프롬프트 종류에 맞는 본문을 반환합니다. (같은 프롬프트에는 항상 같은 본문)
+    """
+    if "urls.py" in prompt:
+        return DJANGO_URLS
+    if "views.py" in prompt:
+        return DJANGO_VIEWS
+    if "Django 모델 코드" in prompt:
+        return DJANGO_MODELS
+    if "swagger.json" in prompt:
+        return json.dumps(SWAGGER, ensure_ascii=False, indent=2)
+    if "ERD" in prompt and "Mermaid" in prompt:
+        return ERD
+    if "시퀀스 다이어그램" in prompt:
+        return SEQUENCE_DIAGRAM
+
+    title = re.search(r"Title:\s*(.+)", prompt)
+    return SPEC_DOCUMENT.format(title=title.group(1).strip() if title else "프로젝트")
+
+
+def tokenize(text):
+    return _TOKEN_PATTERN.findall(text)
+
+
+class StubConfig:
+    def __init__(self, ttft, tokens_per_second, error_rate, rate_limit_rate, retry_after, seed):
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def injected_failure(self):
+        """
+        이번 요청에 주입할 실패 상태 코드(429/500)를 반환합니다. 없으면 None.
+        """
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500
+        return None
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "LLMStub/1.0"
+    config = None  # StubConfig
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.rstrip("/") in ("/health", "/v1/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            prompt = payload["messages"][-1]["content"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            self._send_json(400, {"error": {"message": "invalid request body", "type": "invalid_request_error"}})
+            return
+
+        failure = self.config.injected_failure()
+        if failure == 429:
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached (stub)", "type": "rate_limit_error"}},
+                {"Retry-After": str(self.config.retry_after)},
+            )
+            return
+        if failure == 500:
+            self._send_json(500, {"error": {"message": "Injected server error (stub)", "type": "server_error"}})
+            return
+
+        tokens = tokenize(response_body(prompt))
+        if payload.get("max_tokens"):
+            tokens = tokens[:payload["max_tokens"]]
+        model = payload.get("model") or "stub"
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        usage = {
+            "prompt_tokens": sum(len(m.get("content") or "") for m in payload["messages"]) // 2,
+            "completion_tokens": len(tokens),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        if payload.get("stream"):
+            self._stream(completion_id, model, tokens)
+            return
+
+        time.sleep(self.config.ttft + len(tokens) / self.config.tokens_per_second)
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        })
+
+    def _stream(self, completion_id, model, tokens):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        created = int(time.time())
+
+        def event(delta, finish_reason=None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return b"data: " + json.dumps(chunk, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n\n"
+
+        time.sleep(self.config.ttft)
+        started = time.monotonic()
+        try:
+            self._write_chunk(event({"role": "assistant", "content": ""}))
+            for index, token in enumerate(tokens):
+                # 누적 오차 없이 tokens_per_second 속도를 유지
+                delay = started + index / self.config.tokens_per_second - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                self._write_chunk(event({"content": token}))
+            self._write_chunk(event({}, "stop"))
+            self._write_chunk(b"data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+
+def build_server(host="127.0.0.1", port=8089, ttft=0.5, tokens_per_second=80.0, error_rate=0.0,
+                 rate_limit_rate=0.0, retry_after=1, seed=0):
+    """
+    스텁 서버를 만듭니다. (serve_forever()는 호출하는 쪽에서 실행)
+    """
+    config = StubConfig(ttft, tokens_per_second, error_rate, rate_limit_rate, retry_after, seed)
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--ttft", type=float, default=0.5, help="첫 토큰까지의 시간(초)")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 응답 비율 (0~1)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429 응답 비율 (0~1)")
+    parser.add_argument("--retry-after", type=int, default=1, help="429 응답의 Retry-After(초)")
+    parser.add_argument("--seed", type=int, default=0, help="오류 주입 난수 시드")
+    args = parser.parse_args()
+
+    server = build_server(
+        args.host, args.port, args.ttft, args.tokens_per_second,
+        args.error_rate, args.rate_limit_rate, args.retry_after, args.seed,
+    )
+    print(f"LLM stub listening on http://{args.host}:{args.port}/v1/chat/completions")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+import json
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from unittest import SkipTest, mock
+
+import redis
+from django.test import SimpleTestCase, override_settings
+
+from config.redis import redis_client
+from llm import cache, ratelimit, retry, singleflight, sse
+from llm.exceptions import LLMError, LLMRateLimited, LLMTimeout
+
+
+class RedisTestCase(SimpleTestCase):
+    """
+    Lua 스크립트처럼 실제 Redis 가 필요한 테스트입니다. (Redis 에 연결할 수 없으면 건너뜀)
+    키는 테스트마다 다른 접두어를 사용하고 끝나면 삭제합니다.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            redis_client.ping()
+        except redis.RedisError:
+            raise SkipTest("Redis 에 연결할 수 없습니다.")
+        super().setUpClass()
+
+    def setUp(self):
+        self.prefix = f"test:{uuid.uuid4().hex}:"
+
+    def tearDown(self):
+        keys = list(redis_client.scan_iter(f"{self.prefix}*"))
+        if keys:
+            redis_client.delete(*keys)
+
+
+class SSEDecoderTest(SimpleTestCase):
+    """
+    llm.sse 가 청크 경계와 무관하게 같은 이벤트를 돌려주는지 확인합니다.
+    """
+
+    STREAM = (
+        ": keep-alive\r\n\r\n"
+        "event: message\r\nid: 1\r\ndata: {\"choices\":[{\"delta\":{\"content\":\"안녕\"}}]}\r\n\r\n"
+        "data: 첫 줄\ndata: 둘째 줄\n\n"
+        "data: [DONE]\n\n"
+    ).encode("utf-8")
+
+    def _decode(self, chunks):
+        return [(event.event, event.data, event.id) for event in sse.iter_events(chunks)]
+
+    def test_chunk_boundaries(self):
+        expected = self._decode([self.STREAM])
+        self.assertEqual(expected, [
+            ("message", "{\"choices\":[{\"delta\":{\"content\":\"안녕\"}}]}", "1"),
+            # id 는 다음 id 필드가 올 때까지 유지 (SSE 의 last event ID)
+            ("message", "첫 줄\n둘째 줄", "1"),
+            ("message", sse.DONE, "1"),
+        ])
+        # 한 바이트씩 (\r\n 과 UTF-8 문자 중간에서 잘리는 경우 포함)
+        self.assertEqual(self._decode([self.STREAM[i:i + 1] for i in range(len(self.STREAM))]), expected)
+        for size in (2, 3, 7, 50):
+            chunks = [self.STREAM[i:i + size] for i in range(0, len(self.STREAM), size)]
+            self.assertEqual(self._decode(chunks), expected)
+
+    def test_flush_without_trailing_newline(self):
+        self.assertEqual(self._decode([b"event: end\ndata: {}"]), [("end", "{}", None)])
+
+    def test_delta_content(self):
+        self.assertEqual(sse.delta_content('{"choices":[{"delta":{"content":"a\\n\\"b\\u00e9"}}]}'), 'a\n"bé')
+        # 빠른 경로가 아닌 형식 (공백, content 없음, null)
+        self.assertEqual(sse.delta_content(json.dumps({"choices": [{"delta": {"content": "x"}}]})), "x")
+        self.assertEqual(sse.delta_content('{"choices":[{"delta":{"role":"assistant"}}]}'), "")
+        self.assertEqual(sse.delta_content('{"choices":[{"delta":{"content":null}}]}'), "")
+        self.assertEqual(sse.delta_content('{"choices":[]}'), "")
+        with self.assertRaises(ValueError):
+            sse.delta_content("not json")
+
+
+class LLMCacheTest(SimpleTestCase):
+    def test_hit_skips_fetch(self):
+        fetch = mock.Mock()
+        with mock.patch.object(cache, "lookup", return_value="cached"), mock.patch.object(cache, "_record"):
+            self.assertEqual(cache.get_or_call("erd", {"model": "m"}, fetch), "cached")
+        fetch.assert_not_called()
+
+    def test_miss_and_bypass_store_fresh_value(self):
+        for use_cache in (True, False):
+            with mock.patch.object(cache, "lookup", return_value=None) as lookup, \
+                    mock.patch.object(cache, "store") as store, mock.patch.object(cache, "_record"):
+                self.assertEqual(cache.get_or_call("erd", {"model": "m"}, lambda: "fresh", use_cache=use_cache), "fresh")
+            self.assertEqual(lookup.called, use_cache)
+            store.assert_called_once()
+            self.assertEqual(store.call_args.args[:2], (cache.make_key({"model": "m"}), "fresh"))
+
+    def test_redis_error_falls_back_to_fetch(self):
+        with mock.patch.object(cache, "lookup", side_effect=redis.ConnectionError), \
+                mock.patch.object(cache, "store", side_effect=redis.ConnectionError), mock.patch.object(cache, "_record"):
+            self.assertEqual(cache.get_or_call("erd", {"model": "m"}, lambda: "fresh"), "fresh")
+
+    def test_make_key_ignores_key_order(self):
+        self.assertEqual(cache.make_key({"a": 1, "b": "가"}), cache.make_key({"b": "가", "a": 1}))
+        self.assertNotEqual(cache.make_key({"a": 1}), cache.make_key({"a": 2}))
+
+
+@override_settings(LLM_CACHE_MAX_BYTES=10)
+class LLMCacheEvictionTest(RedisTestCase):
+    """
+    llm.cache 의 저장 스크립트가 메모리 예산을 넘으면 가장 오래 사용되지 않은 항목부터 제거하는지 확인합니다.
+    """
+
+    def setUp(self):
+        super().setUp()
+        for name, suffix in (("KEY_PREFIX", ""), ("LRU_KEY", "lru"), ("SIZES_KEY", "sizes"),
+                             ("TOTAL_KEY", "total"), ("STATS_KEY", "stats")):
+            patcher = mock.patch.object(cache, name, f"{self.prefix}{suffix}")
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _at(self, now, fn, *args):
+        # 이 모듈의 time 만 바꿈 (time.time 을 바꾸면 Redis 클라이언트 쪽 시간도 바뀜)
+        with mock.patch.object(cache, "time") as clock:
+            clock.time.return_value = now
+            return fn(*args)
+
+    def test_evicts_least_recently_used(self):
+        self._at(1, cache.store, "a", "aaaa", 60)
+        self._at(2, cache.store, "b", "bbbb", 60)
+        # a 를 읽으면 b 가 가장 오래 사용되지 않은 항목이 됨
+        self.assertEqual(self._at(3, cache.lookup, "a"), "aaaa")
+        self.assertEqual(self._at(4, cache.store, "c", "cccc", 60), 1)
+
+        self.assertEqual(cache.lookup("a"), "aaaa")
+        self.assertIsNone(cache.lookup("b"))
+        self.assertEqual(cache.lookup("c"), "cccc")
+        self.assertEqual(int(redis_client.get(cache.TOTAL_KEY)), 8)
+        self.assertEqual(redis_client.hget(cache.STATS_KEY, "evicted"), "1")
+
+    def test_overwrite_counts_new_size_only(self):
+        self._at(1, cache.store, "a", "aaaa", 60)
+        self._at(2, cache.store, "a", "aaaaaa", 60)
+        self.assertEqual(int(redis_client.get(cache.TOTAL_KEY)), 6)
+
+    def test_entry_larger_than_budget_is_kept(self):
+        self._at(1, cache.store, "a", "aaaa", 60)
+        self.assertEqual(self._at(2, cache.store, "big", "x" * 20, 60), 1)
+        self.assertIsNone(cache.lookup("a"))
+        self.assertEqual(cache.lookup("big"), "x" * 20)
+
+
+@override_settings(
+    LLM_RATE_LIMIT_ENABLED=True, LLM_RATE_LIMIT_MAX_WAIT=0, LLM_CONCURRENCY_INITIAL=4,
+    LLM_CONCURRENCY_MIN=1, LLM_CONCURRENCY_MAX=8, LLM_CONCURRENCY_COOLDOWN=5,
+)
+class RateLimitTest(RedisTestCase):
+    """
+    llm.ratelimit 의 토큰 버킷과 동시 호출 수 상한을 시각을 고정해서 확인합니다. (대기 없이 바로 거절)
+    """
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(ratelimit, "KEY_PREFIX", self.prefix)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # 이 모듈의 time 만 바꿈 (밀리초 단위 시각)
+        patcher = mock.patch.object(ratelimit, "time")
+        self.clock = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.clock.monotonic.return_value = 0
+        self.now(0)
+        self.provider = SimpleNamespace(name="p", requests_per_minute=2, tokens_per_minute=1000)
+
+    def now(self, seconds):
+        self.clock.time.return_value = 1_000_000 + seconds
+
+    def acquire(self, max_tokens=10):
+        return ratelimit.acquire({"messages": [], "max_tokens": max_tokens}, self.provider)
+
+    def call(self, max_tokens=10):
+        with self.acquire(max_tokens):
+            pass
+
+    def test_requests_per_minute(self):
+        self.call()
+        self.call()
+        with self.assertRaises(LLMRateLimited):
+            self.call()
+        # 30초면 요청 1개만큼 다시 채워짐
+        self.now(30)
+        self.call()
+        with self.assertRaises(LLMRateLimited):
+            self.call()
+        self.assertEqual(ratelimit.stats("p")["events"]["rejected"], 2)
+
+    def test_tokens_per_minute(self):
+        self.provider.requests_per_minute = 100
+        self.call(max_tokens=600)
+        with self.assertRaises(LLMRateLimited):
+            self.call(max_tokens=600)
+        self.now(36)
+        self.call(max_tokens=600)
+
+    def test_concurrency_limit(self):
+        self.provider.requests_per_minute = 100
+        with override_settings(LLM_CONCURRENCY_INITIAL=1):
+            with self.acquire():
+                with self.assertRaises(LLMRateLimited):
+                    self.call()
+            self.call()
+
+    def test_throttled_response_halves_limit(self):
+        self.provider.requests_per_minute = 100
+        with self.assertRaises(LLMError):
+            with self.acquire():
+                raise LLMError("too many requests", 429)
+        self.assertEqual(ratelimit.stats("p")["limit"], 2)
+        self.assertEqual(ratelimit.stats("p")["events"]["throttled"], 1)
+
+
+class RateLimitRejectionTest(SimpleTestCase):
+    def test_local_rejection_is_not_retried(self):
+        fn = mock.Mock(side_effect=LLMRateLimited("rejected", 429))
+        with self.assertRaises(LLMRateLimited):
+            retry.call(fn)
+        self.assertEqual(fn.call_count, 1)
+
+    def test_estimate_tokens(self):
+        payload = {"messages": [{"role": "user", "content": "가" * 10}, {"role": "system", "content": None}]}
+        with override_settings(LLM_DEFAULT_COMPLETION_TOKENS=100):
+            self.assertEqual(ratelimit.estimate_tokens(payload), 105)
+        self.assertEqual(ratelimit.estimate_tokens(dict(payload, max_tokens=7)), 12)
+
+
+@override_settings(LLM_SINGLEFLIGHT_ENABLED=True, LLM_SINGLEFLIGHT_LOCK_TTL=30, LLM_SINGLEFLIGHT_RESULT_TTL=60)
+class SingleFlightTest(RedisTestCase):
+    """
+    같은 키의 두 번째 호출이 먼저 시작한 호출(스레드)의 결과를 받는지 확인합니다.
+    먼저 시작한 호출은 두 번째 호출이 기다리기 시작한 뒤에 끝납니다.
+    """
+
+    def setUp(self):
+        super().setUp()
+        for name, suffix in (("LOCK_PREFIX", "lock:"), ("STREAM_PREFIX", "flight:")):
+            patcher = mock.patch.object(singleflight, name, f"{self.prefix}{suffix}")
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.joined = threading.Event()
+        join = singleflight._join
+
+        def spy(key):
+            flight, leader = join(key)
+            if not leader:
+                self.joined.set()
+            return flight, leader
+
+        patcher = mock.patch.object(singleflight, "_join", side_effect=spy)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _lead(self, target):
+        outcome = {}
+
+        def run():
+            try:
+                outcome["value"] = target()
+            except Exception as e:
+                outcome["error"] = e
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        self.addCleanup(thread.join)
+        return outcome
+
+    def _wait_for_follower(self):
+        if not self.joined.wait(5):
+            raise AssertionError("두 번째 호출이 기다리지 않았습니다.")
+
+    def _fetch(self, value, delay=0):
+        def fetch():
+            self._wait_for_follower()
+            time.sleep(delay)
+            return value
+        return fetch
+
+    def _await_leader(self):
+        # 먼저 시작한 호출이 락을 잡을 때까지
+        for _ in range(100):
+            if redis_client.keys(f"{self.prefix}lock:*"):
+                return
+            time.sleep(0.01)
+        raise AssertionError("락을 잡지 못했습니다.")
+
+    def test_follower_receives_leader_result(self):
+        leader = self._lead(lambda: singleflight.do("k", self._fetch("결과")))
+        self._await_leader()
+        fetch = mock.Mock()
+
+        self.assertEqual(singleflight.do("k", fetch), "결과")
+        fetch.assert_not_called()
+        self.assertEqual(leader, {"value": "결과"})
+
+        # 끝난 뒤에는 새로 생성
+        self.assertEqual(singleflight.do("k", lambda: "새 결과"), "새 결과")
+
+    def test_follower_receives_leader_error(self):
+        def fail():
+            self._wait_for_follower()
+            raise LLMError("upstream", 503)
+
+        leader = self._lead(lambda: singleflight.do("k", fail))
+        self._await_leader()
+
+        with self.assertRaises(LLMError) as ctx:
+            singleflight.do("k", mock.Mock())
+        self.assertEqual(ctx.exception.status_code, 503)
+        self.assertIsInstance(leader.get("error"), LLMError)
+
+    def test_stream_follower_replays_chunks(self):
+        def produce():
+            yield b"a"
+            self._wait_for_follower()
+            yield b"b"
+
+        leader = self._lead(lambda: list(singleflight.stream("k", produce)))
+        self._await_leader()
+
+        self.assertEqual(list(singleflight.stream("k", mock.Mock())), [b"a", b"b"])
+        self.assertEqual(leader, {"value": [b"a", b"b"]})
+
+    @override_settings(LLM_SINGLEFLIGHT_LOCK_TTL=1)
+    def test_lock_extended_while_leader_runs(self):
+        # 락 만료 시간보다 오래 걸려도 기다리던 호출이 결과를 받음
+        self._lead(lambda: singleflight.do("k", self._fetch("결과", delay=2)))
+        self._await_leader()
+
+        self.assertEqual(singleflight.do("k", mock.Mock()), "결과")
+
+
+@override_settings(LLM_RETRY_ATTEMPTS=3, LLM_RETRY_BASE_DELAY=1, LLM_RETRY_MAX_DELAY=20)
+class RetryTest(SimpleTestCase):
+    """
+    llm.retry 의 재시도 판단, 백오프 시간, 재시도 횟수를 대기 없이 확인합니다.
+    """
+
+    def setUp(self):
+        patcher = mock.patch.object(retry.time, "sleep")
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(retry, "logger")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_is_retryable(self):
+        self.assertTrue(retry.is_retryable(LLMTimeout("timeout")))
+        self.assertTrue(retry.is_retryable(LLMError("connection refused")))
+        self.assertTrue(retry.is_retryable(LLMError("unavailable", 503)))
+        self.assertTrue(retry.is_retryable(LLMError("too many requests", 429)))
+        self.assertFalse(retry.is_retryable(LLMError("bad request", 400)))
+
+    def test_backoff(self):
+        # full jitter 의 상한: min(MAX_DELAY, BASE_DELAY * 2 ** attempt)
+        with mock.patch.object(retry.random, "uniform", side_effect=lambda low, high: high):
+            self.assertEqual([retry.backoff(attempt) for attempt in range(6)], [1, 2, 4, 8, 16, 20])
+        with mock.patch.object(retry.random, "uniform", return_value=0.5):
+            # Retry-After 만큼은 기다리되 MAX_DELAY 를 넘지 않음
+            self.assertEqual(retry.backoff(0, LLMError("too many requests", 429, retry_after=7)), 7)
+            self.assertEqual(retry.backoff(0, LLMError("too many requests", 429, retry_after=60)), 20)
+
+    def test_call_retries_until_success(self):
+        fn = mock.Mock(side_effect=[LLMError("unavailable", 503), LLMTimeout("timeout"), "결과"])
+        self.assertEqual(retry.call(fn), "결과")
+        self.assertEqual(fn.call_count, 3)
+        self.assertEqual(self.sleep.call_count, 2)
+
+    def test_call_gives_up(self):
+        fn = mock.Mock(side_effect=LLMError("unavailable", 503))
+        with self.assertRaises(LLMError):
+            retry.call(fn)
+        self.assertEqual(fn.call_count, 4)
+
+        fn = mock.Mock(side_effect=LLMError("bad request", 400))
+        with self.assertRaises(LLMError):
+            retry.call(fn)
+        self.assertEqual(fn.call_count, 1)
+
+    def test_stream_retries_only_before_first_chunk(self):
+        attempts = []
+
+        def produce(fail_after):
+            def generate():
+                attempts.append(fail_after)
+                yield from ["a", "b"][:fail_after]
+                raise LLMError("unavailable", 503)
+            return generate
+
+        produces = iter([produce(0), produce(1)])
+        with self.assertRaises(LLMError):
+            list(retry.stream(lambda: next(produces)()))
+        # 첫 시도는 청크 전에 실패해서 재시도, 두 번째는 청크를 보낸 뒤 실패해서 그대로 실패
+        self.assertEqual(attempts, [0, 1])
+
+    @override_settings(LLM_HEDGE_ENABLED=True)
+    def test_hedged_returns_first_success(self):
+        release = threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(len(calls))
+            if len(calls) == 1:
+                release.wait(5)
+                return "느린 응답"
+            return "hedge 응답"
+
+        with mock.patch.object(retry, "hedge_delay", return_value=0.05):
+            self.assertEqual(retry.hedged("create_erd", fn), "hedge 응답")
+        release.set()
+        self.assertEqual(len(calls), 2)
+
+    @override_settings(LLM_HEDGE_ENABLED=True, LLM_HEDGE_MIN_SAMPLES=20, LLM_HEDGE_DEFAULT_DELAY=30, LLM_HEDGE_MIN_DELAY=3)
+    def test_hedge_delay(self):
+        self.assertIsNone(retry.hedge_delay("document"))
+        with mock.patch.object(retry.stats, "summary", return_value={"count": 5, "p95": 1.0}):
+            self.assertEqual(retry.hedge_delay("create_erd"), 30)
+        with mock.patch.object(retry.stats, "summary", return_value={"count": 50, "p95": 1.0}):
+            self.assertEqual(retry.hedge_delay("create_erd"), 3)
+        with mock.patch.object(retry.stats, "summary", return_value={"count": 50, "p95": 12.5}):
+            self.assertEqual(retry.hedge_delay("create_erd"), 12.5)
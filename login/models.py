@@ -63,6 +63,10 @@ class Project(models.Model):
         verbose_name = '프로젝트'
         verbose_name_plural = '프로젝트들'
         db_table = 'project'
+        indexes = [
+            # 사용자별 프로젝트 이름 조회 (Project.objects.get_or_create(user=..., name=...))
+            models.Index(fields=['user', 'name'], name='project_user_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
\ No newline at end of file
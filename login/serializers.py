@@ -11,4 +11,5 @@ class UserProfileSerializer(serializers.Serializer):
     document_titles = serializers.ListField(
         child=serializers.DictField(child=serializers.CharField()),
         allow_empty=True
-    )
\ No newline at end of file
+    )
+    next_cursor = serializers.CharField(allow_null=True, required=False)
\ No newline at end of file
@@ -19,7 +19,12 @@ from django.db import transaction
 from rest_framework.permissions import AllowAny
 from login.serializers import LoginResponseSerializer
 from login.serializers import UserProfileSerializer
+from document import cache as document_cache
+from document import conditional
 from document.models import Document
+from document.pagination import InvalidPage, paginate
+from document.tasks import purge_document
+from document.writes import update_columns
 from django.db.models import Q
 from django.http import HttpResponseRedirect
 
@@ -197,6 +202,14 @@ class LoginGithubCallbackView(APIView):
         user = User.objects.filter(github_username=github_username).first()
 
         if user:
+            # 바뀐 GitHub 토큰/프로필 이미지 컬럼만 UPDATE
+            changed = {
+                name: value
+                for name, value in (("access_token", access_token), ("profile_image", profile_image))
+                if value is not None and getattr(user, name) != value
+            }
+            if changed:
+                update_columns(user, **changed)
             return user, False
 
         return self.social_user_create(
@@ -211,21 +224,29 @@ class MyPageView(APIView):
     
     @swagger_auto_schema(
         operation_summary="마이페이지 조회 API",  # Swagger UI에서 이 API의 간단한 설명
-        operation_description="로그인된 사용자의 GitHub 사용자명과 연관된 프로젝트 이름 목록을 반환합니다."  # 상세 설명
+        operation_description="로그인된 사용자의 GitHub 사용자명과 연관된 프로젝트 이름 목록을 반환합니다.",  # 상세 설명
+        manual_parameters=[
+            openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="한 페이지의 문서 수"),
+            openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="이전 응답의 next_cursor"),
+        ],
     )
     def get(self, request):
         # 현재 로그인된 사용자 정보 가져오기
         user = request.user
 
-        # 사용자와 연관된 프로젝트 정보 가져오기
-        documents = Document.objects.filter(user_id=user.id)  # Document는 사용자와 FK로 연결되어 있음
-        document_list = [{"document_id": document.id, "title": document.title} for document in documents]
+        # 사용자와 연관된 프로젝트 정보 가져오기 (최신순 커서 페이지네이션, id/title 컬럼만 조회)
+        try:
+            rows, next_cursor = paginate(Document.objects.filter(user_id=user.id), request, ["id", "title"])
+        except InvalidPage as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        document_list = [{"document_id": row["id"], "title": row["title"]} for row in rows]
 
         # 사용자 정보 직렬화
         data = {
             "github_username": user.github_username,  # 사용자의 GitHub 이름
             "email": user.email,
-            "document_titles": document_list  # 사용자의 프로젝트 정보 목록
+            "document_titles": document_list,  # 사용자의 프로젝트 정보 목록
+            "next_cursor": next_cursor,  # 다음 페이지 커서 (마지막 페이지면 None)
         }
         serializer = UserProfileSerializer(data=data)
 
@@ -290,6 +311,10 @@ class DocumentIDView(APIView):
     @swagger_auto_schema(
         operation_summary="프로젝트 상세 조회 API",
         operation_description="로그인된 사용자가 소유한 문서이름과 관련된 저장된 문서를 조회합니다.",
+        manual_parameters=[
+            openapi.Parameter('fields', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description="응답할 산출물 (쉼표로 구분: erd_code,diagram_code,api_code, 없으면 저장된 산출물 전부)"),
+        ],
         responses={
             200: openapi.Response(
                 description="문서 조회 성공",
@@ -307,6 +332,7 @@ class DocumentIDView(APIView):
                     }
                 }
             ),
+            304: openapi.Response(description="변경 없음 (If-None-Match 가 ETag 와 같음)"),
             404: openapi.Response(
                 description="프로젝트를 찾을 수 없음",
                 examples={
@@ -326,29 +352,27 @@ class DocumentIDView(APIView):
         }
     )
     def get(self, request, document_id):  # document_id를 경로 파라미터로 받음
-        try:
-            # document_id로 문서 객체 가져오기
-            document = Document.objects.get(id=document_id)
-
-            # 응답 데이터 초기화
-            response_data = {
-                "document_id": document.id,
-                "document_title": document.title,
-            }
-
-            # 저장된 코드만 응답에 추가
-            if document.is_erd_saved:
-                response_data["erd_code"] = document.erd_code
-            if document.is_diagram_saved:
-                response_data["diagram_code"] = document.diagram_code
-            if document.is_api_saved:
-                response_data["api_code"] = document.api_code
+        # ?fields=erd_code,api_code 로 응답할 산출물 선택 (없으면 저장된 산출물 전부)
+        fields = None
+        if request.GET.get("fields"):
+            fields = sorted({field.strip() for field in request.GET["fields"].split(",") if field.strip()})
+            invalid = [field for field in fields if field not in conditional.DETAIL_FIELDS]
+            if invalid or not fields:
+                return Response(
+                    {"error": f"fields 는 {', '.join(conditional.DETAIL_FIELDS)} 중에서 선택해야 합니다."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
-            # 저장된 코드가 하나도 없는 경우 메시지 추가
-            if not (document.is_diagram_saved or document.is_erd_saved or document.is_api_saved):
-                response_data["message"] = "저장된 문서가 없습니다."
+        try:
+            # If-None-Match 가 ETag 와 같으면 산출물을 읽지 않고 304 반환
+            etag = conditional.detail_etag(document_id, fields)
+            not_modified = conditional.not_modified(request, etag)
+            if not_modified:
+                return not_modified
 
-            return Response(response_data, status=status.HTTP_200_OK)
+            # 문서 상세 응답은 문서 캐시(프로세스 메모리 -> Redis)에서 읽고, 없으면 DB 에서 만들어 저장
+            response_data = document_cache.get_detail(document_id, lambda: self.get_detail(document_id, fields), fields)
+            return conditional.set_headers(Response(response_data, status=status.HTTP_200_OK), etag)
 
         except Document.DoesNotExist:
             return Response(
@@ -356,6 +380,32 @@ class DocumentIDView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+    def get_detail(self, document_id, fields=None):
+        # document_id로 문서 객체 가져오기
+        document = Document.objects.get(id=document_id)
+        # 저장된 산출물 중 요청한 것만 한 번에 조회
+        names = [
+            name for name, flag in conditional.DETAIL_ARTIFACTS
+            if getattr(document, flag) and (fields is None or name in fields)
+        ]
+        document.load_artifacts(*names)
+
+        # 응답 데이터 초기화
+        response_data = {
+            "document_id": document.id,
+            "document_title": document.title,
+        }
+
+        # 저장된 코드만 응답에 추가
+        for name in names:
+            response_data[name] = getattr(document, name)
+
+        # 저장된 코드가 하나도 없는 경우 메시지 추가
+        if not (document.is_diagram_saved or document.is_erd_saved or document.is_api_saved):
+            response_data["message"] = "저장된 문서가 없습니다."
+
+        return response_data
+
     @swagger_auto_schema(
         operation_summary="설계 삭제 API",
         operation_description="로그인된 사용자가 소유한 문서내용을 삭제합니다.",
@@ -387,29 +437,27 @@ class DocumentIDView(APIView):
         }
     )
     def delete(self, request, document_id):  # document_id를 경로 파라미터로 받음
-        try:
-            # 문서 객체 가져오기
-            document = Document.objects.get(id=document_id)
-
+        # 문서 삭제 (deleted_at 만 기록하고, 산출물/버전 행은 비동기로 삭제)
+        if not Document.objects.filter(id=document_id, user_id=request.user).soft_delete():
             # 문서가 로그인된 사용자의 것인지 확인
-            if document.user_id != request.user:
+            if Document.objects.filter(id=document_id).exists():
                 return Response(
                     {"error": "해당 사용자가 아닌 다른 사용자의 문서는 삭제할 수 없습니다."},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-
-            # 문서 삭제
-            document.delete()
-
-            return Response(
-                {"message": "문서 삭제 성공"},
-                status=status.HTTP_200_OK
-            )
-        except Document.DoesNotExist:
             return Response(
                 {"error": "문서를 찾을 수 없습니다."},
                 status=status.HTTP_404_NOT_FOUND
             )
+
+        # 쿼리셋 update 는 post_save 를 보내지 않으므로 직접 무효화
+        document_cache.invalidate(document_id)
+        purge_document.delay(document_id)
+
+        return Response(
+            {"message": "문서 삭제 성공"},
+            status=status.HTTP_200_OK
+        )
             
 class UserDetailsView(APIView):
     permission_classes = [IsAuthenticated]
@@ -0,0 +1,95 @@
+"""
+사용자별 작업 진행 이벤트입니다. (기존 전역 pub/sub 채널 task_updates 대체)
+
+이벤트는 작업을 시작한 사용자의 스트림에 추가하므로, 구독자는 자신의 스트림만 읽고
+연결이 끊겨도 마지막으로 받은 이벤트 ID 이후부터 이어 받을 수 있습니다.
+작업 하나의 이벤트만 받으려면 구독할 때 job 파라미터로 거릅니다. (/api/v1/progress/?job=<job_id>)
+설계 생성은 토큰 조각까지 담은 작업 스트림도 있습니다. (document.jobs 의 design:job:<job_id>:events)
+
+    progress:user:<user_id>   MAXLEN PROGRESS_USER_MAXLEN
+
+스트림 필드는 짧은 이름을 사용합니다.
+    j: job id, s: stage (예: design.started, erd.completed, dind.cloned), p: percent(0~100),
+    t: 발생 시각(epoch ms), m: 메시지(선택), d: "1" 이면 작업의 마지막 이벤트
+키는 마지막 이벤트 이후 PROGRESS_TTL 초가 지나면 만료됩니다.
+"""
+import json
+import logging
+import time
+
+import redis
+from django.conf import settings
+
+from config.redis import get_async_redis_client, redis_client
+
+logger = logging.getLogger(__name__)
+
+USER_PREFIX = "progress:user:"
+
+
+def user_key(user_id):
+    return f"{USER_PREFIX}{user_id}"
+
+
+def publish(job_id, user_id, stage, percent, message=None, done=False):
+    """
+    진행 이벤트를 사용자 스트림에 추가합니다. Redis 오류는 기록만 하고 작업은 계속합니다.
+    """
+    fields = {"j": job_id, "s": stage, "p": int(percent), "t": int(time.time() * 1000)}
+    if message:
+        fields["m"] = str(message)[:500]
+    if done:
+        fields["d"] = "1"
+
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.xadd(user_key(user_id), fields, maxlen=settings.PROGRESS_USER_MAXLEN, approximate=True)
+        pipe.expire(user_key(user_id), settings.PROGRESS_TTL)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"진행 이벤트 기록 실패 ({job_id} {stage}): {e}")
+
+
+def iter_events(key, last_id):
+    """
+    스트림 key 의 이벤트를 last_id 이후부터 (event_id, fields) 로 yield 합니다.
+    PROGRESS_KEEPALIVE 초 동안 새 이벤트가 없으면 (None, None)을 yield 합니다. (연결 유지용)
+    """
+    while True:
+        entries = redis_client.xread({key: last_id}, count=100, block=int(settings.PROGRESS_KEEPALIVE * 1000))
+        if not entries:
+            yield None, None
+            continue
+        for _, items in entries:
+            for event_id, fields in items:
+                last_id = event_id
+                yield event_id, fields
+
+
+async def aiter_events(key, last_id):
+    """
+    iter_events 의 비동기 버전입니다. (ASGI 모드)
+    """
+    client = get_async_redis_client()
+    while True:
+        entries = await client.xread({key: last_id}, count=100, block=int(settings.PROGRESS_KEEPALIVE * 1000))
+        if not entries:
+            yield None, None
+            continue
+        for _, items in entries:
+            for event_id, fields in items:
+                event_id = event_id.decode()
+                fields = {name.decode(): value.decode() for name, value in fields.items()}
+                last_id = event_id
+                yield event_id, fields
+
+
+def to_sse(event_id, fields):
+    if fields is None:
+        return ": keep-alive\n\n"
+    data = {"job": fields["j"], "stage": fields["s"], "percent": int(fields["p"]), "ts": int(fields["t"])}
+    if fields.get("m"):
+        data["message"] = fields["m"]
+    if fields.get("d"):
+        data["done"] = True
+    return f"id: {event_id}\nevent: progress\ndata: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}\n\n"
@@ -0,0 +1,46 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from login.models import User
+from progress import events
+
+
+class UserProgressTest(TestCase):
+    client_class = APIClient
+
+    EVENTS = [
+        ("1-0", {"j": "a", "s": "dind.queued", "p": "0", "t": "1"}),
+        ("2-0", {"j": "b", "s": "design.started", "p": "0", "t": "2"}),
+        (None, None),
+        ("3-0", {"j": "a", "s": "dind.completed", "p": "100", "t": "3", "d": "1"}),
+        ("4-0", {"j": "b", "s": "design.completed", "p": "100", "t": "4", "d": "1"}),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(github_username="watcher", email="watcher@example.com")
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def _stream(self, path, **headers):
+        with mock.patch.object(events, "iter_events", return_value=iter(self.EVENTS)) as iter_events:
+            response = self.client.get(path, **headers)
+            body = b"".join(response.streaming_content).decode()
+        return iter_events.call_args.args, body
+
+    def test_job_filter(self):
+        # 작업 하나만 구독하면 처음부터 그 작업의 이벤트만 보내고 마지막 이벤트 뒤에 닫음
+        args, body = self._stream("/api/v1/progress/?job=a")
+        self.assertEqual(args, (events.user_key(self.user.id), "0"))
+        self.assertEqual(body.count("event: progress"), 2)
+        self.assertIn('"stage":"dind.completed"', body)
+        self.assertNotIn('"job":"b"', body)
+        self.assertIn(": keep-alive", body)
+
+    def test_all_jobs(self):
+        args, body = self._stream("/api/v1/progress/", HTTP_LAST_EVENT_ID="1-0")
+        self.assertEqual(args, (events.user_key(self.user.id), "1-0"))
+        self.assertEqual(body.count("event: progress"), 4)
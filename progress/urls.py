@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.urls import path
+
+from progress import views
+
+user_progress = views.user_progress
+
+# ASGI 모드에서는 이벤트 루프 위에서 구독 (워커 스레드를 점유하지 않음)
+if settings.SERVER_MODE == "asgi":
+    user_progress = views.auser_progress
+
+urlpatterns = [
+    path('', user_progress, name='user_progress'),
+]
@@ -0,0 +1,89 @@
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+
+from document.async_views import get_request_user
+from document.renderers import EventStreamRenderer
+from progress import events
+
+
+def _last_event_id(request, default):
+    # EventSource 는 재연결할 때 Last-Event-ID 헤더를 보냄 (직접 연결할 때는 ?last_event_id=)
+    return request.headers.get("Last-Event-ID") or request.GET.get("last_event_id") or default
+
+
+def _skip(job_id, fields):
+    # ?job=<job_id> 이면 그 작업의 이벤트만 보냄 (연결 유지용 keep-alive 는 그대로)
+    return job_id and fields is not None and fields.get("j") != job_id
+
+
+def _finished(job_id, fields):
+    # 작업 하나를 구독하면 그 작업의 마지막 이벤트를 보낸 뒤 연결을 닫음
+    return job_id and fields is not None and fields.get("d")
+
+
+def _sse_response(stream):
+    response = StreamingHttpResponse(stream, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["Access-Control-Allow-Origin"] = "https://devsketch.xyz"
+    return response
+
+
+#----------------------------------------------------------
+# 사용자 작업 진행 이벤트 SSE api
+@swagger_auto_schema(
+    method='get',
+    operation_summary="사용자 작업 진행 이벤트 SSE API",
+    operation_description="로그인한 사용자의 모든 작업(설계 생성, 도커 컨테이너 생성 등) 진행 이벤트를 보냅니다. "
+                          "data: {job, stage, percent, ts, message?, done?} / "
+                          "Last-Event-ID 헤더(또는 last_event_id 파라미터)가 없으면 새 이벤트부터 보냅니다. "
+                          "job 파라미터가 있으면 그 작업의 이벤트만 처음부터 보내고 작업이 끝나면 연결을 닫습니다.",
+    manual_parameters=[
+        openapi.Parameter("job", openapi.IN_QUERY, description="작업 ID (task_id/job_id)", type=openapi.TYPE_STRING),
+    ],
+    responses={200: openapi.Response(description="text/event-stream")},
+)
+@api_view(["GET"])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+@permission_classes([IsAuthenticated])
+def user_progress(request):
+    job_id = request.GET.get("job")
+    last_id = _last_event_id(request, "0" if job_id else "$")
+    key = events.user_key(request.user.id)
+
+    def sse():
+        for event_id, fields in events.iter_events(key, last_id):
+            if _skip(job_id, fields):
+                continue
+            yield events.to_sse(event_id, fields)
+            if _finished(job_id, fields):
+                return
+
+    return _sse_response(sse())
+
+
+#----------------------------------------------------------
+# ASGI 모드 (SERVER_MODE=asgi) 에서 사용하는 비동기 버전
+@require_GET
+async def auser_progress(request):
+    user = await get_request_user(request)
+    if user is None:
+        return JsonResponse({"status": "error", "message": "인증이 필요합니다."}, status=401)
+
+    job_id = request.GET.get("job")
+    last_id = _last_event_id(request, "0" if job_id else "$")
+
+    async def sse():
+        async for event_id, fields in events.aiter_events(events.user_key(user.id), last_id):
+            if _skip(job_id, fields):
+                continue
+            yield events.to_sse(event_id, fields)
+            if _finished(job_id, fields):
+                return
+
+    return _sse_response(sse())
+
@@ -162,6 +162,7 @@ from login.models import Project
 from celery.result import AsyncResult
 from .models import Repository
 from django.utils import timezone
+from config.db.pool import release_connections
 
 # User 모델 가져오기
 User = get_user_model()
@@ -271,7 +272,8 @@ def create_repo(request):
             private=private
         )
 
-        # 태스크 완료 대기
+        # 태스크 완료 대기 (기다리는 동안 DB 연결은 풀에 돌려줌)
+        release_connections()
         task.wait()
 
         # Repository 모델에 데이터 저장